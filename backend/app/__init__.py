@@ -1,10 +1,43 @@
+"""
+SNOW Tracker backend.
+
+Startup runs in three explicit phases so that importing and building the
+app has no side effects:
+
+    create_app(config)      configuration, extensions, blueprints and CLI;
+                            no database access and no threads
+    init_database(app)      bring the schema up to date
+    start_services(app)     start the job scheduler and background jobs, in
+                            the one process holding the job lock
+
+run.py runs all three; under gunicorn wsgi.py runs the first two once in
+the master (--preload) and gunicorn.conf.py the last in every worker.
+APScheduler is only imported by processes that start services.
+"""
+import os
+
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from flask_apscheduler import APScheduler
 
 db = SQLAlchemy()
-scheduler = APScheduler()
+_scheduler = None
+
+
+def get_scheduler():
+    """The process-wide Flask-APScheduler instance, created on first use."""
+    global _scheduler
+    if _scheduler is None:
+        from flask_apscheduler import APScheduler
+        _scheduler = APScheduler()
+    return _scheduler
+
+
+def __getattr__(name):
+    # `from app import scheduler` keeps working without importing APScheduler up front
+    if name == 'scheduler':
+        return get_scheduler()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 def create_app(config_name='development'):
@@ -20,33 +53,71 @@ def create_app(config_name='development'):
     else:
         app.config.from_object('app.config.DevelopmentConfig')
 
+    # Request/pool instrumentation for /api/metrics (sets the engine's pool class)
+    from app.metrics import init_metrics
+    init_metrics(app)
+
     # Initialize extensions
     db.init_app(app)
 
+    # SQLite pragmas (WAL, busy timeout, cache) on every new connection
+    from app.storage import apply_storage_profile
+    with app.app_context():
+        apply_storage_profile(db.engine, app.config)
+
+    # Opt-in query counts and timings per request and job (SQL_PROFILER_ENABLED)
+    from app.sql_profiler import init_sql_profiler
+    with app.app_context():
+        init_sql_profiler(app, db.engine)
+
     # CORS configuration - allow all in production (same-origin via nginx proxy)
     if config_name == 'production':
         CORS(app)  # Allow all origins - nginx handles security
     else:
         CORS(app, origins=['http://localhost:5173', 'http://localhost:3000', 'http://127.0.0.1:5173'])
 
-    scheduler.init_app(app)
-
     # Register blueprints
     from app.routes.api import api_bp
     from app.routes.upload import upload_bp
+    from app.routes.export import export_bp
 
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(upload_bp, url_prefix='/api')
+    app.register_blueprint(export_bp, url_prefix='/api')
+
+    # CLI commands (flask snow ...)
+    from app.cli import snow_cli
+    app.cli.add_command(snow_cli)
+
+    return app
 
-    # Create database tables (ignore if already exist)
+
+def init_database(app):
+    """Bring the database schema up to date (creates tables on first run)."""
+    from app.migrations import run_migrations
     with app.app_context():
-        try:
-            db.create_all()
-        except Exception:
-            pass  # Tables already exist
+        run_migrations(db.engine, app.logger)
+        if db.engine.url.database not in (None, '', ':memory:'):
+            # No pooled connections left behind: a preloading gunicorn master forks after this
+            # (an in-memory database lives only as long as its one connection)
+            db.engine.dispose()
 
-    # Start scheduler for SLA monitoring
-    if not scheduler.running:
-        scheduler.start()
 
-    return app
+def start_services(app):
+    """
+    Start the background jobs if this process wins the job lock (see
+    app.jobs); returns the scheduler, which runs only in that process.
+    """
+    from app.jobs import acquire_job_lock, job_state_path, register_jobs
+    from app.services.job_telemetry import job_telemetry
+
+    base = job_state_path(app)
+    job_telemetry.share(f'{base}.json' if base else None)
+    scheduler = get_scheduler()
+    if getattr(app, 'apscheduler', None) is not scheduler:
+        scheduler.init_app(app)
+    if not scheduler.running and acquire_job_lock(app):
+        register_jobs(app, scheduler)
+        scheduler.start()
+        app.logger.info(f'Background jobs run in process {os.getpid()}')
+    return scheduler
@@ -0,0 +1,113 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+snow_cli = AppGroup('snow', help='SNOW Tracker maintenance commands.')
+
+
+@snow_cli.command('migrate')
+@click.option('--target', type=int, default=None, help='Stop at this schema version.')
+def migrate_command(target):
+    """Apply pending schema migrations."""
+    from app.migrations import run_migrations, get_schema_version
+
+    applied = run_migrations(logger=current_app.logger, target=target)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+    click.echo(f'Schema version: {get_schema_version()}')
+
+
+@snow_cli.command('db-version')
+def db_version_command():
+    """Show the applied schema version and any pending migrations."""
+    from app.migrations import MIGRATIONS, get_schema_version
+
+    version = get_schema_version()
+    click.echo(f'Schema version: {version}')
+    for migration in MIGRATIONS:
+        if migration.version > version:
+            click.echo(f'  pending {migration.version}: {migration.description}')
+
+
+@snow_cli.command('archive')
+@click.option('--days', type=int, default=None,
+              help='Archive cases inactive for longer than this (default: CASE_ARCHIVE_AFTER_DAYS).')
+def archive_command(days):
+    """Move long-inactive cases into the cases_archive table."""
+    from app.services.case_lifecycle import archive_inactive_cases
+    from app.services.write_queue import write_queue
+
+    result = write_queue.run(archive_inactive_cases, days)
+    click.echo(f"Archived {result['archived']} cases inactive since before {result['cutoff']}")
+
+
+@snow_cli.command('snapshot')
+def snapshot_command():
+    """Write a point-in-time checkpoint of the active cases now."""
+    from app.services.snapshots import write_snapshot
+    from app.services.write_queue import write_queue
+
+    result = write_queue.run(write_snapshot)
+    if result['written']:
+        click.echo(f"Checkpoint of {result['case_count']} cases ({result['size']} bytes) at {result['taken_at']}")
+    else:
+        click.echo('No changes since the last checkpoint')
+
+
+@snow_cli.command('rebuild-response-times')
+def rebuild_response_times_command():
+    """Recompute the response-time sketches from case_history."""
+    from app.services.response_times import rebuild_response_times
+    from app.services.write_queue import write_queue
+
+    def job():
+        return rebuild_response_times(), ()
+
+    recorded = write_queue.run(job, group=False)
+    click.echo(f'Recorded {recorded} response times')
+
+
+@snow_cli.command('backfill')
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('--workers', type=int, default=None, help='Parser processes (default: one per CPU).')
+@click.option('--batch-rows', type=int, default=None,
+              help='Rows applied per transaction (default: BACKFILL_BATCH_ROWS).')
+@click.option('--suffix', default='.csv', show_default=True, help='Only load files ending in this.')
+@click.option('--force', is_flag=True, help='Apply even if case_history already goes past the first export.')
+def backfill_command(directory, workers, batch_rows, suffix, force):
+    """Load a directory of saved CSV exports as history, oldest first."""
+    from app import db
+    from app.migrations import run_migrations
+    from app.services.backfill import backfill_exports, list_exports
+
+    # A fresh volume has no tables until the server first starts
+    applied = run_migrations(logger=current_app.logger)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(str(v) for v in applied)}")
+    if db.engine.url.database not in (None, '', ':memory:'):
+        # No pooled connection left for the parser processes to inherit when they fork
+        db.engine.dispose()
+
+    paths = list_exports(directory, suffix)
+    with click.progressbar(length=len(paths), label='Backfilling', show_pos=True,
+                           item_show_func=lambda through: through and f'through {through}') as bar:
+        def progress(summary):
+            bar.update(summary['applied'] + len(summary['rejected']) - bar.pos, summary['applied_through'])
+
+        try:
+            summary = backfill_exports(paths, workers, batch_rows, force, progress)
+        except ValueError as e:
+            raise click.ClickException(f'{e}, or pass --force to apply on top of it')
+
+    for rejected in summary['rejected']:
+        click.echo(f"Skipped {rejected['file']}: {'; '.join(rejected['errors'])}", err=True)
+    if not summary['applied']:
+        click.echo(f'No exports applied ({summary["files"]} files found)')
+        return
+    stats = summary['stats']
+    click.echo(f"Applied {summary['applied']} of {summary['files']} exports "
+               f"({summary['first_export']} to {summary['applied_through']}) in {summary['batches']} transactions")
+    click.echo(f"{summary['rows']} rows in {summary['seconds']}s ({summary['rows_per_second']} rows/s, "
+               f"{summary['scan_seconds']}s finding export times)")
+    click.echo(f"{stats['new_cases']} new cases, {stats['state_changes']} state changes, "
+               f"{stats['deactivated']} deactivations, {stats['checkpoints']} checkpoints")
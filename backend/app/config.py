@@ -28,6 +28,14 @@ class BaseConfig:
     SLA_CRITICAL_THRESHOLD = get_int_env('SLA_CRITICAL_THRESHOLD', 30)
     SLA_WARNING_THRESHOLD = get_int_env('SLA_WARNING_THRESHOLD', 120)
 
+    # Urgency score points (/api/cases/next); recomputed by every SLA pass
+    URGENCY_PRIORITY_POINTS = get_int_env('URGENCY_PRIORITY_POINTS', 100)  # Per level above 5 (Critical = 400)
+    URGENCY_SLA_POINTS = get_int_env('URGENCY_SLA_POINTS', 400)  # At or past breach, scaled down to 0 at the horizon
+    URGENCY_SLA_HORIZON = get_int_env('URGENCY_SLA_HORIZON', 480)  # Minutes left
+    URGENCY_BALL_ON_YOU_POINTS = get_int_env('URGENCY_BALL_ON_YOU_POINTS', 200)  # Open/New: waiting on us
+    URGENCY_STALE_POINTS = get_int_env('URGENCY_STALE_POINTS', 5)  # Per hour since sys_updated_on, added when read
+    URGENCY_STALE_MAX_HOURS = get_int_env('URGENCY_STALE_MAX_HOURS', 48)
+
     # Notification settings
     NOTIFICATION_COOLDOWN = get_int_env('NOTIFICATION_COOLDOWN', 300)
     ENABLE_NOTIFICATIONS = get_bool_env('ENABLE_NOTIFICATIONS', True)
@@ -35,6 +43,86 @@ class BaseConfig:
     # Scheduler settings
     SCHEDULER_API_ENABLED = True
     SLA_CHECK_INTERVAL = get_int_env('SLA_CHECK_INTERVAL', 60)
+    SCHEDULER_MISFIRE_GRACE = get_int_env('SCHEDULER_MISFIRE_GRACE', 30)  # Seconds late before a run is dropped
+    SCHEDULER_LOCK_FILE = os.environ.get('SCHEDULER_LOCK_FILE')  # Unset = <database>.jobs.lock
+    SCHEDULER_HISTORY_SIZE = get_int_env('SCHEDULER_HISTORY_SIZE', 500)  # Job runs kept for /api/scheduler/jobs
+    SCHEDULER_BACKOFF_RATIO = float(os.environ.get('SCHEDULER_BACKOFF_RATIO', 0.5))  # Run/interval that backs off
+    SCHEDULER_MAX_BACKOFF = get_int_env('SCHEDULER_MAX_BACKOFF', 8)  # Longest interval, x the configured one
+
+    # SQLite storage profile (applied on every new connection)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = get_int_env('SQLITE_BUSY_TIMEOUT', 5000)  # ms
+    SQLITE_CACHE_SIZE = get_int_env('SQLITE_CACHE_SIZE', -65536)  # negative = KiB (64 MB)
+    SQLITE_MMAP_SIZE = get_int_env('SQLITE_MMAP_SIZE', 268435456)  # bytes (256 MB)
+    SQLITE_TEMP_STORE = os.environ.get('SQLITE_TEMP_STORE', 'MEMORY')
+    SQLITE_MAINTENANCE_INTERVAL = get_int_env('SQLITE_MAINTENANCE_INTERVAL', 300)  # wal_checkpoint + optimize
+
+    # /api/cases pagination
+    CASES_PAGE_SIZE = get_int_env('CASES_PAGE_SIZE', 500)
+    CASES_MAX_PAGE_SIZE = get_int_env('CASES_MAX_PAGE_SIZE', 5000)
+
+    # /api/cases/search pagination
+    SEARCH_PAGE_SIZE = get_int_env('SEARCH_PAGE_SIZE', 50)
+    SEARCH_MAX_PAGE_SIZE = get_int_env('SEARCH_MAX_PAGE_SIZE', 500)
+
+    # /api/cases/next queue length
+    NEXT_CASES_LIMIT = get_int_env('NEXT_CASES_LIMIT', 10)
+
+    # /api/cases/<number>/history pagination
+    CASE_HISTORY_PAGE_SIZE = get_int_env('CASE_HISTORY_PAGE_SIZE', 100)
+    CASE_HISTORY_MAX_PAGE_SIZE = get_int_env('CASE_HISTORY_MAX_PAGE_SIZE', 1000)
+
+    # Serve active-case reads from the process-local in-memory index
+    ACTIVE_CASE_STORE_ENABLED = get_bool_env('ACTIVE_CASE_STORE_ENABLED', True)
+
+    # Lifecycle of cases missing from imports (0 disables a rule)
+    CASE_DEACTIVATE_AFTER_IMPORTS = get_int_env('CASE_DEACTIVATE_AFTER_IMPORTS', 3)  # Consecutive imports missing
+    CASE_DEACTIVATE_AFTER_HOURS = get_int_env('CASE_DEACTIVATE_AFTER_HOURS', 24)  # Hours since last seen
+    CASE_ARCHIVE_AFTER_DAYS = get_int_env('CASE_ARCHIVE_AFTER_DAYS', 30)  # Inactive days before cases_archive
+    CASE_ARCHIVE_INTERVAL = get_int_env('CASE_ARCHIVE_INTERVAL', 3600)  # Seconds between archive sweeps
+
+    # Response-time percentiles (DDSketch relative accuracy, 0.01 = 1%)
+    RESPONSE_TIME_SKETCH_ACCURACY = float(os.environ.get('RESPONSE_TIME_SKETCH_ACCURACY', 0.01))
+    RESPONSE_TIME_MAX_DAYS = get_int_env('RESPONSE_TIME_MAX_DAYS', 366)  # Longest queryable range
+
+    # Point-in-time snapshots (/api/snapshot replays at most one interval of history)
+    SNAPSHOT_INTERVAL = get_int_env('SNAPSHOT_INTERVAL', 3600)  # Seconds between checkpoints
+    SNAPSHOT_RETENTION_DAYS = get_int_env('SNAPSHOT_RETENTION_DAYS', 90)  # 0 keeps every checkpoint
+
+    # Streaming exports (/api/export/...)
+    EXPORT_BATCH_ROWS = get_int_env('EXPORT_BATCH_ROWS', 2000)  # Rows per cursor fetch and per output chunk
+
+    # flask snow backfill: rows of parsed exports applied per transaction
+    BACKFILL_BATCH_ROWS = get_int_env('BACKFILL_BATCH_ROWS', 50000)
+
+    # Raw upload payloads kept for benchmarks.replay (content-addressed, gzip)
+    INGEST_RECORD_DIR = os.environ.get('INGEST_RECORD_DIR')  # Unset = not recorded
+
+    # Single-writer queue for uploads and scheduled writes
+    WRITE_QUEUE_ENABLED = get_bool_env('WRITE_QUEUE_ENABLED', True)  # Off = write inline in the caller
+    WRITE_QUEUE_MAX_GROUP = get_int_env('WRITE_QUEUE_MAX_GROUP', 16)  # Jobs sharing one commit
+    WRITE_QUEUE_TIMEOUT = get_int_env('WRITE_QUEUE_TIMEOUT', 120)  # Seconds a caller waits for its job
+
+    # Server-Sent Events change feed
+    EVENT_LOG_SIZE = get_int_env('EVENT_LOG_SIZE', 1000)  # Events kept for Last-Event-ID resume
+    EVENT_POLL_INTERVAL = float(os.environ.get('EVENT_POLL_INTERVAL', 0.5))  # Seconds
+    SSE_HEARTBEAT = get_int_env('SSE_HEARTBEAT', 15)  # Seconds between keep-alive comments
+    SSE_MAX_STREAM_SECONDS = get_int_env('SSE_MAX_STREAM_SECONDS', 300)  # Client reconnects after
+    SSE_MAX_SUBSCRIBERS = get_int_env('SSE_MAX_SUBSCRIBERS', 8)  # Open streams per worker; keep under --threads
+    SSE_RETRY_AFTER = get_int_env('SSE_RETRY_AFTER', 60)  # Seconds a refused client polls before retrying
+
+    # Prometheus metrics (/api/metrics)
+    METRICS_ENABLED = get_bool_env('METRICS_ENABLED', True)
+    METRICS_DIR = os.environ.get('METRICS_DIR')  # Shared by gunicorn workers; unset = this process only
+    METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))  # Seconds between snapshots
+
+    # SQL profiler: per-request/job query stats, Server-Timing, slow-query log
+    SQL_PROFILER_ENABLED = get_bool_env('SQL_PROFILER_ENABLED', False)
+    SQL_SLOW_QUERY_MS = get_int_env('SQL_SLOW_QUERY_MS', 100)  # Statements logged as slow
+    SQL_SLOW_QUERY_LOG = os.environ.get('SQL_SLOW_QUERY_LOG')  # File path; unset = app log only
+    SQL_REPEAT_THRESHOLD = get_int_env('SQL_REPEAT_THRESHOLD', 5)  # Same statement this often in one scope = N+1
+    SQL_PROFILE_SLOWEST = get_int_env('SQL_PROFILE_SLOWEST', 5)  # Slowest statements kept per scope
 
 
 class DevelopmentConfig(BaseConfig):
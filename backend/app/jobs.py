@@ -0,0 +1,92 @@
+"""
+Background jobs, and the lock that keeps them to one process per database.
+
+start_services() runs in every process that serves the app (each gunicorn
+worker, or run.py). The first to take an exclusive lock on
+SCHEDULER_LOCK_FILE (default: next to the SQLite database) registers and
+runs the jobs; the others run none, so two workers never both run the SLA
+pass or the archive sweep. The lock is released when its process exits, and
+the worker gunicorn starts in its place takes it over. The runner shares its
+job telemetry through a file beside the lock, so /api/scheduler/jobs answers
+the same from every worker.
+"""
+import os
+from typing import Optional
+
+from app import db
+
+_lock_handle = None
+
+
+def job_state_path(app) -> Optional[str]:
+    """Base path for the job lock and shared telemetry (None for an in-memory database)."""
+    configured = app.config.get('SCHEDULER_LOCK_FILE')
+    if configured:
+        return os.path.splitext(configured)[0]
+    with app.app_context():
+        database = db.engine.url.database
+    if database in (None, '', ':memory:'):
+        return None
+    return f'{database}.jobs'
+
+
+def acquire_job_lock(app) -> bool:
+    """Take the job lock without waiting; True if this process now runs the jobs."""
+    global _lock_handle
+    if _lock_handle is not None:
+        return True
+    base = job_state_path(app)
+    if base is None:
+        return True  # An in-memory database is only ever seen by this process
+    try:
+        import fcntl
+    except ImportError:
+        return True  # No fcntl (Windows): only run.py runs there, as one process
+
+    handle = open(app.config.get('SCHEDULER_LOCK_FILE') or f'{base}.lock', 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    _lock_handle = handle  # Held open (and locked) for the life of the process
+    return True
+
+
+def register_jobs(app, scheduler):
+    """Add the background jobs to the scheduler (before or after it starts)."""
+    from app.services.ingest import check_sla, notify_urgent
+    from app.services.case_lifecycle import archive_inactive_cases
+    from app.services.job_telemetry import scheduled_job
+    from app.services.snapshots import write_snapshot
+    from app.services.write_queue import write_queue
+    from app.storage import run_maintenance
+    from app.sql_profiler import profile_scope
+
+    # Scheduled job for SLA monitoring
+    @scheduled_job(app, scheduler, 'check_sla', app.config.get('SLA_CHECK_INTERVAL', 60))
+    def scheduled_sla_check():
+        """Periodically check SLA status and send notifications."""
+        stats = write_queue.run(check_sla)
+        if app.config.get('ENABLE_NOTIFICATIONS', True):
+            write_queue.run(notify_urgent, group=False)
+        return stats['total']
+
+    # Move long-inactive cases out of the hot table
+    @scheduled_job(app, scheduler, 'archive_cases', app.config.get('CASE_ARCHIVE_INTERVAL', 3600))
+    def scheduled_case_archive():
+        """Archive cases that have been inactive for CASE_ARCHIVE_AFTER_DAYS."""
+        return write_queue.run(archive_inactive_cases)['archived']
+
+    # Checkpoints for point-in-time snapshots
+    @scheduled_job(app, scheduler, 'case_snapshot', app.config.get('SNAPSHOT_INTERVAL', 3600))
+    def scheduled_case_snapshot():
+        """Checkpoint the active case set for /api/snapshot."""
+        return write_queue.run(write_snapshot).get('case_count', 0)
+
+    # Periodic WAL checkpoint and PRAGMA optimize
+    @scheduled_job(app, scheduler, 'sqlite_maintenance', app.config.get('SQLITE_MAINTENANCE_INTERVAL', 300))
+    def scheduled_sqlite_maintenance():
+        """Keep the WAL file bounded and planner statistics current."""
+        with profile_scope('job: sqlite_maintenance'):
+            run_maintenance(db.engine)
@@ -0,0 +1,172 @@
+"""
+Prometheus metrics for /api/metrics.
+
+Request latency per route, upload row counts, recorded upload payloads,
+the SLA status pass, scheduled jobs, the write queue (including pending
+desktop notifications), notification delivery and database connection
+checkout are recorded in a process-local registry. Under gunicorn every
+worker has its own registry: with METRICS_DIR set, each one writes a
+snapshot there every METRICS_FLUSH_INTERVAL seconds and a scrape of any
+worker merges them all.
+"""
+import atexit
+import os
+import threading
+import time
+from typing import Dict
+
+from flask import g, request
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from app.utils.metrics import (
+    CONTENT_TYPE, MetricsRegistry, ProcessMetricsStore, merge_snapshots, render_text
+)
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    'snow_http_request_duration_seconds', 'Time to produce a response, by route.', ('method', 'route'))
+HTTP_REQUESTS = registry.counter(
+    'snow_http_requests_total', 'Responses by route and status code.', ('method', 'route', 'status'))
+
+UPLOADS = registry.counter(
+    'snow_uploads_total', 'Successful uploads.', ('format',))
+UPLOAD_ROWS = registry.counter(
+    'snow_upload_rows_total',
+    'Upload rows by outcome (parsed, skipped, inserted, updated, deactivated).', ('format', 'outcome'))
+UPLOAD_SIZE = registry.histogram(
+    'snow_upload_parsed_rows', 'Parsed rows per upload.', ('format',),
+    buckets=(10, 50, 100, 500, 1000, 5000, 10000, 50000))
+INGEST_RECORDED = registry.counter(
+    'snow_ingest_recorded_payloads_total',
+    'Upload payloads recorded for replay (stored=false: identical to an earlier one).', ('format', 'stored'))
+
+SLA_UPDATE_SECONDS = registry.histogram(
+    'snow_sla_update_duration_seconds', 'Duration of the SLA status pass over active cases.')
+
+WRITE_QUEUE_DEPTH = registry.gauge(
+    'snow_write_queue_depth', 'Jobs waiting for the writer thread (notify_urgent: pending notifications).',
+    ('job',))
+WRITE_QUEUE_WAIT_SECONDS = registry.histogram(
+    'snow_write_queue_wait_seconds', 'Time jobs spent queued before the writer ran them.', ('job',))
+
+SCHEDULER_JOB_SECONDS = registry.histogram(
+    'snow_scheduler_job_duration_seconds', 'Duration of scheduled job runs.', ('job', 'outcome'),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0))
+SCHEDULER_JOB_LAG_SECONDS = registry.histogram(
+    'snow_scheduler_job_lag_seconds', 'How late scheduled jobs started against their scheduled time.', ('job',))
+SCHEDULER_JOB_RUNS = registry.counter(
+    'snow_scheduler_job_runs_total', 'Scheduled job runs by outcome (ok, error, skipped, missed).',
+    ('job', 'outcome'))
+
+NOTIFICATION_DELIVERY_SECONDS = registry.histogram(
+    'snow_notification_delivery_seconds', 'Desktop notification delivery time.', ('delivered',))
+
+DB_CONNECTION_WAIT_SECONDS = registry.histogram(
+    'snow_db_connection_wait_seconds', 'Time to check a connection out of the pool.',
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0))
+
+
+def record_upload(fmt: str, parsed: int, skipped: int, stats: Dict) -> None:
+    """Count one successful upload's rows."""
+    UPLOADS.labels(fmt).inc()
+    UPLOAD_SIZE.labels(fmt).observe(parsed)
+    for outcome, count in (('parsed', parsed), ('skipped', skipped),
+                           ('inserted', stats['new_cases']), ('updated', stats['updated_cases']),
+                           ('deactivated', stats['deactivated'])):
+        UPLOAD_ROWS.labels(fmt, outcome).inc(count)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    # Log as QueuePool (under "sqlalchemy"), not as a child of the app logger
+    _sqla_logger_namespace = 'sqlalchemy.pool.impl.QueuePool'
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_CONNECTION_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+# -- cross-worker snapshots ---------------------------------------------------
+
+_store = None
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def _flush() -> None:
+    if _store is not None:
+        _store.write(registry.snapshot())
+
+
+def _run_flusher(interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        try:
+            _flush()
+        except OSError:
+            pass  # Directory gone; retried next interval
+
+
+def _ensure_flusher(interval: float) -> None:
+    """Start this process's flush thread (once per pid, so after a fork too)."""
+    global _flusher_pid
+    if _store is None or _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        threading.Thread(target=_run_flusher, args=(interval,), name='metrics-flush', daemon=True).start()
+        atexit.register(_flush)
+
+
+def render_metrics() -> str:
+    """Text exposition of this process's metrics, merged with other workers'."""
+    if _store is None:
+        return render_text(registry.snapshot())
+    _flush()
+    return render_text(merge_snapshots(_store.read()))
+
+
+def init_metrics(app) -> None:
+    """
+    Register the request hooks and the timed connection pool.
+
+    Must run before db.init_app, which reads the engine options.
+    """
+    global _store
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    directory = app.config.get('METRICS_DIR')
+    _store = ProcessMetricsStore(directory) if directory else None
+    interval = app.config.get('METRICS_FLUSH_INTERVAL', 5)
+
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if url.database not in (None, '', ':memory:'):
+        # In-memory SQLite keeps Flask-SQLAlchemy's StaticPool
+        options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        options.setdefault('poolclass', TimedQueuePool)
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+        _ensure_flusher(interval)
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            HTTP_REQUEST_SECONDS.labels(request.method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(request.method, route, response.status_code).inc()
+        return response
+
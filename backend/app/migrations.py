@@ -0,0 +1,413 @@
+"""
+Lightweight versioned schema migrations for the SQLite database.
+
+Each migration is a list of idempotent steps. Every step runs in its own
+BEGIN IMMEDIATE transaction, so concurrent workers starting at the same
+time serialize on SQLite's write lock instead of racing, and long index
+builds or backfills never hold the lock for more than one step or batch.
+The applied version is recorded in the schema_migrations table once all
+steps of a migration have finished; an interrupted migration simply
+re-runs its (idempotent) steps on the next start.
+"""
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models.case_history import EVENT_CODES, EVENT_TYPES
+
+
+SCHEMA_TABLE = 'schema_migrations'
+
+# How long a migration transaction waits for another writer (ms)
+MIGRATION_BUSY_TIMEOUT = 60000
+
+
+class Migration:
+    def __init__(self, version: int, description: str, steps: Sequence[Callable]):
+        self.version = version
+        self.description = description
+        self.steps = list(steps)
+
+    def __repr__(self):
+        return f'<Migration {self.version}: {self.description}>'
+
+
+# -- step helpers -------------------------------------------------------------
+
+def create_all_tables():
+    """Create any missing tables (with their indexes) from the current models."""
+    def step(conn):
+        import app.models  # noqa: F401  make sure every model is registered
+        db.metadata.create_all(bind=conn)
+    return step
+
+
+def create_index(name: str, table: str, *columns: str, unique: bool = False):
+    """Build an index if it does not exist yet."""
+    def step(conn):
+        conn.exec_driver_sql(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+            f"ON {table} ({', '.join(columns)})"
+        )
+    return step
+
+
+def drop_index(name: str):
+    """Drop an index if it exists."""
+    def step(conn):
+        conn.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+    return step
+
+
+def _columns(conn, table: str) -> set:
+    return {row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table})')}
+
+
+def add_column(table: str, column: str, ddl: str):
+    """Add a column unless the table already has it (e.g. created by create_all)."""
+    def step(conn):
+        if column not in _columns(conn, table):
+            conn.exec_driver_sql(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}')
+    return step
+
+
+def backfill(table: str, assignments: str, where: str, batch_size: int = 1000):
+    """
+    Update rows matching `where` in batches of `batch_size`, one
+    transaction per batch. `where` must stop matching once a row has been
+    filled in, so the backfill can resume after an interruption.
+    """
+    def step(conn):
+        while True:
+            result = conn.exec_driver_sql(
+                f'UPDATE {table} SET {assignments} WHERE rowid IN '
+                f'(SELECT rowid FROM {table} WHERE {where} LIMIT {int(batch_size)})'
+            )
+            if result.rowcount < batch_size:
+                return
+            _commit_and_reopen(conn)
+    return step
+
+
+def backfill_legacy_history(batch_size: int = 1000):
+    """Derive recorded_at/new_state/event_type for legacy snapshot rows."""
+    def step(conn):
+        if 'snapshot_at' not in _columns(conn, 'case_history'):
+            return
+        backfill(
+            'case_history',
+            "recorded_at = snapshot_at, new_state = sub_state, event_type = CASE "
+            "WHEN previous_state IS NULL THEN 'new_case' "
+            "WHEN lower(sub_state) IN ('open', 'new') "
+            "AND lower(previous_state) NOT IN ('open', 'new') THEN 'incoming' "
+            "WHEN lower(previous_state) IN ('open', 'new') "
+            "AND lower(coalesce(sub_state, '')) NOT IN ('open', 'new') THEN 'handled' "
+            "ELSE 'state_change' END",
+            'recorded_at IS NULL AND snapshot_at IS NOT NULL',
+            batch_size
+        )(conn)
+    return step
+
+
+def when_column(table: str, column: str, *steps: Callable):
+    """Run `steps` only if `table` has `column` (i.e. it has a given legacy shape)."""
+    def step(conn):
+        if column in _columns(conn, table):
+            for inner in steps:
+                inner(conn)
+    return step
+
+
+def seed_response_times():
+    """Build the response-time sketches and pending waits from existing history."""
+    def step(conn):
+        from app.services.response_times import rebuild_response_times
+        rebuild_response_times(conn)
+    return step
+
+
+def seed_urgency_scores():
+    """Score the existing active cases, so /api/cases/next is ordered before the first SLA pass."""
+    def step(conn):
+        from app.services.sla_monitor import SLAMonitor
+        SLAMonitor().rescore_all(conn)
+    return step
+
+
+def compact_case_history(batch_size: int = 5000):
+    """
+    Rebuild a text-encoded case_history into the interned/enum layout.
+
+    Interns every state and priority, copies rows in id order into
+    case_history_compact (one transaction per batch; resumes from the
+    highest copied id), then swaps the tables. No-op once the table has
+    state ids.
+    """
+    event_case = ' '.join(
+        f"WHEN '{name}' THEN {code}" for code, name in enumerate(EVENT_TYPES, start=1)
+    )
+
+    def step(conn):
+        columns = _columns(conn, 'case_history')
+        if 'new_state' not in columns or 'new_state_id' in columns:
+            return
+
+        for lookup, source_columns in (('case_states', ('previous_state', 'new_state')),
+                                       ('case_priorities', ('priority',))):
+            for column in source_columns:
+                conn.exec_driver_sql(
+                    f'INSERT OR IGNORE INTO {lookup} (name) SELECT DISTINCT {column} '
+                    f'FROM case_history WHERE {column} IS NOT NULL'
+                )
+
+        conn.exec_driver_sql(
+            'CREATE TABLE IF NOT EXISTS case_history_compact ('
+            'id INTEGER NOT NULL PRIMARY KEY, '
+            'case_number VARCHAR(20) NOT NULL, '
+            'previous_state_id INTEGER REFERENCES case_states (id), '
+            'new_state_id INTEGER REFERENCES case_states (id), '
+            'event_type SMALLINT NOT NULL, '
+            'sla_minutes_left INTEGER, '
+            'priority_id INTEGER REFERENCES case_priorities (id), '
+            'recorded_at DATETIME)'
+        )
+        _commit_and_reopen(conn)
+
+        while True:
+            result = conn.exec_driver_sql(
+                'INSERT INTO case_history_compact (id, case_number, previous_state_id, new_state_id, '
+                'event_type, sla_minutes_left, priority_id, recorded_at) '
+                'SELECT h.id, h.case_number, ps.id, ns.id, '
+                f'CASE h.event_type {event_case} ELSE {EVENT_CODES["state_change"]} END, '
+                'h.sla_minutes_left, p.id, h.recorded_at '
+                'FROM case_history h '
+                'LEFT JOIN case_states ps ON ps.name = h.previous_state '
+                'LEFT JOIN case_states ns ON ns.name = h.new_state '
+                'LEFT JOIN case_priorities p ON p.name = h.priority '
+                'WHERE h.id > (SELECT coalesce(max(id), 0) FROM case_history_compact) '
+                f'ORDER BY h.id LIMIT {int(batch_size)}'
+            )
+            if result.rowcount < batch_size:
+                break
+            _commit_and_reopen(conn)
+
+        conn.exec_driver_sql('DROP TABLE case_history')
+        conn.exec_driver_sql('ALTER TABLE case_history_compact RENAME TO case_history')
+    return step
+
+
+# Letters stripped from case numbers (CS0012345 -> 0012345 and 12345) so a
+# search for the digits alone finds the case
+NUMBER_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+
+def _search_row(prefix: str) -> str:
+    digits = f"ltrim({prefix}number, '{NUMBER_LETTERS}')"
+    return f"{prefix}id, {prefix}number, {digits} || ' ' || ltrim({digits}, '0'), {prefix}short_description"
+
+
+def create_case_search():
+    """
+    Build the cases_fts full-text index over case numbers and descriptions.
+
+    A contentless FTS5 table (it stores only the index, not the text) kept
+    in sync with cases by triggers, then filled from the existing rows. No-op
+    where SQLite is built without FTS5; /api/cases/search then answers 503.
+    """
+    columns = 'rowid, number, number_digits, short_description'
+
+    def step(conn):
+        try:
+            conn.exec_driver_sql(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS cases_fts USING fts5('
+                "number, number_digits, short_description, content='', prefix='2 3', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+        except OperationalError as e:
+            if 'fts5' in str(e):
+                return
+            raise
+        # Matches on the case number outweigh matches in the description
+        conn.exec_driver_sql("INSERT INTO cases_fts (cases_fts, rank) VALUES ('rank', 'bm25(10.0, 10.0, 1.0)')")
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS cases_fts_insert AFTER INSERT ON cases BEGIN '
+            f"INSERT INTO cases_fts ({columns}) VALUES ({_search_row('new.')}); END"
+        )
+        # A contentless table deletes by the indexed values, so the old ones are passed back
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS cases_fts_delete AFTER DELETE ON cases BEGIN '
+            f"INSERT INTO cases_fts (cases_fts, {columns}) VALUES ('delete', {_search_row('old.')}); END"
+        )
+        conn.exec_driver_sql(
+            'CREATE TRIGGER IF NOT EXISTS cases_fts_update AFTER UPDATE OF number, short_description ON cases '
+            'WHEN old.number IS NOT new.number OR old.short_description IS NOT new.short_description BEGIN '
+            f"INSERT INTO cases_fts (cases_fts, {columns}) VALUES ('delete', {_search_row('old.')}); "
+            f"INSERT INTO cases_fts ({columns}) VALUES ({_search_row('new.')}); END"
+        )
+        conn.exec_driver_sql("INSERT INTO cases_fts (cases_fts) VALUES ('delete-all')")
+        conn.exec_driver_sql(f"INSERT INTO cases_fts ({columns}) SELECT {_search_row('')} FROM cases")
+    return step
+
+
+# -- registry -----------------------------------------------------------------
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'baseline schema', [
+        create_all_tables(),
+    ]),
+    # Databases created before state-transition tracking stored per-upload
+    # snapshots (sub_state, snapshot_at, state_changed) in case_history
+    Migration(2, 'case_history state transition columns', [
+        when_column(
+            'case_history', 'snapshot_at',
+            add_column('case_history', 'new_state', 'VARCHAR(100)'),
+            add_column('case_history', 'event_type', "VARCHAR(20) NOT NULL DEFAULT 'state_change'"),
+            add_column('case_history', 'recorded_at', 'DATETIME'),
+            backfill_legacy_history(),
+        ),
+        create_index('ix_case_history_recorded_at', 'case_history', 'recorded_at'),
+    ]),
+    Migration(3, 'composite indexes for hot queries', [
+        create_index('ix_cases_active_sla_minutes', 'cases', 'is_active', 'sla_minutes_left'),
+        create_index('ix_cases_active_sla_status', 'cases', 'is_active', 'sla_status', 'sla_minutes_left'),
+        create_index('ix_cases_active_sub_state', 'cases', 'is_active', 'sub_state', 'sla_minutes_left'),
+        create_index('ix_cases_active_priority', 'cases', 'is_active', 'priority', 'sla_minutes_left'),
+        create_index('ix_cases_active_region', 'cases', 'is_active', 'region'),
+        create_index('ix_case_history_event_type_recorded_at', 'case_history', 'event_type', 'recorded_at'),
+        drop_index('ix_case_history_event_type'),
+    ]),
+    Migration(4, 'case lifecycle columns and archive table', [
+        add_column('cases', 'missing_count', 'INTEGER NOT NULL DEFAULT 0'),
+        add_column('cases', 'last_seen_at', 'DATETIME'),
+        add_column('cases', 'deactivated_at', 'DATETIME'),
+        backfill('cases', 'last_seen_at = updated_at',
+                 'last_seen_at IS NULL AND updated_at IS NOT NULL'),
+        backfill('cases', 'deactivated_at = updated_at',
+                 'is_active = 0 AND deactivated_at IS NULL AND updated_at IS NOT NULL'),
+        create_index('ix_cases_active_deactivated_at', 'cases', 'is_active', 'deactivated_at'),
+        create_all_tables(),
+    ]),
+    Migration(5, 'compact case_history: interned states/priorities, event type codes', [
+        create_all_tables(),
+        compact_case_history(),
+        create_index('ix_case_history_case_number', 'case_history', 'case_number'),
+        create_index('ix_case_history_recorded_at', 'case_history', 'recorded_at'),
+        create_index('ix_case_history_event_type_recorded_at', 'case_history', 'event_type', 'recorded_at'),
+    ]),
+    Migration(6, 'per-case timeline covering index', [
+        create_index('ix_case_history_case_timeline', 'case_history',
+                     'case_number', 'recorded_at', 'id', 'new_state_id', 'event_type'),
+        drop_index('ix_case_history_case_number'),
+    ]),
+    Migration(7, 'response-time sketches', [
+        add_column('cases', 'awaiting_response_since', 'DATETIME'),
+        create_all_tables(),
+        seed_response_times(),
+    ]),
+    Migration(8, 'case snapshot checkpoints', [
+        create_all_tables(),
+    ]),
+    Migration(9, 'full-text search over case numbers and descriptions', [
+        create_case_search(),
+    ]),
+    Migration(10, 'indexed urgency score', [
+        add_column('cases', 'urgency_score', 'INTEGER NOT NULL DEFAULT 0'),
+        create_index('ix_cases_active_urgency', 'cases', 'is_active', 'urgency_score'),
+        seed_urgency_scores(),
+    ]),
+]
+
+
+# -- runner -------------------------------------------------------------------
+
+def _begin(conn) -> None:
+    conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def _commit_and_reopen(conn) -> None:
+    conn.exec_driver_sql('COMMIT')
+    _begin(conn)
+
+
+def _ensure_schema_table(conn) -> None:
+    conn.exec_driver_sql(
+        f'CREATE TABLE IF NOT EXISTS {SCHEMA_TABLE} ('
+        'version INTEGER PRIMARY KEY, description VARCHAR(200), applied_at DATETIME)'
+    )
+
+
+def _applied_version(conn) -> int:
+    return conn.exec_driver_sql(f'SELECT MAX(version) FROM {SCHEMA_TABLE}').scalar() or 0
+
+
+def get_schema_version(engine=None) -> int:
+    """Return the highest applied migration version (0 for an unmanaged database)."""
+    engine = engine or db.engine
+    with engine.connect() as conn:
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {'name': SCHEMA_TABLE}).scalar()
+        return _applied_version(conn) if exists else 0
+
+
+def run_migrations(engine=None, logger=None, target: Optional[int] = None) -> List[int]:
+    """
+    Apply pending migrations up to `target` (default: latest).
+
+    Returns the versions applied by this call.
+    """
+    engine = engine or db.engine
+    target = target if target is not None else MIGRATIONS[-1].version
+    applied = []
+
+    with engine.connect() as conn:
+        driver = conn.connection.driver_connection
+        previous_isolation = driver.isolation_level
+        # Manage transactions by hand so we can take the write lock up front
+        driver.isolation_level = None
+        previous_timeout = conn.exec_driver_sql('PRAGMA busy_timeout').scalar()
+        conn.exec_driver_sql(f'PRAGMA busy_timeout = {MIGRATION_BUSY_TIMEOUT}')
+        try:
+            _begin(conn)
+            _ensure_schema_table(conn)
+            conn.exec_driver_sql('COMMIT')
+
+            for migration in MIGRATIONS:
+                if migration.version > target:
+                    break
+
+                _begin(conn)
+                if _applied_version(conn) >= migration.version:
+                    conn.exec_driver_sql('COMMIT')
+                    continue
+
+                started = datetime.utcnow()
+                for step in migration.steps:
+                    step(conn)
+                    _commit_and_reopen(conn)
+
+                conn.exec_driver_sql(
+                    f'INSERT OR IGNORE INTO {SCHEMA_TABLE} (version, description, applied_at) '
+                    'VALUES (?, ?, ?)',
+                    (migration.version, migration.description, datetime.utcnow().isoformat(' '))
+                )
+                conn.exec_driver_sql('COMMIT')
+                applied.append(migration.version)
+
+                if logger:
+                    elapsed = (datetime.utcnow() - started).total_seconds()
+                    logger.info(f'Applied migration {migration.version} '
+                                f'({migration.description}) in {elapsed:.2f}s')
+        except Exception:
+            if driver.in_transaction:
+                conn.exec_driver_sql('ROLLBACK')
+            raise
+        finally:
+            conn.commit()
+            conn.exec_driver_sql(f'PRAGMA busy_timeout = {int(previous_timeout)}')
+            driver.isolation_level = previous_isolation
+
+    return applied
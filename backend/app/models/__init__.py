@@ -2,5 +2,11 @@ from app.models.case import Case
 from app.models.case_history import CaseHistory
 from app.models.settings import Settings
 from app.models.notification import NotificationLog
+from app.models.change_event import ChangeEvent
+from app.models.case_archive import CaseArchive
+from app.models.lookup import CaseState, CasePriority
+from app.models.response_time_sketch import ResponseTimeSketch
+from app.models.case_snapshot import CaseSnapshot
 
-__all__ = ['Case', 'CaseHistory', 'Settings', 'NotificationLog']
+__all__ = ['Case', 'CaseHistory', 'Settings', 'NotificationLog', 'ChangeEvent', 'CaseArchive',
+           'CaseState', 'CasePriority', 'ResponseTimeSketch', 'CaseSnapshot']
@@ -4,6 +4,21 @@ from app import db
 
 class Case(db.Model):
     __tablename__ = 'cases'
+    __table_args__ = (
+        # Active set ordered by SLA: /api/cases default sort, SLA pass
+        db.Index('ix_cases_active_sla_minutes', 'is_active', 'sla_minutes_left'),
+        # get_urgent_cases / get_warning_cases, overview SLA breakdown
+        db.Index('ix_cases_active_sla_status', 'is_active', 'sla_status', 'sla_minutes_left'),
+        # get_cases filters, overview state/priority breakdowns
+        db.Index('ix_cases_active_sub_state', 'is_active', 'sub_state', 'sla_minutes_left'),
+        db.Index('ix_cases_active_priority', 'is_active', 'priority', 'sla_minutes_left'),
+        # Overview region breakdown
+        db.Index('ix_cases_active_region', 'is_active', 'region'),
+        # Archive sweep: inactive cases deactivated before a cutoff
+        db.Index('ix_cases_active_deactivated_at', 'is_active', 'deactivated_at'),
+        # /api/cases/next: top of the active set by urgency (rowid breaks ties)
+        db.Index('ix_cases_active_urgency', 'is_active', 'urgency_score'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     number = db.Column(db.String(20), unique=True, nullable=False, index=True)
@@ -23,9 +38,22 @@ class Case(db.Model):
     last_notification_at = db.Column(db.DateTime, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
 
+    # Lifecycle: consecutive imports the case was missing from, when it was
+    # last seen in an import and when it was deactivated for being absent
+    missing_count = db.Column(db.Integer, nullable=False, default=0)
+    last_seen_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow)
+    deactivated_at = db.Column(db.DateTime, nullable=True)
+
+    # Start of the current wait for a response (new case or 'incoming'
+    # event), cleared by the 'handled' event that ends it
+    awaiting_response_since = db.Column(db.DateTime, nullable=True)
+
     # Computed SLA status
     sla_status = db.Column(db.String(20), default='unknown')  # critical, warning, ok, unknown, breached
 
+    # Computed by the SLA pass from priority, SLA left, state and staleness; higher = work on it sooner
+    urgency_score = db.Column(db.Integer, nullable=False, default=0)
+
     def to_dict(self):
         return {
             'id': self.id,
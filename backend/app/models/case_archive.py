@@ -0,0 +1,50 @@
+from datetime import datetime
+from app import db
+
+
+class CaseArchive(db.Model):
+    """
+    Cases that have been inactive for longer than CASE_ARCHIVE_AFTER_DAYS.
+
+    Same columns as `cases` (minus the lifecycle counters), moved out so
+    the hot table and its indexes only hold the working set. A case that
+    shows up in an import again is moved back.
+    """
+    __tablename__ = 'cases_archive'
+
+    id = db.Column(db.Integer, primary_key=True)
+    number = db.Column(db.String(20), unique=True, nullable=False, index=True)
+    short_description = db.Column(db.Text, nullable=True)
+    time_to_respond = db.Column(db.String(50), nullable=True)
+    sla_time_left = db.Column(db.String(50), nullable=True)
+    sla_minutes_left = db.Column(db.Integer, nullable=True)
+    sub_state = db.Column(db.String(100), nullable=True)
+    region = db.Column(db.String(50), nullable=True)
+    priority = db.Column(db.String(50), nullable=True)
+    priority_level = db.Column(db.Integer, nullable=True)
+    sys_updated_on = db.Column(db.DateTime, nullable=True)
+    sla_status = db.Column(db.String(20), nullable=True)
+
+    created_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    last_seen_at = db.Column(db.DateTime, nullable=True)
+    deactivated_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'number': self.number,
+            'short_description': self.short_description,
+            'sub_state': self.sub_state,
+            'region': self.region,
+            'priority': self.priority,
+            'sla_status': self.sla_status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_seen_at': self.last_seen_at.isoformat() if self.last_seen_at else None,
+            'deactivated_at': self.deactivated_at.isoformat() if self.deactivated_at else None,
+            'archived_at': self.archived_at.isoformat() if self.archived_at else None
+        }
+
+    def __repr__(self):
+        return f'<CaseArchive {self.number}>'
@@ -8,32 +8,82 @@ STATES_BALL_ON_YOU = {'open', 'new'}
 # States where ball is on customer side (you handled it)
 STATES_BALL_ON_CUSTOMER = {'pending customer acceptance', 'pending customer'}
 
+# Event types, stored as their 1-based position (never reorder, only append)
+EVENT_TYPES = ('new_case', 'incoming', 'handled', 'state_change', 'deactivated', 'reactivated')
+EVENT_CODES = {name: code for code, name in enumerate(EVENT_TYPES, start=1)}
+
+
+class EventTypeCode(db.TypeDecorator):
+    """Event type name in Python, small integer code in the database."""
+    impl = db.SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else EVENT_CODES[value]
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else EVENT_TYPES[value - 1]
+
 
 class CaseHistory(db.Model):
-    """Stores state change events for tracking metrics."""
+    """
+    Stores state change events for tracking metrics.
+
+    States and priorities are interned in case_states / case_priorities and
+    the event type is a small integer code, so each row is a handful of
+    integers plus the case number and timestamp. The previous_state,
+    new_state and priority attributes resolve the names through the
+    process-wide lookup caches.
+    """
     __tablename__ = 'case_history'
+    __table_args__ = (
+        # Daily new/incoming/handled counts: event_type = ? AND recorded_at BETWEEN
+        db.Index('ix_case_history_event_type_recorded_at', 'event_type', 'recorded_at'),
+        # Per-case timeline: case_number = ? ORDER BY recorded_at, id. The id is
+        # spelled out so the trailing new_state_id/event_type (which make the
+        # time-in-state pass index-only) do not break that order
+        db.Index('ix_case_history_case_timeline', 'case_number', 'recorded_at', 'id',
+                 'new_state_id', 'event_type'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    case_number = db.Column(db.String(20), nullable=False, index=True)
+    case_number = db.Column(db.String(20), nullable=False)
 
     # State transition
-    previous_state = db.Column(db.String(100), nullable=True)
-    new_state = db.Column(db.String(100), nullable=True)
+    previous_state_id = db.Column(db.Integer, db.ForeignKey('case_states.id'), nullable=True)
+    new_state_id = db.Column(db.Integer, db.ForeignKey('case_states.id'), nullable=True)
 
     # Event type for easy querying
     # 'new_case' - case first appeared
     # 'incoming' - switched TO open/new (customer messaged)
     # 'handled' - switched FROM open/new (you responded)
     # 'state_change' - other state change
-    event_type = db.Column(db.String(20), nullable=False, default='state_change', index=True)
+    # 'deactivated' - missing from imports past the grace period
+    # 'reactivated' - showed up again after being deactivated or archived
+    event_type = db.Column(EventTypeCode, nullable=False, default='state_change')
 
     # Additional context
     sla_minutes_left = db.Column(db.Integer, nullable=True)
-    priority = db.Column(db.String(50), nullable=True)
+    priority_id = db.Column(db.Integer, db.ForeignKey('case_priorities.id'), nullable=True)
 
     # Timestamp
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
+    @property
+    def previous_state(self):
+        from app.services.history_writer import state_lookup
+        return state_lookup.name_for(self.previous_state_id)
+
+    @property
+    def new_state(self):
+        from app.services.history_writer import state_lookup
+        return state_lookup.name_for(self.new_state_id)
+
+    @property
+    def priority(self):
+        from app.services.history_writer import priority_lookup
+        return priority_lookup.name_for(self.priority_id)
+
     @staticmethod
     def determine_event_type(previous_state, new_state, is_new_case=False):
         """Determine the event type based on state transition."""
@@ -0,0 +1,31 @@
+from datetime import datetime
+from app import db
+
+
+class CaseSnapshot(db.Model):
+    """
+    Periodic checkpoint of the active case set.
+
+    The payload is a zlib-compressed, column-oriented JSON document (see
+    app.services.snapshots). A point-in-time view is rebuilt from the
+    latest checkpoint at or before the requested time plus the history
+    recorded after it, so the replay never spans more than one interval.
+    """
+    __tablename__ = 'case_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    taken_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, unique=True, index=True)
+    generation = db.Column(db.Integer, nullable=False, default=0)  # data generation when taken
+    case_count = db.Column(db.Integer, nullable=False, default=0)
+    payload = db.Column(db.LargeBinary, nullable=False)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'taken_at': self.taken_at.isoformat() if self.taken_at else None,
+            'case_count': self.case_count,
+            'size': len(self.payload) if self.payload is not None else 0
+        }
+
+    def __repr__(self):
+        return f'<CaseSnapshot {self.taken_at}: {self.case_count} cases>'
@@ -0,0 +1,29 @@
+import json
+from datetime import datetime
+from app import db
+
+
+class ChangeEvent(db.Model):
+    """Bounded log of change events pushed to dashboards over SSE."""
+    __tablename__ = 'change_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # 'upload' - an upload finished
+    # 'state_change' - a case changed sub_state (same record as stats['state_changes'])
+    # 'sla_transition' - a case moved between SLA statuses
+    # 'notification' - a notification was logged
+    event_type = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text, nullable=True)  # JSON
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_type': self.event_type,
+            'payload': json.loads(self.payload) if self.payload else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+    def __repr__(self):
+        return f'<ChangeEvent {self.id}: {self.event_type}>'
@@ -0,0 +1,23 @@
+from app import db
+
+
+class CaseState(db.Model):
+    """Interned case state names referenced by case_history."""
+    __tablename__ = 'case_states'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f'<CaseState {self.id}: {self.name}>'
+
+
+class CasePriority(db.Model):
+    """Interned priority labels referenced by case_history."""
+    __tablename__ = 'case_priorities'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f'<CasePriority {self.id}: {self.name}>'
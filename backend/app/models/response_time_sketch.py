@@ -0,0 +1,27 @@
+from datetime import datetime
+from app import db
+
+
+class ResponseTimeSketch(db.Model):
+    """
+    Response-time distribution (incoming -> handled, in seconds) for one
+    day, priority and region, stored as a serialized DDSketch.
+
+    Sketches are merged in place at ingest and merged again at query time,
+    so percentiles over any date range never read case_history.
+    """
+    __tablename__ = 'response_time_sketches'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'priority', 'region', name='uq_response_time_sketches_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)  # UTC day the response happened
+    priority = db.Column(db.String(50), nullable=False)
+    region = db.Column(db.String(50), nullable=False)
+    sample_count = db.Column(db.Integer, nullable=False, default=0)
+    sketch = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ResponseTimeSketch {self.day} {self.priority} {self.region}: {self.sample_count}>'
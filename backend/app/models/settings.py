@@ -37,6 +37,8 @@ class Settings(db.Model):
         else:
             setting.value = str(value)
 
+        from app.services.data_generation import bump_generation
+        bump_generation()
         db.session.commit()
         return setting
 
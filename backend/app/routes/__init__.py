@@ -1,4 +1,5 @@
 from app.routes.api import api_bp
 from app.routes.upload import upload_bp
+from app.routes.export import export_bp
 
-__all__ = ['api_bp', 'upload_bp']
+__all__ = ['api_bp', 'upload_bp', 'export_bp']
@@ -1,16 +1,40 @@
-from flask import Blueprint, jsonify, request, current_app
+import time
+from datetime import date, datetime, timedelta, timezone
+from flask import Blueprint, Response, jsonify, request, current_app
 from app.models.case import Case
+from app.models.case_archive import CaseArchive
 from app.models.settings import Settings
 from app.services.sla_monitor import SLAMonitor
 from app.services.statistics_service import StatisticsService
 from app.services.notification_service import NotificationService
+from app.services.case_reader import CaseReader, parse_fields
+from app.services.case_search import CaseSearch
+from app.services.case_timeline import CaseTimeline
+from app.services.response_times import response_time_percentiles
+from app.services.snapshots import snapshot_at
+from app.services.job_telemetry import job_telemetry
+from app.services.active_case_store import active_case_store
+from app.services.data_generation import bump_generation
+from app.services.event_service import (
+    broadcaster, publish_event, get_events_since, get_oldest_event_id, get_latest_event_id
+)
+from app.utils.etag import conditional_on_generation
+from app.utils.fast_json import json_response
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, render_metrics
 
 api_bp = Blueprint('api', __name__)
 
 
 @api_bp.route('/cases', methods=['GET'])
+@conditional_on_generation
 def get_cases():
-    """Get all active cases with optional filtering."""
+    """
+    Get active cases with optional filtering, keyset pagination and
+    field projection.
+
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page;
+    `fields=number,sla_minutes_left` limits the columns returned.
+    """
     # Query parameters
     status = request.args.get('status')
     priority = request.args.get('priority')
@@ -18,33 +42,91 @@ def get_cases():
     include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
     sort_by = request.args.get('sort_by', 'sla_minutes_left')
     sort_order = request.args.get('sort_order', 'asc')
+    cursor = request.args.get('cursor')
 
-    if include_inactive:
-        query = Case.query
-    else:
-        query = Case.query.filter_by(is_active=True)
-
-    # Apply filters
-    if status:
-        query = query.filter(Case.sub_state == status)
-    if priority:
-        query = query.filter(Case.priority == priority)
-    if sla_status:
-        query = query.filter(Case.sla_status == sla_status)
-
-    # Apply sorting
-    sort_column = getattr(Case, sort_by, Case.sla_minutes_left)
-    if sort_order == 'desc':
-        query = query.order_by(sort_column.desc().nullslast())
-    else:
-        query = query.order_by(sort_column.asc().nullslast())
+    max_limit = current_app.config.get('CASES_MAX_PAGE_SIZE', 5000)
+    limit = request.args.get('limit', current_app.config.get('CASES_PAGE_SIZE', 500), type=int)
+    limit = max(1, min(limit or 1, max_limit))
 
-    cases = query.all()
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        use_store = (current_app.config.get('ACTIVE_CASE_STORE_ENABLED', True)
+                     and active_case_store.can_serve(include_inactive, sort_by))
+        reader = active_case_store if use_store else CaseReader()
+        page = reader.list_cases(
+            status=status,
+            priority=priority,
+            sla_status=sla_status,
+            include_inactive=include_inactive,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit,
+            cursor=cursor,
+            fields=fields
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return json_response(page)
+
+
+@api_bp.route('/cases/search', methods=['GET'])
+@conditional_on_generation
+def search_cases():
+    """
+    Full-text search over case numbers and short descriptions.
+
+    `q` is free text; every word must match the start of a word in the
+    number or description ("12345" also finds CS0012345). Results come most
+    relevant first and take the filters, projection and page size of
+    /api/cases; pass `next_cursor` back as `cursor` for the next page.
+    """
+    max_limit = current_app.config.get('SEARCH_MAX_PAGE_SIZE', 500)
+    limit = request.args.get('limit', current_app.config.get('SEARCH_PAGE_SIZE', 50), type=int)
+    limit = max(1, min(limit or 1, max_limit))
 
-    return jsonify({
-        'cases': [case.to_dict() for case in cases],
-        'total': len(cases)
-    })
+    try:
+        page = CaseSearch().search(
+            request.args.get('q', ''),
+            status=request.args.get('status'),
+            priority=request.args.get('priority'),
+            sla_status=request.args.get('sla_status'),
+            include_inactive=request.args.get('include_inactive', 'false').lower() == 'true',
+            limit=limit,
+            cursor=request.args.get('cursor'),
+            fields=parse_fields(request.args.get('fields'))
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+
+    return json_response(page)
+
+
+@api_bp.route('/cases/next', methods=['GET'])
+def get_next_cases():
+    """
+    The active cases to work next, most urgent first.
+
+    Each case carries its `urgency_score` (see SLAMonitor.calculate_urgency_score
+    and staleness_points); `limit` sets how many, `fields` limits the other
+    columns returned. Staleness moves the order without any write, so the
+    ETag hashes the response rather than the data generation.
+    """
+    max_limit = current_app.config.get('CASES_MAX_PAGE_SIZE', 5000)
+    limit = request.args.get('limit', current_app.config.get('NEXT_CASES_LIMIT', 10), type=int)
+    limit = max(1, min(limit or 1, max_limit))
+
+    try:
+        fields = parse_fields(request.args.get('fields'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    response = json_response({'cases': CaseReader().list_next(limit, fields)})
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
 
 
 @api_bp.route('/cases/<case_number>', methods=['GET'])
@@ -52,26 +134,64 @@ def get_case(case_number):
     """Get details for a specific case."""
     case = Case.query.filter_by(number=case_number).first()
     if not case:
+        archived = CaseArchive.query.filter_by(number=case_number).first()
+        if archived:
+            return jsonify(dict(archived.to_dict(), archived=True))
         return jsonify({'error': 'Case not found'}), 404
     return jsonify(case.to_dict())
 
 
+@api_bp.route('/cases/<case_number>/history', methods=['GET'])
+def get_case_history(case_number):
+    """
+    Get one case's timeline: a keyset page of history events plus the time
+    spent in each state.
+
+    Events are newest first (`order=asc` for oldest first); pass the
+    returned `next_cursor` back as `cursor` for the next page.
+    """
+    max_limit = current_app.config.get('CASE_HISTORY_MAX_PAGE_SIZE', 1000)
+    limit = request.args.get('limit', current_app.config.get('CASE_HISTORY_PAGE_SIZE', 100), type=int)
+    limit = max(1, min(limit or 1, max_limit))
+    cursor = request.args.get('cursor')
+
+    timeline = CaseTimeline()
+    try:
+        page = timeline.list_events(case_number, limit=limit, cursor=cursor,
+                                    order=request.args.get('order', 'desc'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not page['events'] and not cursor:
+        known = (Case.query.filter_by(number=case_number).first()
+                 or CaseArchive.query.filter_by(number=case_number).first())
+        if not known:
+            return jsonify({'error': 'Case not found'}), 404
+
+    return json_response(dict(case_number=case_number, **page, **timeline.time_in_state(case_number)))
+
+
 @api_bp.route('/cases/urgent', methods=['GET'])
+@conditional_on_generation
 def get_urgent_cases():
     """Get cases requiring immediate attention."""
-    monitor = SLAMonitor(current_app)
-    urgent = monitor.get_urgent_cases()
-    warning = monitor.get_warning_cases()
+    if current_app.config.get('ACTIVE_CASE_STORE_ENABLED', True):
+        reader = active_case_store
+    else:
+        reader = CaseReader()
+    urgent = reader.list_by_sla_status([SLAMonitor.SLA_STATUS_CRITICAL, SLAMonitor.SLA_STATUS_BREACHED])
+    warning = reader.list_by_sla_status([SLAMonitor.SLA_STATUS_WARNING])
 
-    return jsonify({
-        'critical': [c.to_dict() for c in urgent],
-        'warning': [c.to_dict() for c in warning],
+    return json_response({
+        'critical': urgent,
+        'warning': warning,
         'critical_count': len(urgent),
         'warning_count': len(warning)
     })
 
 
 @api_bp.route('/stats/overview', methods=['GET'])
+@conditional_on_generation
 def get_overview_stats():
     """Get dashboard overview statistics."""
     stats_service = StatisticsService()
@@ -79,6 +199,7 @@ def get_overview_stats():
 
 
 @api_bp.route('/stats/daily', methods=['GET'])
+@conditional_on_generation
 def get_daily_stats():
     """Get daily statistics."""
     stats_service = StatisticsService()
@@ -86,13 +207,63 @@ def get_daily_stats():
 
 
 @api_bp.route('/stats/trend', methods=['GET'])
+@conditional_on_generation
 def get_weekly_trend():
     """Get 7-day trend data."""
     stats_service = StatisticsService()
     return jsonify(stats_service.get_weekly_trend())
 
 
+@api_bp.route('/stats/response-times', methods=['GET'])
+@conditional_on_generation
+def get_response_times():
+    """
+    Get response-time percentiles (seconds from incoming to handled).
+
+    Covers the last `days` days (default 30), or `start`..`end` as ISO
+    dates; `group_by` is any of day, priority, region (comma-separated).
+    """
+    try:
+        end = date.fromisoformat(request.args['end']) if 'end' in request.args else datetime.utcnow().date()
+        if 'start' in request.args:
+            start = date.fromisoformat(request.args['start'])
+        else:
+            start = end - timedelta(days=max(1, request.args.get('days', 30, type=int)) - 1)
+        if start > end:
+            raise ValueError('start must not be after end')
+        if (end - start).days >= current_app.config.get('RESPONSE_TIME_MAX_DAYS', 366):
+            raise ValueError('Date range too long')
+
+        group_by = [f.strip() for f in request.args.get('group_by', '').split(',') if f.strip()]
+        groups = response_time_percentiles(start, end, group_by)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return json_response({'start': start, 'end': end, 'group_by': group_by, 'groups': groups})
+
+
+@api_bp.route('/snapshot', methods=['GET'])
+@conditional_on_generation
+def get_snapshot():
+    """
+    Get the active cases as they were at `at` (ISO 8601; naive times are UTC).
+
+    Rebuilt from the nearest earlier checkpoint plus the history since.
+    """
+    try:
+        at = datetime.fromisoformat(request.args['at'])
+    except KeyError:
+        return jsonify({'error': 'Missing at parameter'}), 400
+    except ValueError:
+        return jsonify({'error': 'Invalid at timestamp'}), 400
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return json_response(snapshot_at(min(at, datetime.utcnow())))
+
+
 @api_bp.route('/settings', methods=['GET'])
+@conditional_on_generation
 def get_settings():
     """Get user settings."""
     settings = {
@@ -129,17 +300,114 @@ def update_settings():
 def get_recent_notifications():
     """Get recent notification history."""
     service = NotificationService(current_app)
-    notifications = service.get_recent_notifications(limit=20)
+    return json_response(service.get_recent_notification_rows(limit=20))
+
+
+def _format_sse(event_id, event_type, data):
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
 
-    return jsonify([n.to_dict() for n in notifications])
+@api_bp.route('/events', methods=['GET'])
+def event_stream():
+    """
+    Server-Sent Events feed of uploads, state changes, SLA transitions
+    and notifications.
+
+    Browsers resume with Last-Event-ID after a disconnect; if that id has
+    already been pruned from the log a 'resync' event asks the client to
+    reload everything. An open stream holds a worker thread, so past
+    SSE_MAX_SUBSCRIBERS streams in this worker the request is refused with
+    503 and Retry-After, and the client polls instead until then.
+    """
+    app = current_app._get_current_object()
+    heartbeat = app.config.get('SSE_HEARTBEAT', 15)
+    max_seconds = app.config.get('SSE_MAX_STREAM_SECONDS', 300)
+    retry_after = app.config.get('SSE_RETRY_AFTER', 60)
+
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.args.get('last_event_id'))
+    except (TypeError, ValueError):
+        last_id = None
+
+    backlog = []
+    resync = False
+    latest_id = get_latest_event_id()
+    if last_id is None or last_id > latest_id:
+        last_id = latest_id
+    elif last_id < latest_id:
+        oldest_id = get_oldest_event_id()
+        backlog = get_events_since(last_id)
+        if oldest_id is None or last_id < oldest_id - 1 or not backlog or backlog[-1]['id'] < latest_id:
+            resync = True
+            backlog = []
+        last_id = latest_id
+
+    subscriber = broadcaster.subscribe(app, last_id, app.config.get('SSE_MAX_SUBSCRIBERS', 8))
+    if subscriber is None:
+        response = jsonify({'error': 'Too many open event streams; poll instead', 'retry_after': retry_after})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+    def generate():
+        sent_id = last_id
+        try:
+            yield 'retry: 3000\n\n'
+            if resync:
+                yield _format_sse(sent_id, 'resync', '{}')
+            for event in backlog:
+                yield _format_sse(event['id'], event['event_type'], event['payload'])
+
+            deadline = time.monotonic() + max_seconds
+            while time.monotonic() < deadline:
+                event = subscriber.get(timeout=min(heartbeat, max(deadline - time.monotonic(), 0)))
+                if subscriber.overflowed:
+                    break
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                if event['id'] <= sent_id:
+                    continue
+                sent_id = event['id']
+                yield _format_sse(event['id'], event['event_type'], event['payload'])
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+@api_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus metrics, merged across worker processes when METRICS_DIR is set."""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
+
+@api_bp.route('/scheduler/jobs', methods=['GET'])
+def get_scheduler_jobs():
+    """
+    Scheduled job summaries and recent runs, newest first.
+
+    Each run has its start lag, duration, rows processed and outcome (ok,
+    error, skipped or missed). `job` filters to one job, `limit` caps runs.
+    """
+    limit = max(1, min(request.args.get('limit', 100, type=int) or 1,
+                       current_app.config.get('SCHEDULER_HISTORY_SIZE', 500)))
+    return jsonify(job_telemetry.snapshot(request.args.get('job'), limit))
 
 
 @api_bp.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint, including the SQLite storage profile."""
+    from app import db
+    from app.storage import get_storage_status
+
     return jsonify({
         'status': 'healthy',
-        'version': '1.0.0'
+        'version': '1.0.0',
+        'storage': get_storage_status(db.engine)
     })
 
 
@@ -147,7 +415,9 @@ def health_check():
 def reset_database():
     """Reset all data - for troubleshooting only."""
     from app.models.case_history import CaseHistory
+    from app.models.case_snapshot import CaseSnapshot
     from app.models.notification import NotificationLog
+    from app.models.response_time_sketch import ResponseTimeSketch
     from app import db
 
     try:
@@ -155,6 +425,13 @@ def reset_database():
         deleted_cases = Case.query.delete()
         deleted_history = CaseHistory.query.delete()
         deleted_notifications = NotificationLog.query.delete()
+        deleted_archive = CaseArchive.query.delete()
+        # Checkpoints would otherwise rebuild the deleted cases for /api/snapshot
+        deleted_snapshots = CaseSnapshot.query.delete()
+        # Percentiles are served from the sketches, not from case_history
+        deleted_sketches = ResponseTimeSketch.query.delete()
+        bump_generation()
+        publish_event('reset', {'cases': deleted_cases})
 
         db.session.commit()
 
@@ -163,7 +440,10 @@ def reset_database():
             'deleted': {
                 'cases': deleted_cases,
                 'history': deleted_history,
-                'notifications': deleted_notifications
+                'notifications': deleted_notifications,
+                'archive': deleted_archive,
+                'snapshots': deleted_snapshots,
+                'response_time_sketches': deleted_sketches
             }
         })
     except Exception as e:
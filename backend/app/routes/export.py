@@ -0,0 +1,91 @@
+from datetime import datetime, timezone
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from app.services.export import (
+    CASE_FIELDS, HISTORY_FIELDS, EXPORT_FORMATS, iter_cases, iter_history, export_stream
+)
+
+export_bp = Blueprint('export', __name__)
+
+MIMETYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def _parse_time(name):
+    """Optional ISO 8601 query parameter as naive UTC; ValueError if invalid."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name} timestamp')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _export_options():
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format (expected {' or '.join(EXPORT_FORMATS)})")
+    return fmt, _parse_time('since'), _parse_time('until')
+
+
+def _streamed(name, fields, rows, fmt):
+    """
+    Stream the export, gzip-compressed when asked for.
+
+    gzip=true returns a .gz attachment; otherwise the body is compressed
+    transparently (Content-Encoding) if the client accepts gzip.
+    """
+    chunk_rows = current_app.config.get('EXPORT_BATCH_ROWS', 2000)
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}.{fmt}"
+    mimetype = MIMETYPES[fmt]
+    headers = {'Vary': 'Accept-Encoding'}
+
+    attachment = request.args.get('gzip', 'false').lower() == 'true'
+    compress = attachment or request.accept_encodings['gzip'] > 0
+    if attachment:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    elif compress:
+        headers['Content-Encoding'] = 'gzip'
+    headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    chunks = export_stream(fields, rows, fmt, compress=compress, chunk_rows=chunk_rows)
+    # Keep the request (and its database session) alive while the body streams
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
+@export_bp.route('/export/cases', methods=['GET'])
+def export_cases():
+    """
+    Stream cases as CSV (default) or NDJSON.
+
+    Query params: format, since/until (ISO 8601, on updated_at),
+    include_inactive, gzip.
+    """
+    try:
+        fmt, since, until = _export_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    include_inactive = request.args.get('include_inactive', 'false').lower() == 'true'
+
+    rows = iter_cases(since, until, include_inactive,
+                      batch_size=current_app.config.get('EXPORT_BATCH_ROWS', 2000))
+    return _streamed('cases', CASE_FIELDS, rows, fmt)
+
+
+@export_bp.route('/export/history', methods=['GET'])
+def export_history():
+    """
+    Stream case history, oldest first, as CSV (default) or NDJSON.
+
+    Query params: format, since/until (ISO 8601, on recorded_at), gzip.
+    """
+    try:
+        fmt, since, until = _export_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    rows = iter_history(since, until, batch_size=current_app.config.get('EXPORT_BATCH_ROWS', 2000))
+    return _streamed('history', HISTORY_FIELDS, rows, fmt)
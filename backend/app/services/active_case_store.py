@@ -0,0 +1,228 @@
+import threading
+from bisect import bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Sequence
+from flask import g
+from sqlalchemy import select
+from app.models.case import Case
+from app.services.case_reader import CASE_FIELDS, decode_cursor, encode_cursor
+from app.services.data_generation import get_generation, pop_generation_bumps
+from app import db
+
+
+_cases = Case.__table__
+
+# Fields with a bucket index (value -> set of case ids)
+BUCKET_FIELDS = ('sla_status', 'sub_state', 'priority', 'region')
+
+# /api/cases filter parameter -> bucketed field
+FILTER_FIELDS = {'status': 'sub_state', 'priority': 'priority', 'sla_status': 'sla_status'}
+
+
+class CaseRecord:
+    """Lightweight in-memory copy of one active case row."""
+    __slots__ = CASE_FIELDS
+
+    def __init__(self, row: Sequence):
+        for name, value in zip(CASE_FIELDS, row):
+            setattr(self, name, value)
+
+    def to_dict(self, fields: Sequence[str] = CASE_FIELDS) -> Dict:
+        return {name: getattr(self, name) for name in fields}
+
+
+def _asc_key(record: CaseRecord):
+    # NULLS LAST, ties broken by id - same order as CaseReader
+    minutes = record.sla_minutes_left
+    return (1, 0, record.id) if minutes is None else (0, minutes, record.id)
+
+
+def _desc_key(record: CaseRecord):
+    # NULLS LAST, ties broken by descending id
+    minutes = record.sla_minutes_left
+    return (1, 0, -record.id) if minutes is None else (0, -minutes, -record.id)
+
+
+class ActiveCaseStore:
+    """
+    Process-local index of active cases.
+
+    Holds the hot working set with two SLA-ordered lists (ascending and
+    descending, both NULLS LAST) and bucket indexes on sla_status, sub_state,
+    priority and region, so /api/cases and /api/cases/urgent are answered
+    without a case query. The store is tagged with the data generation it
+    was loaded at; a request that sees a newer generation rebuilds it, and
+    the ingest and SLA paths patch just the rows they touched.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.generation: Optional[int] = None
+        self._records: Dict[int, CaseRecord] = {}
+        self._numbers: Dict[str, int] = {}
+        self._asc: List = []
+        self._desc: List = []
+        self._buckets: Dict[str, Dict[str, set]] = {name: {} for name in BUCKET_FIELDS}
+
+    # -- maintenance -------------------------------------------------------
+
+    def rebuild(self) -> None:
+        """Reload every active case from the database."""
+        with self._lock:
+            # Read the generation first: if a write lands in between, the
+            # store is labelled older than its data and simply rebuilt again
+            generation = get_generation()
+            rows = db.session.execute(
+                select(*[_cases.c[name] for name in CASE_FIELDS])
+                .where(_cases.c.is_active == True)
+            ).all()
+
+            self._records = {}
+            self._numbers = {}
+            self._buckets = {name: {} for name in BUCKET_FIELDS}
+            for row in rows:
+                self._index(CaseRecord(row))
+            self._asc = sorted(_asc_key(r) for r in self._records.values())
+            self._desc = sorted(_desc_key(r) for r in self._records.values())
+            self.generation = generation
+
+    def patch(self, numbers: Iterable[str]) -> None:
+        """
+        Refresh the given cases after a committed write by this process.
+
+        Only valid when the generation bumps committed by that write are the
+        only ones since the store was loaded; otherwise the next read
+        rebuilds the whole store.
+        """
+        numbers = list(numbers)
+        bumps = pop_generation_bumps()
+        with self._lock:
+            if self.generation is None:
+                return  # Never loaded in this process; first read builds it
+            generation = get_generation()
+            if generation != self.generation + bumps:
+                return  # Other writes interleaved; ensure_current() rebuilds
+
+            for number in numbers:
+                case_id = self._numbers.get(number)
+                if case_id is not None:
+                    self._remove(self._records[case_id])
+
+            for start in range(0, len(numbers), 500):
+                rows = db.session.execute(
+                    select(*[_cases.c[name] for name in CASE_FIELDS])
+                    .where(_cases.c.is_active == True,
+                           _cases.c.number.in_(numbers[start:start + 500]))
+                ).all()
+                for row in rows:
+                    record = CaseRecord(row)
+                    self._index(record)
+                    insort(self._asc, _asc_key(record))
+                    insort(self._desc, _desc_key(record))
+
+            self.generation = generation
+
+    def invalidate(self) -> None:
+        """Drop the loaded generation so the next read rebuilds the store."""
+        with self._lock:
+            self.generation = None
+
+    def ensure_current(self) -> None:
+        """Rebuild if another write (in any worker) moved the generation on."""
+        generation = g.get('data_generation')
+        if generation is None:
+            generation = get_generation()
+        with self._lock:
+            if self.generation != generation:
+                self.rebuild()
+
+    def _index(self, record: CaseRecord) -> None:
+        self._records[record.id] = record
+        self._numbers[record.number] = record.id
+        for name in BUCKET_FIELDS:
+            self._buckets[name].setdefault(getattr(record, name), set()).add(record.id)
+
+    def _remove(self, record: CaseRecord) -> None:
+        del self._records[record.id]
+        self._numbers.pop(record.number, None)
+        for name in BUCKET_FIELDS:
+            bucket = self._buckets[name].get(getattr(record, name))
+            if bucket is not None:
+                bucket.discard(record.id)
+        for ordered, key in ((self._asc, _asc_key(record)), (self._desc, _desc_key(record))):
+            i = bisect_right(ordered, key) - 1
+            if i >= 0 and ordered[i] == key:
+                del ordered[i]
+
+    # -- queries -----------------------------------------------------------
+
+    @staticmethod
+    def can_serve(include_inactive: bool, sort_by: str) -> bool:
+        """The store only holds active cases and is ordered by SLA minutes."""
+        return not include_inactive and sort_by == 'sla_minutes_left'
+
+    def list_cases(self, status: Optional[str] = None, priority: Optional[str] = None,
+                   sla_status: Optional[str] = None, include_inactive: bool = False,
+                   sort_by: str = 'sla_minutes_left', sort_order: str = 'asc',
+                   limit: int = 500, cursor: Optional[str] = None,
+                   fields: Sequence[str] = CASE_FIELDS) -> Dict:
+        """Same contract as CaseReader.list_cases for active cases sorted by SLA."""
+        descending = sort_order == 'desc'
+        if cursor:
+            last_value, last_id = decode_cursor(cursor, 'sla_minutes_left')
+
+        self.ensure_current()
+        with self._lock:
+            candidates = self._select({'status': status, 'priority': priority, 'sla_status': sla_status})
+            total = len(self._records) if candidates is None else len(candidates)
+
+            ordered = self._desc if descending else self._asc
+            start = 0
+            if cursor:
+                if descending:
+                    position = (1, 0, -last_id) if last_value is None else (0, -last_value, -last_id)
+                else:
+                    position = (1, 0, last_id) if last_value is None else (0, last_value, last_id)
+                start = bisect_right(ordered, position)
+
+            page = []
+            for key in ordered[start:] if start else ordered:
+                case_id = abs(key[2])
+                if candidates is None or case_id in candidates:
+                    page.append(self._records[case_id])
+                    if len(page) > limit:
+                        break
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(page[-1].sla_minutes_left, page[-1].id)
+
+        return {
+            'cases': [record.to_dict(fields) for record in page],
+            'total': total,
+            'next_cursor': next_cursor
+        }
+
+    def list_by_sla_status(self, statuses: Sequence[str],
+                           fields: Sequence[str] = CASE_FIELDS) -> List[Dict]:
+        """Active cases in the given SLA statuses, most urgent first."""
+        self.ensure_current()
+        with self._lock:
+            wanted = set()
+            for status in statuses:
+                wanted |= self._buckets['sla_status'].get(status, set())
+            records = sorted((self._records[i] for i in wanted), key=_asc_key)
+            return [record.to_dict(fields) for record in records]
+
+    def _select(self, filters: Dict[str, Optional[str]]) -> Optional[set]:
+        """Intersect bucket indexes for the given filters; None means no filter."""
+        result = None
+        for param, value in filters.items():
+            if not value:
+                continue
+            bucket = self._buckets[FILTER_FIELDS[param]].get(value, set())
+            result = set(bucket) if result is None else result & bucket
+        return result
+
+
+active_case_store = ActiveCaseStore()
@@ -0,0 +1,229 @@
+"""
+Historical backfill from a directory of saved ServiceNow CSV exports.
+
+`flask snow backfill DIR` loads months of exports in one go, as if each had
+been uploaded at the time it was taken:
+
+1. Every export's time is found in parallel worker processes: a timestamp
+   in the file name (2026-03-01T09-30, 2026-03-01 0930, 20260301_093000,
+   or a bare date), else the newest sys_updated_on in the file, else the
+   file's modification time. Times are taken as UTC, like everything else
+   in the database.
+2. The exports are parsed in the worker processes, a few ahead of the
+   writer, and applied oldest first, each as a full snapshot at its export
+   time: case_history, response times, deactivations and first-seen times
+   all carry the export time instead of now, and point-in-time checkpoints
+   are written every SNAPSHOT_INTERVAL of export time. Snapshots are
+   grouped into write queue jobs of about BACKFILL_BATCH_ROWS rows, one
+   transaction each, and do not go to the live change feed.
+
+Snapshots older than the newest case_history row would be applied on top of
+newer state, so a backfill into a database with later history is refused
+unless forced.
+"""
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.models.case_history import CaseHistory
+from app.models.case_snapshot import CaseSnapshot
+from app.services.csv_parser import CSVParser
+from app.services.ingest import CaseIngestor, check_sla
+from app.services.snapshots import write_snapshot
+from app.services.write_queue import write_queue
+from app import db
+
+
+# Date, then optionally a time (separators -, :, _, T, space or none)
+FILENAME_TIME = re.compile(
+    r'(?<!\d)(\d{4})-?(\d{2})-?(\d{2})(?:[T _-]?(\d{2})[-:]?(\d{2})(?:[-:]?(\d{2}))?)?(?!\d)'
+)
+
+# Counters summed over every applied snapshot
+STAT_KEYS = ('new_cases', 'updated_cases', 'incoming', 'handled', 'reactivated', 'deactivated')
+
+
+def read_export(path: str) -> str:
+    """File content decoded as /api/upload does: UTF-8 (with or without BOM), else Latin-1."""
+    with open(path, 'rb') as handle:
+        raw = handle.read()
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
+def time_from_name(name: str) -> Optional[datetime]:
+    for match in FILENAME_TIME.finditer(name):
+        parts = [int(part) if part else 0 for part in match.groups()]
+        try:
+            return datetime(*parts)
+        except ValueError:
+            continue  # Eight digits that are not a date
+    return None
+
+
+def find_export_time(path: str) -> Tuple[str, Optional[datetime], str]:
+    """(path, export time, where it came from); runs in a worker process."""
+    exported_at = time_from_name(os.path.basename(path))
+    if exported_at is not None:
+        return path, exported_at, 'filename'
+    cases, _, _ = CSVParser(read_export(path)).parse()
+    updated = [case['sys_updated_on'] for case in cases if case.get('sys_updated_on')]
+    if updated:
+        return path, max(updated), 'sys_updated_on'
+    return path, datetime.utcfromtimestamp(os.path.getmtime(path)), 'mtime'
+
+
+def parse_export(path: str) -> Tuple[List[Dict], List[str]]:
+    """Parsed cases and errors of one export; runs in a worker process."""
+    cases, errors, _ = CSVParser(read_export(path)).parse()
+    return cases, errors
+
+
+def latest_history_time() -> Optional[datetime]:
+    # Rows are inserted in time order, so the newest id carries the newest time
+    return db.session.execute(
+        select(CaseHistory.recorded_at)
+        .where(CaseHistory.id == select(func.max(CaseHistory.id)).scalar_subquery())
+    ).scalar()
+
+
+def latest_checkpoint_time() -> Optional[datetime]:
+    return db.session.execute(
+        select(CaseSnapshot.taken_at).order_by(CaseSnapshot.taken_at.desc()).limit(1)
+    ).scalar()
+
+
+def apply_snapshots(snapshots: List[Tuple[datetime, List[Dict]]],
+                    last_checkpoint: Optional[datetime]) -> Tuple[Dict, set]:
+    """
+    Write queue job: apply parsed exports in order, each as of its export time.
+
+    A point-in-time checkpoint is written after any export that comes
+    SNAPSHOT_INTERVAL or more after the last one, as the scheduled job would
+    have, so /api/snapshot stays bounded over the backfilled period.
+    """
+    interval = timedelta(seconds=current_app.config.get('SNAPSHOT_INTERVAL', 3600))
+    totals = dict.fromkeys(STAT_KEYS + ('state_changes', 'checkpoints'), 0)
+    touched = set()
+    for exported_at, cases in snapshots:
+        ingestor = CaseIngestor(missing_label='export', publish=False)
+        stats = ingestor.apply(cases, now=exported_at)
+        for key in STAT_KEYS:
+            totals[key] += stats[key]
+        totals['state_changes'] += len(stats['state_changes'])
+        touched |= ingestor.touched_numbers
+
+        if last_checkpoint is None or exported_at - last_checkpoint >= interval:
+            # Retention 0: pruning against a past time would drop the live checkpoints
+            if write_snapshot(retention_days=0, now=exported_at)[0]['written']:
+                totals['checkpoints'] += 1
+            last_checkpoint = exported_at
+    totals['last_checkpoint'] = last_checkpoint
+    return totals, touched
+
+
+def list_exports(directory: str, suffix: str = '.csv') -> List[str]:
+    """Files in `directory` ending in `suffix` (case-insensitive)."""
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.lower().endswith(suffix.lower()) and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def backfill_exports(paths: List[str], workers: Optional[int] = None, batch_rows: Optional[int] = None,
+                     force: bool = False, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Backfill the given export files, oldest export first.
+
+    `progress` is called after each applied batch with the running summary.
+    Raises ValueError if case_history already goes past the first export
+    (unless `force`). Returns the summary: files, rows, seconds and rows/s.
+    """
+    workers = workers or os.cpu_count() or 1
+    batch_rows = batch_rows or current_app.config.get('BACKFILL_BATCH_ROWS', 50000)
+    summary = {
+        'files': len(paths), 'applied': 0, 'rejected': [], 'rows': 0, 'batches': 0,
+        'first_export': None, 'applied_through': None, 'time_sources': {},
+        'stats': dict.fromkeys(STAT_KEYS + ('state_changes', 'checkpoints'), 0),
+    }
+    if not paths:
+        return summary
+
+    started = time.perf_counter()
+    # The workers fork on the first submit, before this process opens a database connection
+    # (callers that touched the database first, like snow backfill, dispose of the pool)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        ordered = sorted(pool.map(find_export_time, paths, chunksize=8), key=lambda found: (found[1], found[0]))
+        for _, _, source in ordered:
+            summary['time_sources'][source] = summary['time_sources'].get(source, 0) + 1
+
+        latest = latest_history_time()
+        last_checkpoint = latest_checkpoint_time()
+        db.session.remove()
+        if latest is not None and latest > ordered[0][1] and not force:
+            raise ValueError(
+                f'case_history already has rows up to {latest.isoformat()}, after the first export '
+                f'({ordered[0][1].isoformat()}); backfill into a fresh database'
+            )
+        summary['scan_seconds'] = round(time.perf_counter() - started, 3)
+
+        def parsed() -> Iterator[Tuple[str, datetime, List[Dict], List[str]]]:
+            # Parse a couple of exports per worker ahead of the writer, yielding in export order
+            window = deque()
+            for path, exported_at, _ in ordered:
+                window.append((path, exported_at, pool.submit(parse_export, path)))
+                if len(window) > 2 * workers:
+                    done, done_at, future = window.popleft()
+                    yield (done, done_at) + future.result()
+            for done, done_at, future in window:
+                yield (done, done_at) + future.result()
+
+        batch: List[Tuple[datetime, List[Dict]]] = []
+        batch_size = 0
+
+        def flush():
+            nonlocal batch, batch_size, last_checkpoint
+            if not batch:
+                return
+            totals = write_queue.run(apply_snapshots, batch, last_checkpoint, group=False)
+            last_checkpoint = totals.pop('last_checkpoint')
+            for key, value in totals.items():
+                summary['stats'][key] += value
+            summary['applied'] += len(batch)
+            summary['rows'] += batch_size
+            summary['batches'] += 1
+            summary['applied_through'] = batch[-1][0].isoformat()
+            batch, batch_size = [], 0
+            if progress is not None:
+                progress(summary)
+
+        for path, exported_at, cases, errors in parsed():
+            if errors or not cases:
+                # Rejected exactly as /api/upload would reject it
+                summary['rejected'].append({'file': os.path.basename(path),
+                                            'errors': errors[:3] or ['No valid cases found in CSV']})
+                continue
+            if summary['first_export'] is None:
+                summary['first_export'] = exported_at.isoformat()
+            batch.append((exported_at, cases))
+            batch_size += len(cases)
+            if batch_size >= batch_rows:
+                flush()
+        flush()
+
+    # Statuses as of now, for the state the last export left behind
+    write_queue.run(check_sla)
+
+    seconds = time.perf_counter() - started
+    summary['seconds'] = round(seconds, 3)
+    summary['rows_per_second'] = round(summary['rows'] / seconds, 1) if seconds else None
+    return summary
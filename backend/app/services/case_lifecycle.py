@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from flask import current_app
+from sqlalchemy import delete, insert, select, update
+from app.models.case import Case
+from app.models.case_archive import CaseArchive
+from app.services.data_generation import bump_generation
+from app.services.history_writer import HistoryWriter
+from app import db
+
+
+# Case numbers per IN (...) statement, well under SQLite's bound parameter limit
+CHUNK = 500
+
+_cases = Case.__table__
+_archive = CaseArchive.__table__
+
+# Columns copied between cases and cases_archive
+ARCHIVE_COLUMNS = tuple(c.name for c in _archive.columns if c.name != 'archived_at')
+
+
+def _chunks(items: List, size: int = CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def track_absence(seen_numbers: Set[str], now: Optional[datetime] = None,
+                  history: Optional[HistoryWriter] = None) -> Tuple[List[str], List[str]]:
+    """
+    Age the active cases missing from an import and deactivate expired ones.
+
+    A case is deactivated once it has been missing from
+    CASE_DEACTIVATE_AFTER_IMPORTS consecutive imports, or has not been seen
+    for CASE_DEACTIVATE_AFTER_HOURS (either rule is off when set to 0).
+    Deactivations are recorded as 'deactivated' history events, added to
+    `history` when given (the caller flushes it) or written right away.
+    Nothing is committed. Returns (numbers still missing, numbers deactivated).
+    """
+    now = now or datetime.utcnow()
+    max_imports = current_app.config.get('CASE_DEACTIVATE_AFTER_IMPORTS', 3)
+    max_hours = current_app.config.get('CASE_DEACTIVATE_AFTER_HOURS', 24)
+    cutoff = now - timedelta(hours=max_hours) if max_hours else None
+
+    rows = db.session.execute(
+        select(Case.id, Case.number, Case.missing_count, Case.last_seen_at,
+               Case.sub_state, Case.sla_minutes_left, Case.priority)
+        .where(Case.is_active == True)
+    ).all()
+
+    missing, expired = [], []
+    for row in rows:
+        if row.number in seen_numbers:
+            continue
+        if ((max_imports and (row.missing_count or 0) + 1 >= max_imports)
+                or (cutoff and row.last_seen_at and row.last_seen_at < cutoff)):
+            expired.append(row)
+        else:
+            missing.append(row)
+
+    # Being missing is not a change to the case itself: keep updated_at
+    for chunk in _chunks([row.id for row in missing + expired]):
+        db.session.execute(
+            update(Case).where(Case.id.in_(chunk))
+            .values(missing_count=Case.missing_count + 1, updated_at=Case.updated_at)
+        )
+    # Deactivation is a change to the case: stamp updated_at with deactivated_at
+    for chunk in _chunks([row.id for row in expired]):
+        db.session.execute(
+            update(Case).where(Case.id.in_(chunk))
+            .values(is_active=False, deactivated_at=now, updated_at=now)
+        )
+
+    writer = history if history is not None else HistoryWriter()
+    for row in expired:
+        writer.add(row.number, row.sub_state, row.sub_state, 'deactivated',
+                   row.sla_minutes_left, row.priority, now)
+    if history is None:
+        writer.flush()
+
+    return [row.number for row in missing], [row.number for row in expired]
+
+
+def restore_archived(numbers: Iterable[str]) -> Dict[str, Dict]:
+    """
+    Take the given numbers out of the archive (they appeared in an import).
+
+    Returns the archived rows by number so the caller can recreate the
+    cases; the archive rows are deleted. Nothing is committed.
+    """
+    numbers = list(numbers)
+    restored = {}
+    for chunk in _chunks(numbers):
+        rows = db.session.execute(
+            select(*[_archive.c[name] for name in ARCHIVE_COLUMNS])
+            .where(_archive.c.number.in_(chunk))
+        ).all()
+        for row in rows:
+            restored[row.number] = dict(zip(ARCHIVE_COLUMNS, row))
+    if restored:
+        for chunk in _chunks(list(restored)):
+            db.session.execute(delete(_archive).where(_archive.c.number.in_(chunk)))
+    return restored
+
+
+def archive_inactive_cases(older_than_days: Optional[int] = None,
+                           batch_size: int = CHUNK) -> Tuple[Dict, List[str]]:
+    """
+    Write queue job: move cases inactive for longer than the archive age
+    into cases_archive. Returns ({'archived': n, 'cutoff': ...}, numbers).
+    """
+    if older_than_days is None:
+        older_than_days = current_app.config.get('CASE_ARCHIVE_AFTER_DAYS', 30)
+    now = datetime.utcnow()
+    cutoff = now - timedelta(days=older_than_days)
+
+    rows = db.session.execute(
+        select(_cases.c.id, _cases.c.number)
+        .where(_cases.c.is_active == False, _cases.c.deactivated_at < cutoff)
+    ).all()
+
+    for chunk in _chunks(rows, batch_size):
+        ids = [row.id for row in chunk]
+        db.session.execute(
+            insert(_archive).from_select(
+                list(ARCHIVE_COLUMNS) + ['archived_at'],
+                select(*[_cases.c[name] for name in ARCHIVE_COLUMNS],
+                       db.literal(now, db.DateTime))
+                .where(_cases.c.id.in_(ids))
+            )
+        )
+        db.session.execute(delete(_cases).where(_cases.c.id.in_(ids)))
+
+    numbers = [row.number for row in rows]
+    if numbers:
+        # include_inactive reads and the overview change
+        bump_generation()
+    return {'archived': len(numbers), 'cutoff': cutoff.isoformat()}, numbers
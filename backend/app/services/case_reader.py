@@ -0,0 +1,226 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import select, func, and_, or_
+from app.models.case import Case
+from app import db
+
+
+_cases = Case.__table__
+
+# Output fields in the same order as Case.to_dict()
+CASE_FIELDS = (
+    'id', 'number', 'short_description', 'time_to_respond', 'sla_time_left',
+    'sla_minutes_left', 'sub_state', 'region', 'priority', 'priority_level',
+    'sys_updated_on', 'sla_status', 'is_active', 'updated_at', 'created_at'
+)
+
+# Columns /api/cases may be sorted by (and therefore paginated on)
+SORTABLE_FIELDS = {
+    'number', 'sla_minutes_left', 'sub_state', 'region', 'priority',
+    'priority_level', 'sys_updated_on', 'sla_status', 'updated_at', 'created_at'
+}
+
+DATETIME_FIELDS = {'sys_updated_on', 'updated_at', 'created_at'}
+INTEGER_FIELDS = {'sla_minutes_left', 'priority_level'}
+TEXT_FIELDS = SORTABLE_FIELDS - DATETIME_FIELDS - INTEGER_FIELDS
+
+
+def encode_cursor(sort_value, case_id: int) -> str:
+    """Encode the keyset position (sort value, id) of the last returned row."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, case_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: str, datetime_fields=DATETIME_FIELDS):
+    """
+    Decode a cursor produced by encode_cursor, raising ValueError if invalid.
+
+    The sort value must have the type of its column (any type for other
+    `sort_by` names, which the caller checks), so a crafted cursor cannot
+    reach a comparison with mismatched types.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        sort_value, case_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not _is_int(case_id):
+            raise ValueError('Invalid cursor')
+        if sort_value is not None:
+            if sort_by in datetime_fields:
+                sort_value = datetime.fromisoformat(sort_value)
+            elif sort_by in INTEGER_FIELDS and not _is_int(sort_value):
+                raise ValueError('Invalid cursor')
+            elif sort_by in TEXT_FIELDS and not isinstance(sort_value, str):
+                raise ValueError('Invalid cursor')
+        return sort_value, case_id
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise ValueError('Invalid cursor')
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_fields(fields: Optional[str]) -> Sequence[str]:
+    """Parse a comma-separated `fields=` projection, raising ValueError on unknown names."""
+    if not fields:
+        return CASE_FIELDS
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in CASE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # Keep canonical order so responses are stable regardless of query order
+    return tuple(f for f in CASE_FIELDS if f in requested)
+
+
+class CaseReader:
+    """
+    Read-only case queries built with SQLAlchemy Core.
+
+    Selects only the requested columns and returns plain dicts keyed in
+    CASE_FIELDS order, so list endpoints never hydrate Case ORM objects.
+    Datetime values are left as-is for app.utils.fast_json to encode.
+    """
+
+    def list_cases(self, status: Optional[str] = None, priority: Optional[str] = None,
+                   sla_status: Optional[str] = None, include_inactive: bool = False,
+                   sort_by: str = 'sla_minutes_left', sort_order: str = 'asc',
+                   limit: int = 500, cursor: Optional[str] = None,
+                   fields: Sequence[str] = CASE_FIELDS) -> Dict:
+        """
+        Return one keyset page of cases.
+
+        Rows are ordered by (sort_by NULLS LAST, id), with id following the
+        sort direction so the order is one contiguous index range. The
+        returned `next_cursor` encodes the last row's position in that order,
+        so each page costs the same regardless of how deep it is.
+        """
+        if sort_by not in SORTABLE_FIELDS:
+            sort_by = 'sla_minutes_left'
+        descending = sort_order == 'desc'
+        sort_column = _cases.c[sort_by]
+        id_column = _cases.c.id
+
+        conditions = []
+        if not include_inactive:
+            conditions.append(_cases.c.is_active == True)
+        if status:
+            conditions.append(_cases.c.sub_state == status)
+        if priority:
+            conditions.append(_cases.c.priority == priority)
+        if sla_status:
+            conditions.append(_cases.c.sla_status == sla_status)
+
+        total = db.session.execute(
+            select(func.count()).select_from(_cases).where(*conditions)
+        ).scalar()
+
+        if cursor:
+            last_value, last_id = decode_cursor(cursor, sort_by)
+            conditions.append(self._after(sort_column, id_column, last_value, last_id, descending))
+
+        # Requested fields first, then id and the sort column (if not already
+        # requested) so the next cursor can be built
+        columns = list(dict.fromkeys([*fields, 'id', sort_by]))
+        ordering = sort_column.desc() if descending else sort_column.asc()
+
+        rows = db.session.execute(
+            select(*[_cases.c[name] for name in columns])
+            .where(*conditions)
+            .order_by(ordering.nullslast(), id_column.desc() if descending else id_column.asc())
+            .limit(limit + 1)
+        ).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]._mapping
+            next_cursor = encode_cursor(last[sort_by], last['id'])
+
+        # Row tuples are zipped against the precomputed field order; zip stops
+        # before the trailing helper columns
+        return {
+            'cases': [dict(zip(fields, row)) for row in rows],
+            'total': total,
+            'next_cursor': next_cursor
+        }
+
+    def list_by_sla_status(self, statuses: Sequence[str],
+                           fields: Sequence[str] = CASE_FIELDS) -> List[Dict]:
+        """Active cases in the given SLA statuses, most urgent first."""
+        rows = db.session.execute(
+            select(*[_cases.c[name] for name in fields])
+            .where(_cases.c.is_active == True, _cases.c.sla_status.in_(statuses))
+            .order_by(_cases.c.sla_minutes_left.asc().nullslast(), _cases.c.id.asc())
+        ).all()
+        return [dict(zip(fields, row)) for row in rows]
+
+    def list_next(self, limit: int, fields: Sequence[str] = CASE_FIELDS) -> List[Dict]:
+        """
+        The `limit` most urgent active cases, highest urgency first.
+
+        The stored urgency_score lacks the staleness points, which grow with
+        the clock, but they are capped: once the rows read from the top of
+        ix_cases_active_urgency (ties by newest id, the index's own order)
+        hold `limit` cases that no unread row can pass even with full
+        staleness, reading stops. The cost depends on how many cases sit
+        within that cap of the top, not on the size of the active set.
+        Each case's `urgency_score` includes its staleness.
+        """
+        from app.services.sla_monitor import SLAMonitor
+
+        monitor = SLAMonitor()
+        weights = monitor.get_urgency_weights()
+        max_staleness = weights['stale'] * weights['stale_max_hours']
+        now = datetime.utcnow()
+
+        columns = list(dict.fromkeys([*fields, 'id', 'urgency_score', 'sys_updated_on']))
+        query = (
+            select(*[_cases.c[name] for name in columns])
+            .where(_cases.c.is_active == True)
+            .order_by(_cases.c.urgency_score.desc(), _cases.c.id.desc())
+        )
+
+        ranked = []  # (urgency, id, row), best first
+        batch, last = limit, None
+        while True:
+            page = query
+            if last is not None:
+                page = page.where(_cases.c.urgency_score <= last.urgency_score,
+                                  or_(_cases.c.urgency_score < last.urgency_score, _cases.c.id < last.id))
+            rows = db.session.execute(page.limit(batch)).all()
+            for row in rows:
+                urgency = row.urgency_score + monitor.staleness_points(row.sys_updated_on, now, weights)
+                ranked.append((urgency, row.id, row))
+            ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
+            del ranked[limit:]
+            if len(rows) < batch:
+                break
+            last = rows[-1]
+            # Unread rows score at most last.urgency_score plus full staleness
+            if len(ranked) == limit and ranked[-1][0] > last.urgency_score + max_staleness:
+                break
+            batch *= 2
+
+        cases = []
+        for urgency, _, row in ranked:
+            case = {name: row._mapping[name] for name in fields}
+            case['urgency_score'] = urgency
+            cases.append(case)
+        return cases
+
+    @staticmethod
+    def _after(sort_column, id_column, last_value, last_id: int, descending: bool):
+        """Keyset predicate for rows strictly after (last_value, last_id) with NULLS LAST."""
+        id_after = id_column < last_id if descending else id_column > last_id
+        if last_value is None:
+            return and_(sort_column.is_(None), id_after)
+        beyond = sort_column < last_value if descending else sort_column > last_value
+        return or_(
+            beyond,
+            and_(sort_column == last_value, id_after),
+            sort_column.is_(None)
+        )
@@ -0,0 +1,107 @@
+"""
+Full-text search over case numbers and short descriptions.
+
+Backed by the cases_fts FTS5 index (migration 9), which triggers keep in
+step with every insert, update and delete on cases, so active and inactive
+cases are searchable as soon as they are written; archived cases have left
+the cases table and are not. Each word of the query must match (as a
+prefix) the case number, the number's digits without letters and leading
+zeros, or the description; results are ordered by BM25 relevance with
+number matches weighted above description matches.
+"""
+import re
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import column, func, select, table
+from sqlalchemy.exc import OperationalError
+
+from app.models.case import Case
+from app.services.case_reader import CASE_FIELDS, decode_cursor, encode_cursor
+from app import db
+
+
+_cases = Case.__table__
+
+# Not in the models: the migration creates it, and create_all must not
+_fts = table('cases_fts', column('rowid'), column('rank'), column('cases_fts'))
+
+TERM = re.compile(r'\w+')
+MAX_TERMS = 16
+
+
+def match_expression(query: str) -> str:
+    """
+    FTS5 query for free text: every word as a quoted prefix term, all required.
+
+    Quoting leaves FTS5 operators and punctuation in the input without
+    meaning; raises ValueError if the input has no letters or digits.
+    """
+    terms = TERM.findall(query.lower())[:MAX_TERMS]
+    if not terms:
+        raise ValueError('Search query must contain a letter or digit')
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+class CaseSearch:
+    """Ranked, filtered search pages in the shape of CaseReader.list_cases."""
+
+    def search(self, query: str, status: Optional[str] = None, priority: Optional[str] = None,
+               sla_status: Optional[str] = None, include_inactive: bool = False,
+               limit: int = 50, cursor: Optional[str] = None,
+               fields: Sequence[str] = CASE_FIELDS) -> Dict:
+        """
+        Return one page of matching cases, most relevant first.
+
+        Filters are those of /api/cases. Relevance cannot be resumed by key,
+        so `next_cursor` encodes the offset of the next page (and the id of
+        the last row returned); FTS5 ranks every match on each page anyway.
+        Raises RuntimeError where the index was never built (no FTS5).
+        """
+        match = _fts.c.cases_fts.op('MATCH')(match_expression(query))
+
+        conditions = []
+        if not include_inactive:
+            conditions.append(_cases.c.is_active == True)
+        if status:
+            conditions.append(_cases.c.sub_state == status)
+        if priority:
+            conditions.append(_cases.c.priority == priority)
+        if sla_status:
+            conditions.append(_cases.c.sla_status == sla_status)
+
+        # The count drives from the matches through IN; as a join SQLite may
+        # walk a filter index instead and run the MATCH once per case
+        matching = select(_fts.c.rowid).where(match)
+        try:
+            total = db.session.execute(
+                select(func.count()).select_from(_cases).where(_cases.c.id.in_(matching), *conditions)
+            ).scalar()
+        except OperationalError as e:
+            if 'no such table: cases_fts' in str(e):
+                raise RuntimeError('Full-text search is not available in this SQLite build')
+            raise
+
+        offset = decode_cursor(cursor, 'rank')[0] if cursor else 0
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError('Invalid cursor')
+
+        columns = list(dict.fromkeys([*fields, 'id']))
+        rows = db.session.execute(
+            select(*[_cases.c[name] for name in columns])
+            .select_from(_fts.join(_cases, _cases.c.id == _fts.c.rowid))
+            .where(match, *conditions)
+            .order_by(_fts.c.rank)
+            .limit(limit + 1)
+            .offset(offset)
+        ).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(offset + limit, rows[-1]._mapping['id'])
+
+        return {
+            'cases': [dict(zip(fields, row)) for row in rows],
+            'total': total,
+            'next_cursor': next_cursor
+        }
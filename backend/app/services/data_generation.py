@@ -0,0 +1,52 @@
+from sqlalchemy import select, update, insert
+from app.models.settings import Settings
+from app import db
+
+
+# Settings key holding the monotonically increasing data generation counter.
+# Every write that changes what the read endpoints return bumps it, so
+# (generation, request) is enough to derive a strong ETag across workers.
+GENERATION_KEY = 'data_generation'
+
+# Session.info key counting bumps staged since the last store patch
+BUMPS_KEY = 'generation_bumps'
+
+_settings = Settings.__table__
+
+
+def get_generation() -> int:
+    """Return the current data generation without loading any ORM objects."""
+    value = db.session.execute(
+        select(_settings.c.value).where(_settings.c.key == GENERATION_KEY)
+    ).scalar()
+    return int(value) if value else 0
+
+
+def bump_generation() -> None:
+    """
+    Increment the data generation inside the current transaction.
+
+    The caller is responsible for committing, so the bump becomes visible
+    atomically with the data change it describes.
+    """
+    result = db.session.execute(
+        update(_settings)
+        .where(_settings.c.key == GENERATION_KEY)
+        .values(value=db.cast(db.cast(_settings.c.value, db.Integer) + 1, db.Text))
+    )
+    if result.rowcount == 0:
+        db.session.execute(
+            insert(_settings).values(key=GENERATION_KEY, value='1', value_type='int')
+        )
+    db.session.info[BUMPS_KEY] = db.session.info.get(BUMPS_KEY, 0) + 1
+
+
+def pop_generation_bumps() -> int:
+    """
+    Return and reset the number of bumps made through this session.
+
+    After a commit this is how far the generation moved because of our own
+    writes (a group commit may carry several), which lets the active case
+    store tell its own writes apart from other processes'.
+    """
+    return db.session.info.pop(BUMPS_KEY, 0)
@@ -0,0 +1,167 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from sqlalchemy import select, delete, func
+from app.models.change_event import ChangeEvent
+from app import db
+
+
+_events = ChangeEvent.__table__
+
+
+def publish_event(event_type: str, payload: Dict) -> None:
+    """
+    Append an event to the change log inside the current transaction.
+
+    The caller commits, so subscribers only ever see events for data that
+    is actually visible.
+    """
+    db.session.add(ChangeEvent(event_type=event_type, payload=json.dumps(payload)))
+
+
+def prune_events(keep: int) -> None:
+    """Trim the change log to the newest `keep` events."""
+    max_id = db.session.execute(select(func.max(_events.c.id))).scalar()
+    if max_id is not None and max_id > keep:
+        db.session.execute(delete(_events).where(_events.c.id <= max_id - keep))
+
+
+def get_events_since(last_id: int, limit: int = 500) -> List[Dict]:
+    """Return events with id > last_id, oldest first, as plain dicts."""
+    rows = db.session.execute(
+        select(_events.c.id, _events.c.event_type, _events.c.payload)
+        .where(_events.c.id > last_id)
+        .order_by(_events.c.id)
+        .limit(limit)
+    ).all()
+    return [
+        {'id': row.id, 'event_type': row.event_type, 'payload': row.payload}
+        for row in rows
+    ]
+
+
+def get_oldest_event_id() -> Optional[int]:
+    """Return the id of the oldest event still in the log."""
+    return db.session.execute(select(func.min(_events.c.id))).scalar()
+
+
+def get_latest_event_id() -> int:
+    """Return the id of the newest event, or 0 when the log is empty."""
+    return db.session.execute(select(func.max(_events.c.id))).scalar() or 0
+
+
+class Subscriber:
+    """Bounded event buffer for one SSE connection."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.overflowed = False
+        self._events = deque()
+        self._cond = threading.Condition()
+
+    def push(self, event: Dict) -> None:
+        with self._cond:
+            if len(self._events) >= self.maxsize:
+                # Slow client: drop its buffer, the stream closes and the
+                # browser resumes from the log via Last-Event-ID
+                self._events.clear()
+                self.overflowed = True
+            else:
+                self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Return the next event, or None if none arrived within timeout."""
+        with self._cond:
+            if not self._events and not self.overflowed:
+                self._cond.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+
+class EventBroadcaster:
+    """
+    Fan out change events to SSE subscribers in this process.
+
+    A single background thread reads the change log and hands each new
+    event to every subscriber, so database load depends on the number of
+    worker processes rather than the number of open dashboards.
+    """
+
+    BUFFER_SIZE = 1000
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+        self._last_id = None
+
+    def subscribe(self, app, after_id: int, limit: Optional[int] = None) -> Optional[Subscriber]:
+        """
+        Register a new subscriber and start the reader thread if needed.
+
+        `after_id` is the newest event the subscriber has already seen; it
+        seeds the reader position when this is the first subscriber.
+        Returns None if `limit` subscribers are already connected: each
+        holds a server thread for as long as its stream stays open.
+        """
+        subscriber = Subscriber(self.BUFFER_SIZE)
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(subscriber)
+            if self._last_id is None or after_id < self._last_id:
+                self._last_id = after_id
+            if self._thread is None or not self._thread.is_alive():
+                self._app = app
+                self._thread = threading.Thread(
+                    target=self._run, name='sse-broadcaster', daemon=True
+                )
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def _run(self):
+        app = self._app
+        interval = app.config.get('EVENT_POLL_INTERVAL', 0.5)
+
+        with app.app_context():
+            while True:
+                time.sleep(interval)
+                with self._lock:
+                    subscribers = list(self._subscribers)
+                    if not subscribers:
+                        self._last_id = None
+                        continue
+                    last_id = self._last_id
+
+                try:
+                    events = get_events_since(last_id)
+                except Exception as e:
+                    app.logger.warning(f"Event broadcaster read failed: {e}")
+                    continue
+                finally:
+                    db.session.remove()
+
+                if not events:
+                    continue
+                for event in events:
+                    for subscriber in subscribers:
+                        subscriber.push(event)
+                with self._lock:
+                    # A subscriber that joined meanwhile may have rewound the
+                    # cursor; keep its position so it does not miss this batch
+                    if self._last_id == last_id:
+                        self._last_id = events[-1]['id']
+
+
+broadcaster = EventBroadcaster()
@@ -0,0 +1,123 @@
+import csv
+import io
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Sequence
+from sqlalchemy import select
+from app.models.case import Case
+from app.models.case_history import CaseHistory
+from app.services.case_reader import CASE_FIELDS
+from app.services.case_timeline import HISTORY_FIELDS
+from app.services.history_writer import state_lookup, priority_lookup
+from app.utils.fast_json import dumps
+from app import db
+
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+_cases = Case.__table__
+_history = CaseHistory.__table__
+
+
+# -- row sources --------------------------------------------------------------
+#
+# Generators over server-side cursors: yield_per keeps at most one batch of
+# rows buffered, so memory stays flat however many rows are exported. They
+# must be consumed inside the request (stream_with_context) so the session
+# outlives the view function.
+
+def iter_cases(since: Optional[datetime] = None, until: Optional[datetime] = None,
+               include_inactive: bool = False, batch_size: int = 1000) -> Iterator[tuple]:
+    """Case rows in CASE_FIELDS order (id order), filtered on updated_at."""
+    conditions = []
+    ordering = [_cases.c.id]
+    if not include_inactive:
+        conditions.append(_cases.c.is_active == True)
+        # Walk ix_cases_active_deactivated_at in index order (deactivated_at
+        # is unset on active cases) instead of sorting them in a temp B-tree
+        ordering.insert(0, _cases.c.deactivated_at)
+    if since:
+        conditions.append(_cases.c.updated_at >= since)
+    if until:
+        conditions.append(_cases.c.updated_at < until)
+
+    result = db.session.execute(
+        select(*[_cases.c[name] for name in CASE_FIELDS])
+        .where(*conditions)
+        .order_by(*ordering)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from result
+
+
+def iter_history(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                 batch_size: int = 1000) -> Iterator[tuple]:
+    """History rows in HISTORY_FIELDS order, oldest first, filtered on recorded_at."""
+    conditions = []
+    if since:
+        conditions.append(_history.c.recorded_at >= since)
+    if until:
+        conditions.append(_history.c.recorded_at < until)
+
+    result = db.session.execute(
+        select(_history.c.id, _history.c.case_number, _history.c.previous_state_id,
+               _history.c.new_state_id, _history.c.event_type, _history.c.sla_minutes_left,
+               _history.c.priority_id, _history.c.recorded_at)
+        .where(*conditions)
+        .order_by(_history.c.recorded_at, _history.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    state_name = state_lookup.name_for
+    priority_name = priority_lookup.name_for
+    for row in result:
+        yield (row.id, row.case_number, state_name(row.previous_state_id),
+               state_name(row.new_state_id), row.event_type, row.sla_minutes_left,
+               priority_name(row.priority_id), row.recorded_at)
+
+
+# -- encoders -----------------------------------------------------------------
+
+def encode_csv(fields: Sequence[str], rows: Iterable[tuple], chunk_rows: int = 1000) -> Iterator[bytes]:
+    """CSV with a header row, yielded every `chunk_rows` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([value.isoformat() if isinstance(value, datetime) else value for value in row])
+        if count % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def encode_ndjson(fields: Sequence[str], rows: Iterable[tuple], chunk_rows: int = 1000) -> Iterator[bytes]:
+    """One JSON object per line, yielded every `chunk_rows` rows."""
+    lines = []
+    for row in rows:
+        lines.append(dumps(dict(zip(fields, row))))
+        if len(lines) >= chunk_rows:
+            yield b'\n'.join(lines) + b'\n'
+            lines = []
+    if lines:
+        yield b'\n'.join(lines) + b'\n'
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Compress a byte stream into a single gzip member as it goes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(fields: Sequence[str], rows: Iterable[tuple], fmt: str,
+                  compress: bool = False, chunk_rows: int = 1000) -> Iterator[bytes]:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (expected {' or '.join(EXPORT_FORMATS)})")
+    encode = encode_csv if fmt == 'csv' else encode_ndjson
+    chunks = encode(fields, rows, chunk_rows)
+    return gzip_chunks(chunks) if compress else chunks
+
@@ -0,0 +1,155 @@
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session
+from app.models.case_history import CaseHistory, EVENT_CODES
+from app.models.lookup import CaseState, CasePriority
+from app import db
+
+
+# Session.info key for lookup ids interned by the current transaction
+PENDING_KEY = 'interned_lookups'
+
+_history = CaseHistory.__table__
+
+
+class LookupCache:
+    """
+    Process-wide name <-> id cache for one interning table.
+
+    Names first seen inside a transaction are inserted with INSERT OR
+    IGNORE and kept in that session's pending map until it commits, so a
+    rolled-back insert can never leave a dangling id in the shared cache.
+    """
+
+    def __init__(self, model):
+        self.table = model.__table__
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+
+    def ids_for(self, names: Iterable[Optional[str]]) -> Dict[str, int]:
+        """Return ids for the given names, interning new ones."""
+        pending = db.session.info.setdefault(PENDING_KEY, {}).setdefault(self.table.name, {})
+        with self._lock:
+            wanted = {name for name in names if name is not None}
+            result = {name: self._ids[name] for name in wanted if name in self._ids}
+        result.update({name: pending[name] for name in wanted - result.keys() if name in pending})
+
+        missing = sorted(wanted - result.keys())
+        if missing:
+            db.session.execute(
+                insert(self.table).prefix_with('OR IGNORE'),
+                [{'name': name} for name in missing]
+            )
+            rows = db.session.execute(
+                select(self.table.c.id, self.table.c.name).where(self.table.c.name.in_(missing))
+            ).all()
+            for row in rows:
+                pending[row.name] = row.id
+                result[row.name] = row.id
+        return result
+
+    def name_for(self, lookup_id: Optional[int]) -> Optional[str]:
+        """Resolve an id, reloading the (small) table on a miss."""
+        if lookup_id is None:
+            return None
+        with self._lock:
+            name = self._names.get(lookup_id)
+        if name is None:
+            self.load()
+            with self._lock:
+                name = self._names.get(lookup_id)
+        return name
+
+    def load(self) -> None:
+        rows = db.session.execute(select(self.table.c.id, self.table.c.name)).all()
+        with self._lock:
+            for row in rows:
+                self._ids[row.name] = row.id
+                self._names[row.id] = row.name
+
+    def promote(self, interned: Dict[str, int]) -> None:
+        with self._lock:
+            for name, lookup_id in interned.items():
+                self._ids[name] = lookup_id
+                self._names[lookup_id] = name
+
+
+state_lookup = LookupCache(CaseState)
+priority_lookup = LookupCache(CasePriority)
+
+_caches = {cache.table.name: cache for cache in (state_lookup, priority_lookup)}
+
+
+@event.listens_for(Session, 'after_commit')
+def _promote_interned(session):
+    for table_name, interned in session.info.pop(PENDING_KEY, {}).items():
+        _caches[table_name].promote(interned)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_interned(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+class HistoryWriter:
+    """
+    Collect case_history rows and write them with a single executemany.
+
+    Rows are added with state/priority names and event type names, as the
+    ORM model takes them; flush() interns the names and inserts every row
+    in one statement. Nothing is committed.
+    """
+
+    def __init__(self):
+        self._rows: List[Dict] = []
+
+    def add(self, case_number: str, previous_state: Optional[str], new_state: Optional[str],
+            event_type: str, sla_minutes_left: Optional[int] = None,
+            priority: Optional[str] = None, recorded_at: Optional[datetime] = None) -> None:
+        if event_type not in EVENT_CODES:
+            raise ValueError(f'Unknown history event type: {event_type}')
+        self._rows.append({
+            'case_number': case_number,
+            'previous_state': previous_state,
+            'new_state': new_state,
+            'event_type': event_type,
+            'sla_minutes_left': sla_minutes_left,
+            'priority': priority,
+            'recorded_at': recorded_at,
+        })
+
+    def __len__(self):
+        return len(self._rows)
+
+    def flush(self) -> int:
+        """Insert the collected rows; returns how many were written."""
+        if not self._rows:
+            return 0
+
+        now = datetime.utcnow()
+        state_ids = state_lookup.ids_for(
+            name for row in self._rows for name in (row['previous_state'], row['new_state'])
+        )
+        priority_ids = priority_lookup.ids_for(row['priority'] for row in self._rows)
+
+        db.session.execute(
+            insert(_history),
+            [
+                {
+                    'case_number': row['case_number'],
+                    'previous_state_id': state_ids.get(row['previous_state']),
+                    'new_state_id': state_ids.get(row['new_state']),
+                    'event_type': row['event_type'],
+                    'sla_minutes_left': row['sla_minutes_left'],
+                    'priority_id': priority_ids.get(row['priority']),
+                    'recorded_at': row['recorded_at'] or now,
+                }
+                for row in self._rows
+            ]
+        )
+        written = len(self._rows)
+        self._rows = []
+        return written
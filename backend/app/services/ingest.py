@@ -0,0 +1,233 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from flask import current_app
+from app.models.case import Case
+from app.models.case_history import CaseHistory, STATES_BALL_ON_YOU
+from app.services.case_lifecycle import restore_archived, track_absence
+from app.services.data_generation import bump_generation
+from app.services.history_writer import HistoryWriter
+from app.services.response_times import ResponseTimeRecorder
+from app.services.event_service import publish_event, prune_events
+from app.services.sla_monitor import SLAMonitor
+from app.services.notification_service import NotificationService
+from app import db
+
+
+# Case numbers per IN (...) lookup, well under SQLite's bound parameter limit
+LOOKUP_CHUNK = 500
+
+
+class CaseIngestor:
+    """
+    Apply parsed cases to the current session, tracking state transitions.
+
+    Shared by the CSV and JSON parsers. Nothing is committed here: the
+    caller (a parser's save_to_database, or a write queue job) owns the
+    transaction, so several ingests can share one commit. Historical
+    backfills pass the snapshot's time as `now` and turn off `publish`,
+    so the change feed only carries live changes.
+    """
+
+    def __init__(self, missing_label: str = 'export', publish: bool = True):
+        self.missing_label = missing_label
+        self.publish = publish
+        self.warnings: List[str] = []
+        self.processed_numbers: Set[str] = set()
+        self.deactivated_numbers: Set[str] = set()
+
+    @property
+    def touched_numbers(self) -> Set[str]:
+        """Cases whose rows changed (for patching the active case store)."""
+        return self.processed_numbers | self.deactivated_numbers
+
+    def apply(self, cases: List[Dict], now: Optional[datetime] = None) -> Dict:
+        """Stage case inserts/updates and history rows as of `now`; returns upload stats."""
+        stats = {
+            'new_cases': 0,        # First time seeing this case (locked)
+            'updated_cases': 0,    # Existing case updated
+            'incoming': 0,         # Switched TO open/new (customer responded)
+            'handled': 0,          # Switched FROM open/new (you responded)
+            'reactivated': 0,      # Back after being deactivated or archived
+            'deactivated': 0,      # Missing past the grace period
+            'state_changes': []    # Detailed list of changes
+        }
+
+        now = now or datetime.utcnow()
+        history = HistoryWriter()
+        response_times = ResponseTimeRecorder(
+            current_app.config.get('RESPONSE_TIME_SKETCH_ACCURACY', 0.01)
+        )
+        numbers = [case_data['number'] for case_data in cases]
+        existing_cases = self._load_existing(numbers)
+        archived = restore_archived(n for n in set(numbers) if n not in existing_cases)
+
+        for case_data in cases:
+            number = case_data['number']
+            self.processed_numbers.add(number)
+
+            existing = existing_cases.get(number)
+
+            if existing:
+                # Track state change
+                old_state = existing.sub_state
+                new_state = case_data.get('sub_state')
+
+                if old_state != new_state:
+                    # Determine event type
+                    event_type = CaseHistory.determine_event_type(old_state, new_state)
+
+                    change = {
+                        'number': number,
+                        'from': old_state,
+                        'to': new_state,
+                        'event_type': event_type
+                    }
+                    stats['state_changes'].append(change)
+                    if self.publish:
+                        publish_event('state_change', change)
+
+                    # Count incoming/handled and time the response
+                    if event_type == 'incoming':
+                        stats['incoming'] += 1
+                        existing.awaiting_response_since = now
+                    elif event_type == 'handled':
+                        stats['handled'] += 1
+                        if existing.awaiting_response_since:
+                            response_times.add(existing.awaiting_response_since, now,
+                                               case_data.get('priority') or existing.priority,
+                                               case_data.get('region') or existing.region)
+                            existing.awaiting_response_since = None
+
+                    # Record state transition in history
+                    history.add(number, old_state, new_state, event_type,
+                                case_data.get('sla_minutes_left'), case_data.get('priority'), now)
+
+                # Reappeared after being deactivated (or re-opened)
+                was_active = existing.is_active
+                if existing.deactivated_at and case_data.get('is_active', True):
+                    history.add(number, old_state, new_state, 'reactivated',
+                                case_data.get('sla_minutes_left'), case_data.get('priority'), now)
+                    existing.deactivated_at = None
+                    stats['reactivated'] += 1
+
+                # Update existing case
+                for key, value in case_data.items():
+                    if hasattr(existing, key):
+                        setattr(existing, key, value)
+                existing.missing_count = 0
+                existing.last_seen_at = now
+                existing.updated_at = now  # The export time when backfilling, not the column's onupdate
+                if was_active and not existing.is_active:
+                    existing.deactivated_at = now  # Closed in the source system
+
+                stats['updated_cases'] += 1
+            else:
+                restored = archived.pop(number, None)
+                lifecycle = {
+                    'missing_count': 0,
+                    'last_seen_at': now,
+                    'updated_at': now,
+                    'deactivated_at': None if case_data.get('is_active', True) else now,
+                }
+                if restored:
+                    lifecycle['created_at'] = restored['created_at']
+                else:
+                    lifecycle['created_at'] = now
+                    if (case_data.get('sub_state') or '').lower() in STATES_BALL_ON_YOU:
+                        # Arrived waiting for us: time the first response
+                        lifecycle['awaiting_response_since'] = now
+
+                new_case = Case(**case_data, **lifecycle)
+                db.session.add(new_case)
+                existing_cases[number] = new_case  # Repeated rows update it
+
+                if restored:
+                    # Back from the archive - not a new case
+                    event_type = 'reactivated'
+                    previous_state = restored['sub_state']
+                    stats['reactivated'] += 1
+                else:
+                    # Create new case - this is a "locked" case
+                    event_type = 'new_case'
+                    previous_state = None
+                    stats['new_cases'] += 1
+
+                # Record as new case event
+                history.add(number, previous_state, case_data.get('sub_state'), event_type,
+                            case_data.get('sla_minutes_left'), case_data.get('priority'), now)
+
+        # Age cases missing from the upload; deactivate them after the grace period
+        missing, deactivated = track_absence(self.processed_numbers, now, history)
+        for number in missing:
+            self.warnings.append(f"Case {number} not in latest {self.missing_label}")
+        for number in deactivated:
+            self.warnings.append(f"Case {number} marked inactive (missing from recent imports)")
+        self.deactivated_numbers.update(deactivated)
+        stats['deactivated'] = len(deactivated)
+
+        # All of this upload's history rows in one executemany
+        history.flush()
+        response_times.flush()
+
+        bump_generation()
+        return stats
+
+    @staticmethod
+    def _load_existing(numbers: List[str]) -> Dict[str, Case]:
+        """Load the upload's existing cases in a few IN queries instead of one per row."""
+        existing = {}
+        for start in range(0, len(numbers), LOOKUP_CHUNK):
+            for case in Case.query.filter(Case.number.in_(numbers[start:start + LOOKUP_CHUNK])):
+                existing[case.number] = case
+        return existing
+
+
+# -- write queue jobs ---------------------------------------------------------
+#
+# Each job stages its changes in the writer's session and returns
+# (result, touched case numbers). The write queue commits, patches the
+# active case store with the touched numbers and resolves the caller's
+# future with the result.
+
+def ingest_upload(cases: List[Dict], source: str,
+                  missing_label: str = 'export') -> Tuple[Dict, Set[str]]:
+    """Save an upload, refresh SLA statuses and publish the upload event."""
+    ingestor = CaseIngestor(missing_label)
+    stats = ingestor.apply(cases)
+
+    monitor = SLAMonitor(current_app)
+    sla_stats, sla_changed = monitor.apply_sla_statuses()
+    urgent_count = sla_stats[SLAMonitor.SLA_STATUS_BREACHED] + sla_stats[SLAMonitor.SLA_STATUS_CRITICAL]
+
+    publish_event('upload', {
+        'source': source,
+        'case_count': len(cases),
+        'new_cases': stats['new_cases'],
+        'updated_cases': stats['updated_cases'],
+        'urgent_count': urgent_count
+    })
+    prune_events(current_app.config.get('EVENT_LOG_SIZE', 1000))
+
+    result = {
+        'stats': stats,
+        'sla_stats': sla_stats,
+        'urgent_count': urgent_count,
+        'warnings': ingestor.warnings
+    }
+    return result, ingestor.touched_numbers | set(sla_changed)
+
+
+def check_sla() -> Tuple[Dict, List[str]]:
+    """Scheduled SLA pass: refresh statuses and trim the change log."""
+    stats, changed = SLAMonitor(current_app).apply_sla_statuses()
+    prune_events(current_app.config.get('EVENT_LOG_SIZE', 1000))
+    return stats, changed
+
+
+def notify_urgent(cases: Optional[List[Case]] = None) -> Tuple[int, List[str]]:
+    """Send desktop notifications for urgent cases (respecting the cooldown)."""
+    if cases is None:
+        cases = SLAMonitor(current_app).get_urgent_cases()
+    if not cases:
+        return 0, []
+    return NotificationService(current_app).apply_urgent_notifications(cases)
@@ -0,0 +1,113 @@
+"""
+Recording of raw upload payloads for replay (INGEST_RECORD_DIR).
+
+Every /api/upload and /api/upload-json payload is stored gzip-compressed
+under objects/, named by the SHA-256 of its content, so a sync that repeats
+an earlier payload byte for byte costs one index line and no new object.
+The index is one JSON Lines file per UTC day (index/YYYY-MM-DD.jsonl) with
+the time, endpoint, kind, source and digest of each upload. Index lines are
+appended with a single write and objects are renamed into place, so
+several gunicorn workers can share the directory. benchmarks.replay feeds
+a recorded day back in.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from flask import current_app
+
+from app.metrics import INGEST_RECORDED
+
+
+# Upload kind -> endpoint it arrived on (and is replayed to)
+ENDPOINTS = {'csv': '/api/upload', 'json': '/api/upload-json'}
+
+
+class IngestRecorder:
+    """Content-addressed payload store plus a per-day index."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.objects = os.path.join(directory, 'objects')
+        self.index = os.path.join(directory, 'index')
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.index, exist_ok=True)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], f'{digest}.gz')
+
+    def record(self, kind: str, payload: bytes, source: str,
+               recorded_at: Optional[datetime] = None) -> Dict:
+        """Store `payload` unless already present and append its index entry."""
+        recorded_at = recorded_at or datetime.utcnow()
+        digest = hashlib.sha256(payload).hexdigest()
+        path = self._object_path(digest)
+        stored = not os.path.exists(path)
+        if stored:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # A unique temporary per call: threads of one worker may store the same payload at once
+            descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f'.{digest}.', suffix='.tmp')
+            try:
+                with os.fdopen(descriptor, 'wb') as handle:
+                    handle.write(gzip.compress(payload, 6))
+                os.replace(temporary, path)
+            except BaseException:
+                if os.path.exists(temporary):
+                    os.unlink(temporary)
+                raise
+
+        entry = {
+            'recorded_at': recorded_at.isoformat(),
+            'kind': kind,
+            'endpoint': ENDPOINTS[kind],
+            'source': source,
+            'sha256': digest,
+            'bytes': len(payload),
+        }
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+        # One O_APPEND write per entry: lines from concurrent workers never interleave
+        descriptor = os.open(os.path.join(self.index, f'{recorded_at.date().isoformat()}.jsonl'),
+                             os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line)
+        finally:
+            os.close(descriptor)
+        return dict(entry, stored=stored)
+
+    def days(self) -> List[str]:
+        """Recorded days (YYYY-MM-DD), oldest first."""
+        return sorted(name[:-len('.jsonl')] for name in os.listdir(self.index) if name.endswith('.jsonl'))
+
+    def entries(self, day: str) -> Iterator[Dict]:
+        """Index entries of one day in the order they were recorded."""
+        with open(os.path.join(self.index, f'{day}.jsonl'), encoding='utf-8') as handle:
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+
+    def load(self, digest: str) -> bytes:
+        with open(self._object_path(digest), 'rb') as handle:
+            return gzip.decompress(handle.read())
+
+
+_recorders: Dict[str, IngestRecorder] = {}
+
+
+def record_ingest_payload(kind: str, payload: bytes, source: str) -> None:
+    """Record an upload payload when INGEST_RECORD_DIR is set; never fails the upload."""
+    directory = current_app.config.get('INGEST_RECORD_DIR')
+    if not directory:
+        return
+    try:
+        recorder = _recorders.get(directory)
+        if recorder is None:
+            recorder = _recorders.setdefault(directory, IngestRecorder(directory))
+        entry = recorder.record(kind, payload, source)
+    except OSError as e:
+        current_app.logger.warning(f"Could not record {kind} upload: {e}")
+        return
+    INGEST_RECORDED.labels(kind, str(entry['stored']).lower()).inc()
@@ -0,0 +1,283 @@
+"""
+Telemetry and pacing for the scheduled jobs in run.py.
+
+Jobs registered with scheduled_job() run with explicit overlap and catch-up
+policies: at most one instance at a time (a run that comes due while the
+previous one is still going is skipped), missed runs coalesced into one,
+and runs later than SCHEDULER_MISFIRE_GRACE seconds dropped. Every run is
+recorded with how late it started against its scheduled time, how long it
+took, the rows it processed and its outcome, as are skipped and missed
+runs; the last SCHEDULER_HISTORY_SIZE records are kept for
+/api/scheduler/jobs.
+
+A run taking more than SCHEDULER_BACKOFF_RATIO of the job's interval
+doubles the interval (up to SCHEDULER_MAX_BACKOFF times the configured
+one); once runs are short again it is halved back toward the configured
+interval.
+
+Jobs run in one process (see app.jobs). That process writes the summaries
+and runs to a shared file after each change, and processes without jobs
+answer from the file.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from app.metrics import SCHEDULER_JOB_LAG_SECONDS, SCHEDULER_JOB_RUNS, SCHEDULER_JOB_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _seconds_since(moment: datetime, now: datetime) -> float:
+    return round((now - moment).total_seconds(), 3)
+
+
+class JobTelemetry:
+    """Per-job summaries plus a ring buffer of recent runs."""
+
+    def __init__(self, size: int = 500):
+        self._lock = threading.Lock()
+        self.runs = deque(maxlen=size)
+        self.jobs: Dict[str, Dict] = {}
+        self._latest: Dict[str, Dict] = {}  # Job id -> its latest run, until the scheduler reports its lag
+        self.backoff_ratio = 0.5
+        self.max_backoff = 8
+        self.state_file: Optional[str] = None
+
+    def configure(self, size: int, backoff_ratio: float, max_backoff: int) -> None:
+        with self._lock:
+            if size != self.runs.maxlen:
+                self.runs = deque(self.runs, maxlen=size)
+            self.backoff_ratio = backoff_ratio
+            self.max_backoff = max_backoff
+
+    def share(self, path: Optional[str]) -> None:
+        """File the process running the jobs writes its telemetry to and the others read."""
+        self.state_file = path
+
+    def _publish(self) -> None:
+        """Write jobs and runs to the shared file (replaced atomically); call without the lock held."""
+        if not self.state_file:
+            return
+        with self._lock:
+            payload = json.dumps({'jobs': list(self.jobs.values()), 'runs': list(self.runs)})
+        temp = None
+        try:
+            fd, temp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.state_file)),
+                                        prefix='.jobs-', suffix='.tmp')
+            with os.fdopen(fd, 'w') as handle:
+                handle.write(payload)
+            os.replace(temp, self.state_file)
+        except OSError as e:
+            logger.warning(f'Could not write job telemetry to {self.state_file}: {e}')
+            if temp is not None and os.path.exists(temp):
+                os.unlink(temp)
+
+    def _shared(self) -> Dict:
+        try:
+            with open(self.state_file) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {'jobs': [], 'runs': []}
+
+    def register(self, job_id: str, seconds: float, adaptive: bool) -> None:
+        with self._lock:
+            self.jobs[job_id] = {
+                'job': job_id,
+                'base_interval_s': seconds,
+                'interval_s': seconds,
+                'adaptive': adaptive,
+                'runs': 0,
+                'errors': 0,
+                'skipped': 0,
+                'missed': 0,
+                'last_started_at': None,
+                'last_duration_s': None,
+                'max_duration_s': None,
+                'last_lag_s': None,
+                'max_lag_s': None,
+                'last_outcome': None,
+            }
+        self._publish()
+
+    def started(self, job_id: str) -> Dict:
+        record = {
+            'job': job_id,
+            'outcome': 'running',
+            'scheduled_at': None,
+            'started_at': _now().isoformat(),
+            'lag_s': None,
+            'duration_s': None,
+            'rows': None,
+            'error': None,
+            '_started': time.perf_counter(),
+        }
+        with self._lock:
+            self._latest[job_id] = record
+            self.jobs[job_id]['last_started_at'] = record['started_at']
+            self.jobs[job_id]['last_outcome'] = 'running'
+        return record
+
+    def finished(self, record: Dict, rows: Optional[int], error: Optional[BaseException] = None) -> Optional[float]:
+        """Complete a run; returns the job's new interval if it should change."""
+        duration = time.perf_counter() - record.pop('_started')
+        outcome = 'error' if error is not None else 'ok'
+        SCHEDULER_JOB_SECONDS.labels(record['job'], outcome).observe(duration)
+        SCHEDULER_JOB_RUNS.labels(record['job'], outcome).inc()
+        with self._lock:
+            record.update(outcome=outcome, duration_s=round(duration, 3), rows=rows,
+                          error=repr(error) if error is not None else None)
+            self.runs.append(record)
+            summary = self.jobs[record['job']]
+            summary['runs'] += 1
+            summary['errors'] += error is not None
+            summary['last_duration_s'] = record['duration_s']
+            summary['max_duration_s'] = max(summary['max_duration_s'] or 0.0, record['duration_s'])
+            summary['last_outcome'] = outcome
+            interval = None
+            if error is None and summary['adaptive']:
+                interval = self._next_interval(summary, duration)
+        self._publish()
+        return interval
+
+    def _next_interval(self, summary: Dict, duration: float) -> Optional[float]:
+        current, base = summary['interval_s'], summary['base_interval_s']
+        limit = self.backoff_ratio * current
+        if duration > limit and current < base * self.max_backoff:
+            interval = min(current * 2, base * self.max_backoff)
+        elif duration < limit / 4 and current > base:
+            # A quarter of the limit: halving the interval does not immediately trip it again
+            interval = max(current / 2, base)
+        else:
+            return None
+        summary['interval_s'] = interval
+        return interval
+
+    def scheduled(self, job_id: str, scheduled_at: datetime) -> None:
+        """Record the lag of the job's latest run against its scheduled time."""
+        with self._lock:
+            record = self._latest.pop(job_id, None)
+            if record is None:
+                return
+            lag = max(0.0, _seconds_since(scheduled_at, datetime.fromisoformat(record['started_at'])))
+            record.update(scheduled_at=scheduled_at.astimezone(timezone.utc).isoformat(), lag_s=lag)
+            summary = self.jobs.get(job_id)
+            if summary is not None:
+                summary['last_lag_s'] = lag
+                summary['max_lag_s'] = max(summary['max_lag_s'] or 0.0, lag)
+        SCHEDULER_JOB_LAG_SECONDS.labels(job_id).observe(lag)
+        self._publish()
+
+    def not_run(self, job_id: str, scheduled_at: datetime, outcome: str) -> None:
+        """A run skipped (previous one still going) or missed (past the grace time)."""
+        now = _now()
+        SCHEDULER_JOB_RUNS.labels(job_id, outcome).inc()
+        with self._lock:
+            self.runs.append({
+                'job': job_id,
+                'outcome': outcome,
+                'scheduled_at': scheduled_at.astimezone(timezone.utc).isoformat(),
+                'started_at': None,
+                'lag_s': _seconds_since(scheduled_at, now),
+                'duration_s': None,
+                'rows': None,
+                'error': None,
+            })
+            summary = self.jobs.get(job_id)
+            if summary is not None:
+                summary[outcome] += 1
+                summary['last_outcome'] = outcome
+        self._publish()
+
+    def snapshot(self, job: Optional[str] = None, limit: int = 100) -> Dict:
+        """Job summaries and the most recent runs, newest first."""
+        with self._lock:
+            local = bool(self.jobs)
+            all_jobs = [dict(summary) for summary in self.jobs.values()]
+            all_runs = [dict(run) for run in self.runs]
+        if not local and self.state_file:
+            shared = self._shared()  # The jobs run in another process
+            all_jobs, all_runs = shared['jobs'], shared['runs']
+        jobs = [summary for summary in all_jobs if job in (None, summary['job'])]
+        runs: List[Dict] = [run for run in reversed(all_runs) if job in (None, run['job'])][:limit]
+        return {'jobs': jobs, 'runs': runs}
+
+
+job_telemetry = JobTelemetry()
+
+_listener_installed = False
+
+
+def _on_scheduler_event(event) -> None:
+    from apscheduler.events import (
+        EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+    )
+
+    if event.job_id not in job_telemetry.jobs:
+        return
+    if event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+        job_telemetry.scheduled(event.job_id, event.scheduled_run_time)
+    elif event.code == EVENT_JOB_MISSED:
+        job_telemetry.not_run(event.job_id, event.scheduled_run_time, 'missed')
+    elif event.code == EVENT_JOB_MAX_INSTANCES:
+        for scheduled_at in event.scheduled_run_times:
+            job_telemetry.not_run(event.job_id, scheduled_at, 'skipped')
+
+
+def scheduled_job(app, scheduler, job_id: str, seconds: float, adaptive: bool = True):
+    """
+    Register the decorated function as an instrumented interval job.
+
+    The function runs inside an app context and returns the number of rows
+    it processed (or None). `adaptive` enables the interval backoff.
+    """
+    # Imported here: the API reads job_telemetry in processes that never run jobs
+    from apscheduler.events import (
+        EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+    )
+
+    global _listener_installed
+    job_telemetry.configure(app.config.get('SCHEDULER_HISTORY_SIZE', 500),
+                            app.config.get('SCHEDULER_BACKOFF_RATIO', 0.5),
+                            app.config.get('SCHEDULER_MAX_BACKOFF', 8))
+    if not _listener_installed:
+        scheduler.add_listener(_on_scheduler_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR
+                               | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES)
+        _listener_installed = True
+
+    def decorator(fn: Callable[[], Optional[int]]):
+        job_telemetry.register(job_id, seconds, adaptive)
+
+        @wraps(fn)
+        def run():
+            with app.app_context():
+                record = job_telemetry.started(job_id)
+                try:
+                    rows = fn()
+                except Exception as e:
+                    job_telemetry.finished(record, None, e)
+                    raise  # Logged by APScheduler
+                interval = job_telemetry.finished(record, rows)
+            if interval is not None:
+                log = app.logger.warning if interval > seconds else app.logger.info
+                log(f"Scheduled job {job_id} took {record['duration_s']}s; interval is now {interval:g}s")
+                scheduler.scheduler.reschedule_job(job_id, trigger='interval', seconds=interval)
+
+        scheduler.add_job(id=job_id, func=run, trigger='interval', seconds=seconds,
+                          max_instances=1, coalesce=True,
+                          misfire_grace_time=app.config.get('SCHEDULER_MISFIRE_GRACE', 30),
+                          replace_existing=True)
+        return run
+
+    return decorator
@@ -1,8 +1,8 @@
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional
-from app.models.case import Case
-from app.models.case_history import CaseHistory
 from app.utils.time_parser import parse_sla_time, parse_priority
+from app.services.ingest import CaseIngestor
+from app.services.active_case_store import active_case_store
 from app import db
 
 
@@ -56,6 +56,7 @@ class JSONParser:
         self.cases_data = cases_data
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        self.skipped = 0  # Cases without a case number
 
     def parse(self) -> Tuple[List[Dict], List[str], List[str]]:
         """Parse JSON case data and return list of normalized case dictionaries."""
@@ -66,6 +67,8 @@ class JSONParser:
                 case_data = self._parse_case(raw_case)
                 if case_data:
                     cases.append(case_data)
+                else:
+                    self.skipped += 1
             except Exception as e:
                 self.errors.append(f"Case {idx}: {str(e)}")
 
@@ -135,84 +138,11 @@ class JSONParser:
 
     def save_to_database(self, cases: List[Dict]) -> Dict:
         """Save parsed cases to database, tracking state transitions."""
-        stats = {
-            'new_cases': 0,        # First time seeing this case (locked)
-            'updated_cases': 0,    # Existing case updated
-            'incoming': 0,         # Switched TO open/new (customer responded)
-            'handled': 0,          # Switched FROM open/new (you responded)
-            'state_changes': []    # Detailed list of changes
-        }
-
-        processed_numbers = set()
-
-        for case_data in cases:
-            number = case_data['number']
-            processed_numbers.add(number)
-
-            existing = Case.query.filter_by(number=number).first()
-
-            if existing:
-                # Track state change
-                old_state = existing.sub_state
-                new_state = case_data.get('sub_state')
-
-                if old_state != new_state:
-                    # Determine event type
-                    event_type = CaseHistory.determine_event_type(old_state, new_state)
-
-                    stats['state_changes'].append({
-                        'number': number,
-                        'from': old_state,
-                        'to': new_state,
-                        'event_type': event_type
-                    })
-
-                    # Count incoming/handled
-                    if event_type == 'incoming':
-                        stats['incoming'] += 1
-                    elif event_type == 'handled':
-                        stats['handled'] += 1
-
-                    # Record state transition in history
-                    history = CaseHistory(
-                        case_number=number,
-                        previous_state=old_state,
-                        new_state=new_state,
-                        event_type=event_type,
-                        sla_minutes_left=case_data.get('sla_minutes_left'),
-                        priority=case_data.get('priority')
-                    )
-                    db.session.add(history)
-
-                # Update existing case
-                for key, value in case_data.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-
-                stats['updated_cases'] += 1
-            else:
-                # Create new case - this is a "locked" case
-                new_case = Case(**case_data)
-                db.session.add(new_case)
-                stats['new_cases'] += 1
-
-                # Record as new case event
-                history = CaseHistory(
-                    case_number=number,
-                    previous_state=None,
-                    new_state=case_data.get('sub_state'),
-                    event_type='new_case',
-                    sla_minutes_left=case_data.get('sla_minutes_left'),
-                    priority=case_data.get('priority')
-                )
-                db.session.add(history)
-
-        # Mark cases not in import as potentially closed (but don't auto-close)
-        active_cases = Case.query.filter_by(is_active=True).all()
-        for case in active_cases:
-            if case.number not in processed_numbers:
-                self.warnings.append(f"Case {case.number} not in latest import")
+        ingestor = CaseIngestor(missing_label='import')
+        stats = ingestor.apply(cases)
+        self.warnings.extend(ingestor.warnings)
 
         db.session.commit()
+        active_case_store.patch(ingestor.touched_numbers)
 
         return stats
@@ -1,11 +1,24 @@
 import threading
+import time
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Tuple
+from sqlalchemy import select
 from app.models.case import Case
 from app.models.notification import NotificationLog
+from app.services.event_service import publish_event
+from app.services.data_generation import bump_generation
+from app.services.active_case_store import active_case_store
+from app.metrics import NOTIFICATION_DELIVERY_SECONDS
 from app import db
 
 
+# Output fields in the same order as NotificationLog.to_dict()
+NOTIFICATION_FIELDS = (
+    'id', 'case_number', 'notification_type', 'title', 'message', 'delivered', 'created_at'
+)
+NOTIFICATION_COLUMNS = NotificationLog.__table__.c
+
+
 class NotificationService:
     """Handle desktop notifications for urgent cases."""
 
@@ -50,7 +63,23 @@ class NotificationService:
         if not self.app:
             return 0
 
+        notifications_sent, notified_numbers = self.apply_urgent_notifications(cases)
+        if notifications_sent > 0 or len(cases) > 0:
+            db.session.commit()
+        if notified_numbers:
+            active_case_store.patch(notified_numbers)
+
+        return notifications_sent
+
+    def apply_urgent_notifications(self, cases: List[Case]) -> Tuple[int, List[str]]:
+        """
+        Send notifications and stage their log rows without committing.
+
+        Returns the number of notifications sent and the notified case numbers.
+        """
+
         notifications_sent = 0
+        notified_numbers = []
         cooldown_seconds = self.app.config.get('NOTIFICATION_COOLDOWN', 300)
 
         for case in cases:
@@ -76,11 +105,13 @@ class NotificationService:
                 message += f"\n{desc}"
 
             # Send notification
+            started = time.perf_counter()
             success = self.send_desktop_notification(
                 title=title,
                 message=message,
                 timeout=15
             )
+            NOTIFICATION_DELIVERY_SECONDS.labels(str(success).lower()).observe(time.perf_counter() - started)
 
             # Log notification regardless of delivery success
             log = NotificationLog(
@@ -91,16 +122,23 @@ class NotificationService:
                 delivered=success
             )
             db.session.add(log)
+            publish_event('notification', {
+                'number': case.number,
+                'title': title,
+                'delivered': success
+            })
 
             if success:
                 # Update case notification timestamp
                 case.last_notification_at = datetime.utcnow()
                 notifications_sent += 1
+                notified_numbers.append(case.number)
 
-        if notifications_sent > 0 or len(cases) > 0:
-            db.session.commit()
+        if notified_numbers:
+            # last_notification_at also moves updated_at on the case rows
+            bump_generation()
 
-        return notifications_sent
+        return notifications_sent, notified_numbers
 
     def get_recent_notifications(self, limit: int = 20) -> List[NotificationLog]:
         """Get recent notification history."""
@@ -108,6 +146,15 @@ class NotificationService:
             NotificationLog.created_at.desc()
         ).limit(limit).all()
 
+    def get_recent_notification_rows(self, limit: int = 20) -> List[Dict]:
+        """Recent notification history as plain dicts, read without the ORM."""
+        rows = db.session.execute(
+            select(*[NOTIFICATION_COLUMNS[name] for name in NOTIFICATION_FIELDS])
+            .order_by(NOTIFICATION_COLUMNS['created_at'].desc())
+            .limit(limit)
+        ).all()
+        return [dict(zip(NOTIFICATION_FIELDS, row)) for row in rows]
+
     def should_notify(self, case: Case) -> bool:
         """Check if we should send notification for this case."""
         if not self.app:
@@ -0,0 +1,179 @@
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.sqlite import insert
+from app.models.case import Case
+from app.models.case_archive import CaseArchive
+from app.models.case_history import CaseHistory, STATES_BALL_ON_YOU
+from app.models.lookup import CaseState, CasePriority
+from app.models.response_time_sketch import ResponseTimeSketch
+from app.utils.ddsketch import DDSketch
+from app import db
+
+
+DEFAULT_ACCURACY = 0.01
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Dimensions percentiles can be grouped by
+GROUP_FIELDS = ('day', 'priority', 'region')
+
+# Stored in place of a missing priority/region (part of the unique key)
+UNKNOWN = 'Unknown'
+
+_sketches = ResponseTimeSketch.__table__
+_cases = Case.__table__
+
+Key = Tuple[date, str, str]
+
+
+class ResponseTimeRecorder:
+    """
+    Collect response times during an ingest and merge them into the stored
+    per day/priority/region sketches.
+
+    flush() reads only the sketches for the keys it touched, adds the new
+    samples and writes them back with one upsert. Nothing is committed; it
+    runs inside the single writer, so the read-merge-write cannot race.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self._samples: Dict[Key, List[float]] = {}
+
+    def add(self, started_at: datetime, handled_at: datetime,
+            priority: Optional[str], region: Optional[str]) -> None:
+        key = (handled_at.date(), priority or UNKNOWN, region or UNKNOWN)
+        self._samples.setdefault(key, []).append((handled_at - started_at).total_seconds())
+
+    def __len__(self):
+        return sum(len(values) for values in self._samples.values())
+
+    def flush(self, bind=None) -> int:
+        """Merge the collected samples; returns how many were written."""
+        if not self._samples:
+            return 0
+        bind = bind if bind is not None else db.session
+
+        sketches: Dict[Key, DDSketch] = {}
+        rows = bind.execute(
+            select(_sketches.c.day, _sketches.c.priority, _sketches.c.region, _sketches.c.sketch)
+            .where(_sketches.c.day.in_(sorted({key[0] for key in self._samples})))
+        ).all()
+        for row in rows:
+            key = (row.day, row.priority, row.region)
+            if key in self._samples:
+                sketches[key] = DDSketch.from_bytes(row.sketch)
+
+        now = datetime.utcnow()
+        values = []
+        for key, samples in self._samples.items():
+            # Existing sketches keep the accuracy they were created with
+            sketch = sketches.get(key) or DDSketch(self.relative_accuracy)
+            for seconds in samples:
+                sketch.add(seconds)
+            values.append({
+                'day': key[0], 'priority': key[1], 'region': key[2],
+                'sample_count': sketch.count, 'sketch': sketch.to_bytes(), 'updated_at': now,
+            })
+
+        statement = insert(_sketches)
+        bind.execute(
+            statement.on_conflict_do_update(
+                index_elements=['day', 'priority', 'region'],
+                set_={name: statement.excluded[name] for name in ('sample_count', 'sketch', 'updated_at')}
+            ),
+            values
+        )
+        written = len(self)
+        self._samples = {}
+        return written
+
+
+def response_time_percentiles(start: date, end: date, group_by: Sequence[str] = (),
+                              quantiles: Sequence[float] = DEFAULT_QUANTILES) -> List[Dict]:
+    """
+    Response-time percentiles (seconds) for responses between `start` and
+    `end` (inclusive), one entry per combination of the `group_by` fields.
+
+    Reads one small sketch per day/priority/region and merges them, so the
+    cost depends on the number of days and groups, not on history size.
+    """
+    unknown = [field for field in group_by if field not in GROUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown group_by fields: {', '.join(unknown)}")
+
+    rows = db.session.execute(
+        select(_sketches.c.day, _sketches.c.priority, _sketches.c.region, _sketches.c.sketch)
+        .where(_sketches.c.day >= start, _sketches.c.day <= end)
+    ).all()
+
+    merged: Dict[Tuple, DDSketch] = {}
+    for row in rows:
+        key = tuple(getattr(row, field) for field in group_by)
+        sketch = DDSketch.from_bytes(row.sketch)
+        if key in merged:
+            merged[key].merge(sketch)
+        else:
+            merged[key] = sketch
+
+    results = []
+    for key in sorted(merged):
+        sketch = merged[key]
+        entry = dict(zip(group_by, key))
+        entry['count'] = sketch.count
+        entry['mean'] = round(sketch.mean, 1)
+        for q in quantiles:
+            entry[f'p{q * 100:g}'] = round(sketch.quantile(q), 1)
+        results.append(entry)
+    return results
+
+
+def rebuild_response_times(bind=None, relative_accuracy: float = DEFAULT_ACCURACY) -> int:
+    """
+    Recompute every sketch, and each case's pending wait, from case_history.
+
+    Walks the history once in (case_number, recorded_at) order, pairing
+    each wait (a new case arriving in Open/New, or an 'incoming' event) with
+    the 'handled' event that ends it. Region comes from the case (history
+    does not record it). Nothing is committed. Returns the number of
+    response times recorded.
+    """
+    bind = bind if bind is not None else db.session
+    history = CaseHistory.__table__
+
+    states = dict(bind.execute(select(CaseState.id, CaseState.name)).all())
+    priorities = dict(bind.execute(select(CasePriority.id, CasePriority.name)).all())
+    regions = dict(bind.execute(select(CaseArchive.number, CaseArchive.region)).all())
+    regions.update(bind.execute(select(Case.number, Case.region)).all())
+
+    bind.execute(delete(_sketches))
+    # Not a change to the cases themselves: keep updated_at
+    bind.execute(update(_cases).values(awaiting_response_since=None, updated_at=_cases.c.updated_at))
+
+    recorder = ResponseTimeRecorder(relative_accuracy)
+    waiting: Dict[str, datetime] = {}
+    rows = bind.execute(
+        select(history.c.case_number, history.c.event_type, history.c.new_state_id,
+               history.c.priority_id, history.c.recorded_at)
+        .order_by(history.c.case_number, history.c.recorded_at, history.c.id)
+    )
+    for row in rows:
+        if row.recorded_at is None:
+            continue
+        if row.event_type == 'incoming' or (
+                row.event_type == 'new_case'
+                and (states.get(row.new_state_id) or '').lower() in STATES_BALL_ON_YOU):
+            waiting[row.case_number] = row.recorded_at
+        elif row.event_type == 'handled' and row.case_number in waiting:
+            recorder.add(waiting.pop(row.case_number), row.recorded_at,
+                         priorities.get(row.priority_id), regions.get(row.case_number))
+
+    recorded = recorder.flush(bind)
+    if waiting:
+        bind.execute(
+            update(_cases)
+            .where(_cases.c.number == db.bindparam('case_number'))
+            .values(awaiting_response_since=db.bindparam('since'), updated_at=_cases.c.updated_at),
+            [{'case_number': number, 'since': since} for number, since in waiting.items()]
+        )
+    return recorded
@@ -1,9 +1,26 @@
-from typing import List, Dict, Optional
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 from flask import current_app
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm.attributes import flag_modified
 from app.models.case import Case
+from app.models.case_history import STATES_BALL_ON_YOU
+from app.services.data_generation import bump_generation
+from app.services.event_service import publish_event
+from app.services.active_case_store import active_case_store
+from app.metrics import SLA_UPDATE_SECONDS
 from app import db
 
 
+_cases = Case.__table__
+
+# Urgency rewrites leave updated_at alone: it tracks changes from the source
+_set_urgency = _cases.update().where(_cases.c.id == bindparam('case_id')).values(
+    urgency_score=bindparam('score'), updated_at=_cases.c.updated_at
+)
+
+
 class SLAMonitor:
     """Monitor SLA status and calculate urgency levels."""
 
@@ -39,8 +56,90 @@ class SLAMonitor:
         else:
             return self.SLA_STATUS_OK
 
+    def get_urgency_weights(self) -> Dict[str, int]:
+        """Get urgency score points from config."""
+        config = self.app.config
+        return {
+            'priority': config.get('URGENCY_PRIORITY_POINTS', 100),
+            'sla': config.get('URGENCY_SLA_POINTS', 400),
+            'sla_horizon': max(1, config.get('URGENCY_SLA_HORIZON', 480)),
+            'ball_on_you': config.get('URGENCY_BALL_ON_YOU_POINTS', 200),
+            'stale': config.get('URGENCY_STALE_POINTS', 5),
+            'stale_max_hours': config.get('URGENCY_STALE_MAX_HOURS', 48),
+        }
+
+    def calculate_urgency_score(self, priority_level: Optional[int], minutes_left: Optional[int],
+                                sub_state: Optional[str], weights: Optional[Dict[str, int]] = None) -> int:
+        """
+        The stored part of a case's urgency: points that change only with its data.
+
+        The sum of: priority (per level above 5), SLA (full points at or past
+        breach, falling linearly to none at the horizon) and ball on you (Open
+        or New). Unknown priority or SLA add nothing. Staleness grows with the
+        clock, so it is added when read (see staleness_points).
+        """
+        weights = weights or self.get_urgency_weights()
+        score = 0
+        if priority_level:
+            score += max(0, 5 - priority_level) * weights['priority']
+        if minutes_left is not None:
+            horizon = weights['sla_horizon']
+            score += weights['sla'] * (horizon - min(max(minutes_left, 0), horizon)) // horizon
+        if (sub_state or '').lower() in STATES_BALL_ON_YOU:
+            score += weights['ball_on_you']
+        return score
+
+    def staleness_points(self, updated_on: Optional[datetime], now: datetime,
+                         weights: Optional[Dict[str, int]] = None) -> int:
+        """Urgency points per whole hour since sys_updated_on, capped; none if unknown."""
+        if updated_on is None:
+            return 0
+        weights = weights or self.get_urgency_weights()
+        hours = int((now - updated_on).total_seconds() // 3600)
+        return min(max(hours, 0), weights['stale_max_hours']) * weights['stale']
+
+    def rescore_all(self, bind=None) -> int:
+        """
+        Recompute every active case's stored urgency score with Core statements.
+
+        For migrations and other callers without loaded cases; nothing is
+        committed. Returns the number of scores that changed.
+        """
+        bind = bind if bind is not None else db.session
+        weights = self.get_urgency_weights()
+        rows = bind.execute(
+            select(_cases.c.id, _cases.c.priority_level, _cases.c.sla_minutes_left, _cases.c.sub_state,
+                   _cases.c.urgency_score)
+            .where(_cases.c.is_active == True)
+        ).all()
+        rescored = []
+        for row in rows:
+            score = self.calculate_urgency_score(row.priority_level, row.sla_minutes_left, row.sub_state,
+                                                 weights)
+            if score != row.urgency_score:
+                rescored.append({'case_id': row.id, 'score': score})
+        if rescored:
+            bind.execute(_set_urgency, rescored)
+        return len(rescored)
+
     def update_all_sla_statuses(self) -> Dict:
         """Update SLA status for all active cases."""
+        stats, changed = self.apply_sla_statuses()
+        db.session.commit()
+        if changed:
+            active_case_store.patch(changed)
+
+        return stats
+
+    def apply_sla_statuses(self) -> Tuple[Dict, List[str]]:
+        """
+        Stage SLA status and urgency score changes for all active cases
+        without committing.
+
+        Returns the status breakdown and the numbers of cases whose status
+        changed.
+        """
+        started = time.perf_counter()
         stats = {
             'total': 0,
             'breached': 0,
@@ -51,16 +150,38 @@ class SLAMonitor:
         }
 
         active_cases = Case.query.filter_by(is_active=True).all()
+        changed = []
+        weights = self.get_urgency_weights()
+        rescored = []
 
         for case in active_cases:
             status = self.calculate_sla_status(case.sla_minutes_left)
-            case.sla_status = status
+            if case.sla_status != status:
+                publish_event('sla_transition', {
+                    'number': case.number,
+                    'from': case.sla_status,
+                    'to': status,
+                    'sla_minutes_left': case.sla_minutes_left
+                })
+                case.sla_status = status
+                # Derived from the case's own data: keep updated_at (the upload
+                # already stamped it, with the export time when backfilling)
+                flag_modified(case, 'updated_at')
+                changed.append(case.number)
+            score = self.calculate_urgency_score(case.priority_level, case.sla_minutes_left, case.sub_state,
+                                                 weights)
+            if case.urgency_score != score:
+                rescored.append({'case_id': case.id, 'score': score})
             stats['total'] += 1
             stats[status] += 1
 
-        db.session.commit()
+        if rescored:
+            db.session.execute(_set_urgency, rescored)
+        if changed or rescored:
+            bump_generation()
 
-        return stats
+        SLA_UPDATE_SECONDS.observe(time.perf_counter() - started)
+        return stats, changed
 
     def get_urgent_cases(self) -> List[Case]:
         """Get all cases that need immediate attention (critical or breached)."""
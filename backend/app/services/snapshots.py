@@ -0,0 +1,158 @@
+import json
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from flask import current_app
+from sqlalchemy import delete, select
+from app.models.case import Case
+from app.models.case_archive import CaseArchive
+from app.models.case_history import CaseHistory
+from app.models.case_snapshot import CaseSnapshot
+from app.services.csv_parser import CLOSED_STATES
+from app.services.data_generation import get_generation
+from app.services.history_writer import state_lookup, priority_lookup
+from app.utils.fast_json import dumps
+from app import db
+
+
+# Per-case fields kept in a checkpoint and returned by /api/snapshot
+SNAPSHOT_FIELDS = ('number', 'sub_state', 'priority', 'region', 'sla_minutes_left')
+
+# Case numbers per IN (...) lookup, well under SQLite's bound parameter limit
+LOOKUP_CHUNK = 500
+
+_cases = Case.__table__
+_archive = CaseArchive.__table__
+_history = CaseHistory.__table__
+_snapshots = CaseSnapshot.__table__
+
+
+def encode_snapshot(cases: Dict[str, Dict]) -> bytes:
+    """Column-oriented JSON (repeated states/priorities compress well), zlib-compressed."""
+    numbers = sorted(cases)
+    columns = {field: [cases[number][field] for number in numbers] for field in SNAPSHOT_FIELDS[1:]}
+    return zlib.compress(dumps(dict(number=numbers, **columns)), 6)
+
+
+def decode_snapshot(payload: bytes) -> Dict[str, Dict]:
+    columns = json.loads(zlib.decompress(payload))
+    return {
+        row[0]: dict(zip(SNAPSHOT_FIELDS, row))
+        for row in zip(*(columns[field] for field in SNAPSHOT_FIELDS))
+    }
+
+
+def _is_active_state(state: Optional[str]) -> bool:
+    """Same rule the CSV/JSON parsers use for is_active."""
+    return not state or state.lower() not in CLOSED_STATES
+
+
+# -- write queue job ----------------------------------------------------------
+
+def write_snapshot(retention_days: Optional[int] = None,
+                   now: Optional[datetime] = None) -> Tuple[Dict, List[str]]:
+    """
+    Write queue job: checkpoint the active case set and prune old checkpoints.
+
+    Running in the single writer means every earlier ingest has committed,
+    so the checkpoint holds exactly the history recorded before taken_at.
+    Nothing is written if the data generation has not moved since the last
+    checkpoint. Backfills pass the export time as `now`. Returns
+    ({'written': bool, ...}, no touched numbers).
+    """
+    if retention_days is None:
+        retention_days = current_app.config.get('SNAPSHOT_RETENTION_DAYS', 90)
+    now = now or datetime.utcnow()
+    generation = get_generation()
+
+    latest = db.session.execute(
+        select(_snapshots.c.generation).order_by(_snapshots.c.taken_at.desc()).limit(1)
+    ).scalar()
+    written = latest is None or latest != generation
+
+    result = {'written': written, 'taken_at': now.isoformat()}
+    if written:
+        rows = db.session.execute(
+            select(*[_cases.c[field] for field in SNAPSHOT_FIELDS]).where(_cases.c.is_active == True)
+        ).all()
+        payload = encode_snapshot({row.number: dict(row._mapping) for row in rows})
+        db.session.execute(
+            _snapshots.insert().values(taken_at=now, generation=generation,
+                                       case_count=len(rows), payload=payload)
+        )
+        result.update(case_count=len(rows), size=len(payload))
+
+    if retention_days:
+        pruned = db.session.execute(
+            delete(_snapshots).where(_snapshots.c.taken_at < now - timedelta(days=retention_days))
+        )
+        result['pruned'] = pruned.rowcount
+    return result, []
+
+
+# -- point-in-time reads ------------------------------------------------------
+
+def snapshot_at(at: datetime) -> Dict:
+    """
+    Active cases as they were at `at` (naive UTC).
+
+    Loads the latest checkpoint taken at or before `at` and replays only the
+    history recorded between the checkpoint and `at`, so the cost is bounded
+    by SNAPSHOT_INTERVAL rather than by total history. Before the oldest
+    checkpoint the replay starts from the beginning of history. State,
+    priority and SLA minutes are as of each case's last recorded event.
+    """
+    checkpoint = db.session.execute(
+        select(_snapshots.c.taken_at, _snapshots.c.payload)
+        .where(_snapshots.c.taken_at <= at)
+        .order_by(_snapshots.c.taken_at.desc())
+        .limit(1)
+    ).first()
+
+    cases = decode_snapshot(checkpoint.payload) if checkpoint else {}
+    active = set(cases)
+
+    conditions = [_history.c.recorded_at <= at]
+    if checkpoint:
+        conditions.append(_history.c.recorded_at > checkpoint.taken_at)
+    events = db.session.execute(
+        select(_history.c.case_number, _history.c.new_state_id, _history.c.event_type,
+               _history.c.sla_minutes_left, _history.c.priority_id)
+        .where(*conditions)
+        .order_by(_history.c.recorded_at, _history.c.id)
+    ).all()
+
+    for event in events:
+        number = event.case_number
+        if event.event_type == 'deactivated':
+            active.discard(number)
+            continue
+        case = cases.setdefault(number, dict.fromkeys(SNAPSHOT_FIELDS, None))
+        case['number'] = number
+        case['sub_state'] = state_lookup.name_for(event.new_state_id)
+        case['sla_minutes_left'] = event.sla_minutes_left
+        if event.priority_id is not None:
+            case['priority'] = priority_lookup.name_for(event.priority_id)
+        if _is_active_state(case['sub_state']):
+            active.add(number)
+        else:
+            active.discard(number)
+
+    # History does not record the region: take it from the case (or its
+    # archived copy) for cases first seen after the checkpoint
+    missing = [number for number in active if cases[number]['region'] is None]
+    for start in range(0, len(missing), LOOKUP_CHUNK):
+        chunk = missing[start:start + LOOKUP_CHUNK]
+        for table in (_cases, _archive):
+            for number, region in db.session.execute(
+                select(table.c.number, table.c.region).where(table.c.number.in_(chunk))
+            ):
+                cases[number]['region'] = region
+
+    return {
+        'at': at,
+        'checkpoint': checkpoint.taken_at if checkpoint else None,
+        'replayed_events': len(events),
+        'total': len(active),
+        'cases': [cases[number] for number in sorted(active)],
+    }
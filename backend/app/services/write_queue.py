@@ -0,0 +1,203 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from app.services.active_case_store import active_case_store
+from app.services.data_generation import pop_generation_bumps
+from app.metrics import WRITE_QUEUE_DEPTH, WRITE_QUEUE_WAIT_SECONDS
+from app.sql_profiler import include_profile, profile_scope
+from app import db
+
+
+class WriteJob:
+    """One queued mutation and the future its caller waits on."""
+    __slots__ = ('fn', 'args', 'kwargs', 'group', 'future', 'queued_at', 'profile', 'retried')
+
+    def __init__(self, fn: Callable, args, kwargs, group: bool):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.group = group
+        self.future = Future()
+        self.queued_at = None
+        self.profile = None  # SQL profile of the transaction that ran it
+        self.retried = False
+
+    @property
+    def name(self) -> str:
+        return getattr(self.fn, '__name__', 'job')
+
+
+class WriteQueue:
+    """
+    Serialize this process's database writes through one writer thread.
+
+    Request threads and scheduler jobs submit a job function and get a
+    Future back. A job stages its changes in the writer's session and
+    returns (result, touched case numbers); it never commits itself. The
+    writer drains whatever jobs queued up while the previous commit was in
+    flight and commits them as one transaction (group commit), then patches
+    the active case store once and resolves every future. If a group fails,
+    its jobs are retried one by one so only the failing job reports the error.
+    A job failing on a unique constraint is run once more: another worker
+    process inserted the same new case between this job's read and its
+    commit, and the second run sees that row.
+
+    Jobs submitted with group=False (e.g. desktop notifications, which have
+    side effects outside the database) always run in a transaction of their
+    own. Writers in other worker processes still contend for SQLite's write
+    lock; the storage profile's busy_timeout makes them wait for it.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._app = None
+        self._pending = None
+        self._local = threading.local()
+        self.stats = {'jobs': 0, 'groups': 0, 'max_group': 0, 'split_groups': 0, 'retried_jobs': 0,
+                      'failed_jobs': 0}
+
+    def submit(self, fn: Callable, *args, group: bool = True, **kwargs) -> Future:
+        """Queue `fn(*args, **kwargs)` for the writer thread."""
+        return self._submit(fn, args, kwargs, group).future
+
+    def _submit(self, fn: Callable, args, kwargs, group: bool) -> WriteJob:
+        app = current_app._get_current_object()
+        job = WriteJob(fn, args, kwargs, group)
+
+        if not app.config.get('WRITE_QUEUE_ENABLED', True):
+            # Queue disabled: write inline in the caller's own session
+            self._execute([job])
+            return job
+        if threading.current_thread() is self._thread:
+            # Submitted from inside a job: becomes part of the current
+            # transaction, which the outer group commits
+            try:
+                result, numbers = fn(*args, **kwargs)
+                self._local.touched.update(numbers or ())
+                job.future.set_result(result)
+            except Exception as e:
+                job.future.set_exception(e)
+            return job
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._app = app
+                self._thread = threading.Thread(
+                    target=self._run, name='write-queue', daemon=True
+                )
+                self._thread.start()
+        job.queued_at = time.perf_counter()
+        WRITE_QUEUE_DEPTH.labels(job.name).inc()
+        self._queue.put(job)
+        return job
+
+    def run(self, fn: Callable, *args, group: bool = True, **kwargs):
+        """Submit a job and wait for its result (re-raising its exception)."""
+        job = self._submit(fn, args, kwargs, group)
+        result = job.future.result(timeout=current_app.config.get('WRITE_QUEUE_TIMEOUT', 120))
+        # Report the writer's queries in the waiting request's Server-Timing
+        include_profile(job.profile)
+        return result
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, queued=self._queue.qsize())
+
+    def _next_group(self) -> List[WriteJob]:
+        app = self._app
+        job = self._pending or self._queue.get()
+        self._pending = None
+        group = [job]
+        if not job.group:
+            return group
+
+        max_group = app.config.get('WRITE_QUEUE_MAX_GROUP', 16)
+        while len(group) < max_group:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not job.group:
+                self._pending = job  # Runs alone, right after this group
+                break
+            group.append(job)
+        return group
+
+    def _run(self):
+        app = self._app
+        with app.app_context():
+            while True:
+                group = self._next_group()
+                started = time.perf_counter()
+                for job in group:
+                    WRITE_QUEUE_DEPTH.labels(job.name).dec()
+                    WRITE_QUEUE_WAIT_SECONDS.labels(job.name).observe(started - job.queued_at)
+                try:
+                    self._execute(group)
+                except Exception as e:  # pragma: no cover - defensive
+                    app.logger.error(f"Write queue failure: {e}")
+                finally:
+                    db.session.remove()
+
+    def _execute(self, group: List[WriteJob]) -> None:
+        # One profiler scope per transaction (a split group's retries fold into it)
+        with profile_scope('write queue: ' + ', '.join(job.name for job in group)) as profile:
+            for job in group:
+                job.profile = profile
+            self._execute_group(group)
+
+    def _execute_group(self, group: List[WriteJob]) -> None:
+        results = []
+        touched = self._local.touched = set()
+        try:
+            for job in group:
+                result, numbers = job.fn(*job.args, **job.kwargs)
+                results.append(result)
+                touched.update(numbers or ())
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            pop_generation_bumps()
+            if len(group) > 1:
+                with self._lock:
+                    self.stats['split_groups'] += 1
+                for job in group:
+                    self._execute([job])
+                return
+            if isinstance(e, IntegrityError) and not group[0].retried:
+                group[0].retried = True
+                with self._lock:
+                    self.stats['retried_jobs'] += 1
+                self._execute_group(group)
+                return
+            with self._lock:
+                self.stats['jobs'] += 1
+                self.stats['failed_jobs'] += 1
+            group[0].future.set_exception(e)
+            return
+
+        if touched:
+            try:
+                active_case_store.patch(touched)
+            except Exception as e:
+                # The write is committed either way: rebuild the store on the next read
+                self._app.logger.error(f"Active case store patch failed, rebuilding: {e}")
+                active_case_store.invalidate()
+        else:
+            pop_generation_bumps()
+
+        with self._lock:
+            self.stats['jobs'] += len(group)
+            self.stats['groups'] += 1
+            self.stats['max_group'] = max(self.stats['max_group'], len(group))
+        for job, result in zip(group, results):
+            job.future.set_result(result)
+
+
+write_queue = WriteQueue()
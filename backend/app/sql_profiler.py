@@ -0,0 +1,231 @@
+"""
+Opt-in SQL profiler (SQL_PROFILER_ENABLED).
+
+Hooks SQLAlchemy's before/after_cursor_execute and attributes every
+statement to the current scope on its thread: an HTTP request, a write
+queue group (uploads and scheduled jobs) or any block wrapped in
+profile_scope(). Each scope keeps its query count, total database time and
+slowest statements; requests return them in a Server-Timing header.
+Statements slower than SQL_SLOW_QUERY_MS go to the slow-query log, and a
+statement shape repeated SQL_REPEAT_THRESHOLD times or more within one
+scope is logged as a likely N+1 pattern.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import WatchedFileHandler
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import request
+from sqlalchemy import event
+
+
+logger = logging.getLogger('app.sql')
+
+# Expanded IN lists differ only in their number of placeholders
+_PLACEHOLDER_RUN = re.compile(r'\?(?:\s*,\s*\?)+')
+_WHITESPACE = re.compile(r'\s+')
+
+_local = threading.local()
+_listeners: List[Callable[['QueryProfile'], None]] = []
+_settings = {'enabled': False, 'slow_seconds': 0.1, 'repeat_threshold': 5, 'keep_slowest': 5}
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with whitespace collapsed and placeholder lists folded."""
+    return _PLACEHOLDER_RUN.sub('?, ...', _WHITESPACE.sub(' ', statement).strip())
+
+
+def _shorten(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+class QueryProfile:
+    """Statements executed within one scope."""
+
+    def __init__(self, name: str, keep_slowest: int = 5):
+        self.name = name
+        self.keep_slowest = keep_slowest
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, List] = {}  # shape -> [count, seconds]
+        self._slowest: List[Tuple[float, int, str]] = []  # min-heap
+        self.included: List['QueryProfile'] = []  # Other threads' scopes this one waited on
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        shape = statement_shape(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+        item = (seconds, self.count, shape)
+        if len(self._slowest) < self.keep_slowest:
+            heapq.heappush(self._slowest, item)
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    @property
+    def slowest(self) -> List[Tuple[float, str]]:
+        return [(seconds, shape) for seconds, _, shape in sorted(self._slowest, reverse=True)]
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int, float]]:
+        """(shape, count, seconds) for shapes run at least `threshold` times, most frequent first."""
+        return sorted(
+            ((shape, count, seconds) for shape, (count, seconds) in self.shapes.items() if count >= threshold),
+            key=lambda item: item[1], reverse=True
+        )
+
+    def to_dict(self, threshold: int) -> Dict:
+        return {
+            'scope': self.name,
+            'queries': self.count,
+            'db_ms': round(self.seconds * 1000, 2),
+            'slowest': [{'ms': round(seconds * 1000, 2), 'statement': shape} for seconds, shape in self.slowest],
+            'repeated': [
+                {'count': count, 'ms': round(seconds * 1000, 2), 'statement': shape}
+                for shape, count, seconds in self.repeated(threshold)
+            ],
+            'included': [profile.to_dict(threshold) for profile in self.included],
+        }
+
+    def server_timing(self, threshold: int) -> str:
+        """Server-Timing header value: totals, slowest statement, worst repeat."""
+        entries = [f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"']
+        if self._slowest:
+            seconds, shape = self.slowest[0]
+            entries.append(f'db-slowest;dur={seconds * 1000:.2f};desc="{_header_text(shape)}"')
+        repeated = self.repeated(threshold)
+        if repeated:
+            shape, count, seconds = repeated[0]
+            entries.append(f'db-repeated;dur={seconds * 1000:.2f};desc="{count}x {_header_text(shape)}"')
+        for index, profile in enumerate(self.included):
+            entries.append(f'db-writer{index or ""};dur={profile.seconds * 1000:.2f};'
+                           f'desc="{profile.count} queries in {_header_text(profile.name)}"')
+        return ', '.join(entries)
+
+
+def _header_text(shape: str) -> str:
+    return _shorten(shape.replace('\\', '').replace('"', "'"), 80)
+
+
+def current_profile() -> Optional[QueryProfile]:
+    return getattr(_local, 'profile', None)
+
+
+def _begin(name: str) -> QueryProfile:
+    profile = QueryProfile(name, _settings['keep_slowest'])
+    _local.profile = profile
+    return profile
+
+
+def add_listener(callback: Callable[[QueryProfile], None]) -> None:
+    """Call `callback(profile)` whenever a scope finishes."""
+    _listeners.append(callback)
+
+
+def _finish(profile: QueryProfile) -> None:
+    _local.profile = None
+    for callback in _listeners:
+        callback(profile)
+    for shape, count, seconds in profile.repeated(_settings['repeat_threshold']):
+        logger.warning('Repeated statement (%dx, %.1f ms) in %s: %s',
+                       count, seconds * 1000, profile.name, _shorten(shape, 500))
+    logger.debug('%s: %d queries, %.1f ms', profile.name, profile.count, profile.seconds * 1000)
+
+
+def include_profile(profile: Optional[QueryProfile]) -> None:
+    """Attach another thread's finished scope (e.g. a write queue group) to the current one."""
+    current = current_profile()
+    if current is not None and profile is not None and profile is not current:
+        current.included.append(profile)
+
+
+@contextmanager
+def profile_scope(name: str):
+    """
+    Attribute this thread's queries to `name` until the block exits.
+
+    Yields the QueryProfile (None while the profiler is disabled). A scope
+    opened inside another one is folded into the outer scope.
+    """
+    outer = current_profile()
+    if not _settings['enabled'] or outer is not None:
+        yield outer
+        return
+    profile = _begin(name)
+    try:
+        yield profile
+    finally:
+        _finish(profile)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('sql_profiler_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['sql_profiler_started'].pop()
+    seconds = time.perf_counter() - started
+    profile = current_profile()
+    if profile is not None:
+        profile.record(statement, seconds)
+    if seconds >= _settings['slow_seconds']:
+        logger.warning('Slow query (%.1f ms%s) in %s: %s', seconds * 1000,
+                       ', executemany' if executemany else '',
+                       profile.name if profile else '-', _shorten(statement_shape(statement), 1000))
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute is skipped for failed statements
+    connection = exception_context.connection
+    stack = connection.info.get('sql_profiler_started') if connection is not None else None
+    if stack:
+        stack.pop()
+
+
+def init_sql_profiler(app, engine) -> None:
+    """Install the cursor hooks and request scopes when SQL_PROFILER_ENABLED is set."""
+    if not app.config.get('SQL_PROFILER_ENABLED', False):
+        return
+
+    _settings.update(
+        enabled=True,
+        slow_seconds=app.config.get('SQL_SLOW_QUERY_MS', 100) / 1000,
+        repeat_threshold=app.config.get('SQL_REPEAT_THRESHOLD', 5),
+        keep_slowest=app.config.get('SQL_PROFILE_SLOWEST', 5),
+    )
+    log_path = app.config.get('SQL_SLOW_QUERY_LOG')
+    if log_path:
+        # WatchedFileHandler: several workers can share the file and logrotate can move it
+        handler = WatchedFileHandler(log_path)
+        handler.setFormatter(logging.Formatter('%(asctime)s [%(process)d] %(levelname)s %(message)s'))
+        logger.addHandler(handler)
+
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def start_query_profile():
+        _begin(f'{request.method} {request.url_rule.rule if request.url_rule else request.path}')
+
+    @app.after_request
+    def add_server_timing(response):
+        # Streamed bodies may still run queries; those are logged at teardown
+        profile = current_profile()
+        if profile is not None:
+            response.headers.add('Server-Timing', profile.server_timing(_settings['repeat_threshold']))
+        return response
+
+    @app.teardown_request
+    def finish_query_profile(exc):
+        profile = current_profile()
+        if profile is not None:
+            _finish(profile)
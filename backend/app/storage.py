@@ -0,0 +1,134 @@
+"""
+SQLite storage profile: connection pragmas and periodic maintenance.
+
+Every new DBAPI connection gets WAL journaling (readers no longer block
+behind upload writes), synchronous=NORMAL (safe with WAL, one fsync per
+checkpoint instead of per commit), a busy timeout (writers wait for the
+lock instead of failing with "database is locked"), a larger page cache,
+memory-mapped reads and in-memory temp tables. The scheduler runs
+wal_checkpoint and PRAGMA optimize; their last results are kept for
+/api/health.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import event
+
+
+_state_lock = threading.Lock()
+_state: Dict = {
+    'profile_applied': False,
+    'last_checkpoint': None,
+    'last_optimize': None,
+}
+
+
+def _is_file_database(engine) -> bool:
+    return engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:')
+
+
+def build_pragmas(config) -> Dict[str, object]:
+    """Connection pragmas from config, in the order they must be applied."""
+    return {
+        'journal_mode': config.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': config.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': config.get('SQLITE_BUSY_TIMEOUT', 5000),
+        'cache_size': config.get('SQLITE_CACHE_SIZE', -65536),
+        'mmap_size': config.get('SQLITE_MMAP_SIZE', 268435456),
+        'temp_store': config.get('SQLITE_TEMP_STORE', 'MEMORY'),
+    }
+
+
+def apply_storage_profile(engine, config) -> None:
+    """Register a connect hook that applies the SQLite pragmas to every connection."""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = build_pragmas(config)
+    if not _is_file_database(engine):
+        # In-memory databases cannot use WAL or mmap
+        pragmas.pop('journal_mode')
+        pragmas.pop('mmap_size')
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+    with _state_lock:
+        _state['profile_applied'] = True
+
+
+def checkpoint(engine, mode: str = 'PASSIVE') -> Dict:
+    """Run PRAGMA wal_checkpoint and record its result."""
+    started = datetime.utcnow()
+    with engine.connect() as conn:
+        busy, log_frames, checkpointed = conn.exec_driver_sql(
+            f'PRAGMA wal_checkpoint({mode})'
+        ).one()
+    result = {
+        'mode': mode,
+        'busy': bool(busy),
+        'log_frames': log_frames,
+        'checkpointed_frames': checkpointed,
+        'at': started.isoformat(),
+        'duration_ms': round((datetime.utcnow() - started).total_seconds() * 1000, 2),
+    }
+    with _state_lock:
+        _state['last_checkpoint'] = result
+    return result
+
+
+def optimize(engine) -> Dict:
+    """Run PRAGMA optimize so the planner statistics stay current."""
+    started = datetime.utcnow()
+    with engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA optimize')
+        conn.commit()
+    result = {
+        'at': started.isoformat(),
+        'duration_ms': round((datetime.utcnow() - started).total_seconds() * 1000, 2),
+    }
+    with _state_lock:
+        _state['last_optimize'] = result
+    return result
+
+
+def run_maintenance(engine) -> Dict:
+    """Scheduler entry point: checkpoint the WAL, then refresh statistics."""
+    if engine.dialect.name != 'sqlite':
+        return {}
+    result = {}
+    if _is_file_database(engine):
+        result['checkpoint'] = checkpoint(engine)
+    result['optimize'] = optimize(engine)
+    return result
+
+
+def get_storage_status(engine) -> Dict:
+    """Current pragma values, file sizes and last maintenance results."""
+    if engine.dialect.name != 'sqlite':
+        return {'engine': engine.dialect.name}
+
+    with engine.connect() as conn:
+        status = {
+            name: conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+            for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size',
+                         'mmap_size', 'temp_store', 'page_size', 'page_count', 'freelist_count')
+        }
+
+    if _is_file_database(engine):
+        path = engine.url.database
+        status['db_bytes'] = os.path.getsize(path) if os.path.exists(path) else 0
+        wal_path = path + '-wal'
+        status['wal_bytes'] = os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
+
+    with _state_lock:
+        status.update(_state)
+    return status
@@ -0,0 +1,151 @@
+import math
+import struct
+from typing import Dict, Optional
+
+
+# Header: format version, relative accuracy, count, sum, min, max
+_HEADER = struct.Struct('<Bddddd')
+_VERSION = 1
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+class DDSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Non-negative values are counted in logarithmic buckets of ratio
+    gamma = (1 + a) / (1 - a), so any quantile is returned within a
+    relative error `a` of the true value, however many values were added.
+    Two sketches with the same accuracy merge by adding bucket counts,
+    which is what lets per-day sketches be combined into any range.
+    Values below MIN_VALUE (e.g. zero-second responses) share one bucket.
+
+    For durations in seconds at 1% accuracy, one bucket covers 2% of the
+    range, so a sketch spanning a second to a month holds at most ~750
+    buckets and typically a few dozen; to_bytes() stores them as varints.
+    """
+
+    MIN_VALUE = 1e-3
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError('relative_accuracy must be between 0 and 1')
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: int = 1) -> None:
+        """Add a value (negative values are clamped to zero)."""
+        value = max(float(value), 0.0)
+        if value < self.MIN_VALUE:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'DDSketch') -> None:
+        """Add another sketch's counts to this one."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Cannot merge sketches with different accuracy')
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1), or None for an empty sketch."""
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError('q must be between 0 and 1')
+
+        # Nearest rank: at least a fraction q of the values are <= the result
+        rank = max(1, math.ceil(q * self.count))
+        seen = self.zero_count
+        if rank <= seen:
+            return self.min
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank <= seen:
+                # Bucket midpoint (in relative terms), kept within the observed range
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(_HEADER.pack(_VERSION, self.relative_accuracy, self.count,
+                                     self.sum, self.min, self.max))
+        _write_varint(out, self.zero_count)
+        _write_varint(out, len(self.bins))
+        previous = 0
+        for key in sorted(self.bins):
+            _write_varint(out, _zigzag(key - previous))
+            _write_varint(out, self.bins[key])
+            previous = key
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'DDSketch':
+        version, accuracy, count, total, low, high = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f'Unsupported sketch version: {version}')
+        sketch = cls(accuracy)
+        sketch.count, sketch.sum, sketch.min, sketch.max = int(count), total, low, high
+        pos = _HEADER.size
+        sketch.zero_count, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        bins = sketch.bins
+        key = 0
+        # Most deltas and counts fit in one byte: decode those inline
+        for _ in range(length):
+            delta = data[pos]
+            if delta < 0x80:
+                pos += 1
+            else:
+                delta, pos = _read_varint(data, pos)
+            key += delta >> 1 if not delta & 1 else -((delta + 1) >> 1)
+            count = data[pos]
+            if count < 0x80:
+                pos += 1
+            else:
+                count, pos = _read_varint(data, pos)
+            bins[key] = count
+        return sketch
@@ -0,0 +1,31 @@
+import json
+from datetime import date, datetime
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # Optional speedup, stdlib json is the fallback
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj) -> bytes:
+    """
+    Serialize to JSON bytes, using orjson when it is installed.
+
+    Datetimes are written as ISO 8601 like the models' to_dict() methods,
+    so rows straight from Core queries can be passed in unchanged.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def json_response(obj, status: int = 200) -> Response:
+    """Build an application/json response with the fast encoder."""
+    return Response(dumps(obj), status=status, mimetype='application/json')
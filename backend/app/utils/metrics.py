@@ -0,0 +1,345 @@
+import bisect
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Prometheus client defaults: 5 ms .. 10 s
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _CounterChild:
+    __slots__ = ('_lock', 'value')
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+
+class _Timer:
+    __slots__ = ('_child', '_started')
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._child.observe(time.perf_counter() - self._started)
+
+
+class _HistogramChild:
+    __slots__ = ('_lock', '_upper', 'counts', 'sum')
+
+    def __init__(self, lock, upper: Tuple[float, ...]):
+        self._lock = lock
+        self._upper = upper
+        self.counts = [0] * (len(upper) + 1)  # Per bucket, the last one is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._upper, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self) -> _Timer:
+        """Context manager observing the elapsed seconds."""
+        return _Timer(self)
+
+
+class Metric:
+    """A metric family; label values select (and create) its children."""
+
+    type = ''
+    _child_class = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def labels(self, *values):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f'{self.name} expects labels {self.labelnames}')
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        return self._child_class(threading.Lock())
+
+    def _samples(self) -> List:
+        return [[list(key), child.value] for key, child in list(self._children.items())]
+
+    def snapshot(self) -> Dict:
+        return {'type': self.type, 'help': self.documentation,
+                'labels': list(self.labelnames), 'samples': self._samples()}
+
+
+class Counter(Metric):
+    type = 'counter'
+    _child_class = _CounterChild
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    """Last value per process; across processes, live processes' values are summed."""
+    type = 'gauge'
+    _child_class = _GaugeChild
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+
+    def _new_child(self):
+        return _HistogramChild(threading.Lock(), self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def _samples(self) -> List:
+        samples = []
+        for key, child in list(self._children.items()):
+            with child._lock:
+                samples.append([list(key), list(child.counts), child.sum])
+        return samples
+
+    def snapshot(self) -> Dict:
+        return dict(super().snapshot(), buckets=list(self.buckets))
+
+
+class MetricsRegistry:
+    """
+    Process-local metric families.
+
+    Updates take one uncontended lock per child, so instrumenting hot paths
+    costs a couple of microseconds. Rendering works from snapshot() dicts,
+    which is what lets several processes' registries be merged (see
+    ProcessMetricsStore).
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f'Metric already registered: {metric.name}')
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+# -- merging and exposition ---------------------------------------------------
+
+def merge_snapshots(snapshots: Iterable[Tuple[Dict, bool]]) -> Dict:
+    """
+    Merge (snapshot, process_alive) pairs into one snapshot.
+
+    Counters and histograms are summed over every process, including ones
+    that have exited, so totals never go backwards when a worker restarts.
+    Gauges are summed over live processes only.
+    """
+    merged: Dict[str, Dict] = {}
+    for snapshot, alive in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, dict(family, samples={}))
+            if family['type'] == 'gauge' and not alive:
+                continue
+            samples = target['samples']
+            for sample in family['samples']:
+                key = tuple(sample[0])
+                if family['type'] == 'histogram':
+                    counts, total = sample[1], sample[2]
+                    current = samples.get(key)
+                    if current is None or len(current[0]) != len(counts):
+                        samples[key] = [list(counts), total]
+                    else:
+                        current[0] = [a + b for a, b in zip(current[0], counts)]
+                        current[1] += total
+                else:
+                    samples[key] = samples.get(key, 0) + sample[1]
+
+    for family in merged.values():
+        if family['type'] == 'histogram':
+            family['samples'] = [[list(key), counts, total] for key, (counts, total) in family['samples'].items()]
+        else:
+            family['samples'] = [[list(key), value] for key, value in family['samples'].items()]
+    return merged
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render_text(snapshot: Dict) -> str:
+    """Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for name in sorted(snapshot):
+        family = snapshot[name]
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        labelnames = family['labels']
+        for sample in sorted(family['samples'], key=lambda sample: sample[0]):
+            values = sample[0]
+            if family['type'] == 'histogram':
+                counts, total = sample[1], sample[2]
+                cumulative = 0
+                for bound, count in zip(list(family['buckets']) + [math.inf], counts):
+                    cumulative += count
+                    labels = _label_text(labelnames, values, ('le', _format_value(bound)))
+                    lines.append(f'{name}_bucket{labels} {cumulative}')
+                labels = _label_text(labelnames, values)
+                lines.append(f'{name}_sum{labels} {_format_value(total)}')
+                lines.append(f'{name}_count{labels} {cumulative}')
+            else:
+                lines.append(f'{name}{_label_text(labelnames, values)} {_format_value(sample[1])}')
+    return '\n'.join(lines) + '\n'
+
+
+# -- cross-process aggregation ------------------------------------------------
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_start(pid: int) -> Optional[str]:
+    """Start time of a process in clock ticks since boot (Linux /proc), or None."""
+    try:
+        with open(f'/proc/{pid}/stat') as handle:
+            return handle.read().rsplit(')', 1)[1].split()[19]
+    except (OSError, IndexError):
+        return None
+
+
+_process_tokens: Dict[int, str] = {}
+
+
+def _process_token() -> str:
+    """Tells this process apart from any later one given the same pid."""
+    pid = os.getpid()
+    token = _process_tokens.get(pid)
+    if token is None:
+        token = _process_tokens.setdefault(pid, _process_start(pid) or uuid.uuid4().hex)
+    return token
+
+
+class ProcessMetricsStore:
+    """
+    Share registries between worker processes through a directory.
+
+    Each process periodically writes its snapshot to
+    <directory>/<pid>-<start>.json (atomically, via rename), where <start>
+    is the process start time, so a worker that reuses an exited worker's
+    pid gets a file of its own; a scrape reads every file and merges them.
+    A file's process is live while its pid runs with the same start time.
+    Files of exited workers are kept so their counts stay in the totals;
+    use a directory that is emptied on deploy (e.g. under /tmp).
+    """
+
+    SUFFIX = '.json'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, snapshot: Dict) -> None:
+        path = os.path.join(self.directory, f'{os.getpid()}-{_process_token()}{self.SUFFIX}')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump(snapshot, handle, separators=(',', ':'))
+        os.replace(temporary, path)
+
+    def read(self) -> List[Tuple[Dict, bool]]:
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(self.SUFFIX):
+                continue
+            try:
+                pid, _, token = filename[:-len(self.SUFFIX)].partition('-')
+                pid = int(pid)
+                with open(os.path.join(self.directory, filename)) as handle:
+                    snapshot = json.load(handle)
+            except (ValueError, OSError):
+                continue  # Not ours, or replaced mid-read
+            started = _process_start(pid)
+            alive = _pid_alive(pid) and (started is None or not token or started == token)
+            snapshots.append((snapshot, alive))
+        return snapshots
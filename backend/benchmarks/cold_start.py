@@ -0,0 +1,215 @@
+"""
+Cold start: each startup phase in a fresh interpreter, and gunicorn boot with and without --preload.
+
+Every run starts a new interpreter on a scratch database and times:
+
+    import                  import app
+    create_app              building the production app (no database access, no threads)
+    init_database_fresh     init_database on an empty database (every migration)
+    init_database           init_database on an up-to-date database (what a restart pays)
+    start_services          starting the job scheduler
+    first_request           the first GET /api/health
+    process                 interpreter start to the first response, as seen from outside
+
+The report also lists which heavy optional modules (APScheduler, plyer) were
+already imported when create_app returned; they should not be.
+
+With --gunicorn it also boots `gunicorn wsgi:app` (as supervisord.conf runs
+it) with and without --preload and reports the seconds until /api/health
+first answers plus the workers' memory once they have all loaded: RSS, and
+on Linux PSS, which counts pages shared copy-on-write with the master once.
+Results have the format of benchmarks.suite, so runs before and after a
+change can be compared with `python -m benchmarks.suite --compare`.
+
+Run from the backend directory:
+
+    python -m benchmarks.cold_start [--repeat 5] [--gunicorn] [--workers 2] [--output cold_start.json]
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = ('apscheduler', 'flask_apscheduler', 'plyer')
+SETTLE_SECONDS = 1.5
+PHASES = ('import', 'create_app', 'init_database', 'start_services', 'first_request')
+
+
+def child_env(database: str) -> dict:
+    env = dict(os.environ,
+               DATABASE_URL=f'sqlite:///{database}',
+               ENABLE_NOTIFICATIONS='false',
+               FLASK_ENV='production')
+    for name in ('METRICS_DIR', 'INGEST_RECORD_DIR'):
+        env.pop(name, None)
+    return env
+
+
+def run_phases() -> None:
+    """Child process: time each phase and print the timings as JSON."""
+    timings = {}
+    began = time.perf_counter()
+    import app as package
+    timings['import'] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    application = package.create_app('production')
+    timings['create_app'] = time.perf_counter() - began
+    imported = sorted(name for name in LAZY_MODULES if name in sys.modules)
+
+    began = time.perf_counter()
+    package.init_database(application)
+    timings['init_database'] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    scheduler = package.start_services(application)
+    timings['start_services'] = time.perf_counter() - began
+
+    began = time.perf_counter()
+    status = application.test_client().get('/api/health').status_code
+    timings['first_request'] = time.perf_counter() - began
+
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    print(json.dumps({'timings': timings, 'status': status, 'imported_by_create_app': imported}))
+
+
+def spawn_phases(database: str) -> dict:
+    began = time.perf_counter()
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.cold_start', '--child'], cwd=BACKEND,
+                            env=child_env(database), capture_output=True, text=True, check=True).stdout
+    elapsed = time.perf_counter() - began
+    result = json.loads(output.strip().splitlines()[-1])
+    if result['status'] != 200:
+        raise SystemExit(f"/api/health answered {result['status']}")
+    result['timings']['process'] = elapsed
+    return result
+
+
+def measure_phases(repeat: int):
+    from benchmarks.suite import summarize
+
+    runs = {name: [] for name in PHASES + ('init_database_fresh', 'process')}
+    imported = set()
+    for _ in range(repeat):
+        database = os.path.join(tempfile.mkdtemp(prefix='snow-cold-'), 'cold.db')
+        runs['init_database_fresh'].append(spawn_phases(database)['timings']['init_database'])
+        result = spawn_phases(database)
+        imported.update(result['imported_by_create_app'])
+        for name, seconds in result['timings'].items():
+            runs[name].append(seconds)
+    results = [summarize(f'cold_start.{name}', None, None, seconds) for name, seconds in runs.items()]
+    return results, sorted(imported)
+
+
+def worker_memory(pid: int) -> dict:
+    """RSS and PSS in MiB from /proc (None where unavailable)."""
+    memory = {'rss_mb': None, 'pss_mb': None}
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as handle:
+            for line in handle:
+                name, _, rest = line.partition(':')
+                if name in ('Rss', 'Pss'):
+                    memory[f'{name.lower()}_mb'] = int(rest.split()[0]) / 1024
+    except OSError:
+        pass
+    return memory
+
+
+def worker_pids(master: int) -> list:
+    try:
+        with open(f'/proc/{master}/task/{master}/children') as handle:
+            return [int(pid) for pid in handle.read().split()]
+    except OSError:
+        return []
+
+
+def boot_gunicorn(database: str, workers: int, preload: bool) -> dict:
+    from benchmarks.load_test import free_port
+
+    port = free_port()
+    command = [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py',
+               '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--worker-class', 'gthread',
+               '--threads', '4', '--log-level', 'warning', 'wsgi:app']
+    if preload:
+        command.insert(3, '--preload')
+    began = time.perf_counter()
+    process = subprocess.Popen(command, cwd=BACKEND, env=child_env(database))
+    try:
+        while True:
+            if process.poll() is not None:
+                raise SystemExit(f'gunicorn exited with status {process.returncode}')
+            if time.perf_counter() - began > 60:
+                raise SystemExit('gunicorn did not become healthy within 60s')
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+                connection.request('GET', '/api/health')
+                if connection.getresponse().status == 200:
+                    break
+            except OSError:
+                pass
+            time.sleep(0.02)
+        booted = time.perf_counter() - began
+        time.sleep(SETTLE_SECONDS)  # The other workers finish loading before their memory is read
+        memory = [worker_memory(pid) for pid in worker_pids(process.pid)]
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {'boot_s': booted, 'workers': memory}
+
+
+def measure_gunicorn(repeat: int, workers: int):
+    from benchmarks.suite import summarize
+
+    database = os.path.join(tempfile.mkdtemp(prefix='snow-cold-'), 'cold.db')
+    spawn_phases(database)  # Migrated up front: both modes boot against an up-to-date database
+    results = []
+    for preload in (False, True):
+        boots = [boot_gunicorn(database, workers, preload) for _ in range(repeat)]
+        result = summarize(f"gunicorn.boot.{'preload' if preload else 'no_preload'}", workers, None,
+                           [boot['boot_s'] for boot in boots])
+        for field in ('rss_mb', 'pss_mb'):
+            values = [worker[field] for boot in boots for worker in boot['workers'] if worker[field] is not None]
+            result[f'worker_{field}'] = round(sum(values) / len(values), 1) if values else None
+        results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters (and gunicorn boots) per mode')
+    parser.add_argument('--gunicorn', action='store_true', help='also boot gunicorn with and without --preload')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--output', help='also write the results to this file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_phases()
+        return
+
+    from benchmarks.suite import metadata
+
+    results, imported = measure_phases(args.repeat)
+    if args.gunicorn:
+        results.extend(measure_gunicorn(args.repeat, args.workers))
+
+    report = {
+        'meta': metadata(repeat=args.repeat, workers=args.workers if args.gunicorn else None,
+                         imported_by_create_app=imported),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
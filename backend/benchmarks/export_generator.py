@@ -0,0 +1,240 @@
+"""
+Synthetic ServiceNow case exports.
+
+ExportGenerator keeps a population of cases and renders successive
+exports of it, as repeated downloads of the same ServiceNow list would
+look. Between snapshots SLA clocks run down, a share of the cases change
+state (including reopen/handled cycles), closed cases drop out of the list
+and new ones arrive to replace them. Each export uses one alias per field
+from COLUMN_MAPPING, rotating with `variant`, so every accepted column name
+gets exercised; SLA times mix the formats parse_sla_time accepts ("2h 30m",
+"1 day 2 hours", "-0:15:00", raw seconds and minutes) and always parse back
+to the generator's own minute count.
+
+Run from the backend directory to write CSV files:
+
+    python -m benchmarks.export_generator [--rows 10000] [--snapshots 3] [--seed 1] [--out DIR]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from app.services.csv_parser import CLOSED_STATES, COLUMN_MAPPING
+
+
+def _aliases() -> Dict[str, List[str]]:
+    aliases: Dict[str, List[str]] = {}
+    for column, field in COLUMN_MAPPING.items():
+        aliases.setdefault(field, []).append(column)
+    return aliases
+
+
+# Model field -> CSV column names the parser accepts for it
+FIELD_ALIASES = _aliases()
+
+OPEN_STATES = ['New', 'Open', 'Work in Progress', 'Pending Customer', 'Pending Customer Acceptance',
+               'Customer Requested Hold']
+STATE_WEIGHTS = [10, 20, 30, 25, 8, 7]
+
+# Where a case can go next; closed states leave the export after one snapshot
+TRANSITIONS = {
+    'New': ['Open', 'Work in Progress'],
+    'Open': ['Work in Progress', 'Pending Customer'],
+    'Work in Progress': ['Pending Customer', 'Pending Customer Acceptance', 'Customer Requested Hold', 'Open'],
+    'Pending Customer': ['Open', 'Work in Progress', 'Pending Autoclose'],
+    'Pending Customer Acceptance': ['Resolved', 'Open'],
+    'Customer Requested Hold': ['Work in Progress', 'Open'],
+    'Pending Autoclose': ['Closed', 'Open'],
+    'Resolved': ['Closed'],
+    'Closed': ['Closed'],
+}
+
+# SLA clock is paused while waiting on the customer
+PAUSED_STATES = {'Pending Customer', 'Pending Customer Acceptance', 'Customer Requested Hold',
+                 'Pending Autoclose'}
+
+PRIORITIES = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
+PRIORITY_WEIGHTS = [5, 20, 50, 25]
+TIME_TO_RESPOND = {'1 - Critical': '1 Hour', '2 - High': '4 Hours', '3 - Moderate': '8 Hours',
+                   '4 - Low': '1 Day'}
+REGIONS = ['EMEA', 'APAC', 'AMER', 'LATAM', '']
+
+# Formats CSVParser._parse_datetime tries, month first so none is ambiguous
+DATE_FORMATS = ['%m/%d/%Y %H:%M:%S', '%m/%d/%Y %H:%M', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S']
+
+SLA_STYLES = ['hm', 'words', 'hms', 'raw']
+
+_SUBJECTS = ['VPN tunnel drops', 'Login fails', 'Report export', 'Disk usage alert', 'Licence renewal',
+             'API timeout', 'Backup job', 'SSO redirect', 'Firmware upgrade', 'Dashboard "blank"']
+_DETAILS = ['after upgrade', 'for one region', 'intermittently, since Monday', 'on the "EU" tenant',
+            'with error 500', 'at the München site', 'when using the mobile app', '']
+
+
+def format_sla(minutes: Optional[int], style: str, rng: random.Random) -> str:
+    """Render `minutes` in one of the SLA_STYLES; parse_sla_time reads it back exactly."""
+    if minutes is None:
+        return ''
+    sign = '-' if minutes < 0 else ''
+    total = abs(minutes)
+    if total == 0:
+        style = 'hms'  # '0' and '0m' parse as unknown
+    if style == 'hm':
+        hours, mins = divmod(total, 60)
+        text = ' '.join(part for part in (f'{hours}h' if hours else '', f'{mins}m' if mins else '') if part)
+    elif style == 'words':
+        days, rest = divmod(total, 1440)
+        hours, mins = divmod(rest, 60)
+        parts = [(days, 'day'), (hours, 'hour'), (mins, 'minute')]
+        text = ' '.join(f'{n} {unit}{"s" if n != 1 else ""}' for n, unit in parts if n)
+    elif style == 'hms':
+        hours, mins = divmod(total, 60)
+        text = f'{hours}:{mins:02d}:{rng.randrange(30):02d}'  # Under 30 s rounds down
+    elif total * 60 > 10000:
+        text = str(total * 60 + rng.randrange(60))  # Raw seconds
+    else:
+        text = str(total)  # Raw minutes
+    return sign + text
+
+
+class ExportGenerator:
+    """Successive ServiceNow exports of one evolving case population."""
+
+    def __init__(self, rows: int = 1000, seed: int = 1, churn: float = 0.1,
+                 interval_minutes: int = 15, start: Optional[datetime] = None):
+        self.rows = rows
+        self.churn = churn
+        self.interval = interval_minutes
+        self.rng = random.Random(seed)
+        # Separate stream for formatting, so rendering never changes how the population evolves
+        self.render_rng = random.Random(seed + 1)
+        self.now = (start or datetime(2026, 2, 4, 9, 0)).replace(second=0, microsecond=0)
+        self.descriptions = [f'{subject} {detail}'.strip()
+                             for subject in _SUBJECTS for detail in _DETAILS]
+        self._next_number = 1000000
+        # number -> [state, sla_minutes, priority, region, description index, updated_at]
+        self.cases: Dict[str, List] = {}
+        for _ in range(rows):
+            self._add_case(self.rng.choices(OPEN_STATES, STATE_WEIGHTS)[0])
+
+    def _add_case(self, state: str) -> None:
+        rng = self.rng
+        number = f'CS{self._next_number:07d}'
+        self._next_number += 1
+        self.cases[number] = [
+            state,
+            self._initial_sla(),
+            rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+            rng.choice(REGIONS),
+            rng.randrange(len(self.descriptions)),
+            self.now - timedelta(minutes=rng.randrange(7 * 1440)),
+        ]
+
+    def _initial_sla(self) -> Optional[int]:
+        rng = self.rng
+        bucket = rng.random()
+        if bucket < 0.03:
+            return None
+        if bucket < 0.13:
+            return rng.randint(-600, 0)     # Breached
+        if bucket < 0.18:
+            return rng.randint(1, 30)       # Critical
+        if bucket < 0.30:
+            return rng.randint(31, 120)     # Warning
+        return rng.randint(121, 14 * 1440)
+
+    def advance(self) -> None:
+        """Move the clock on by one interval: SLA countdown, state churn, closures and arrivals."""
+        rng = self.rng
+        self.now += timedelta(minutes=self.interval)
+        closed = [number for number, case in self.cases.items() if case[0].lower() in CLOSED_STATES]
+        for number in closed:
+            del self.cases[number]
+
+        for case in self.cases.values():
+            if case[1] is not None and case[0] not in PAUSED_STATES:
+                case[1] -= self.interval
+            if rng.random() < self.churn:
+                case[0] = rng.choice(TRANSITIONS[case[0]])
+                case[5] = self.now - timedelta(minutes=rng.randrange(self.interval))
+                if case[0] == 'Open':
+                    case[1] = rng.randint(30, 2880)  # Customer replied: response clock restarts
+
+        for _ in range(self.rows - len(self.cases)):
+            self._add_case(rng.choice(['New', 'Open']))
+
+    def columns(self, variant: int = 0) -> List[str]:
+        return [aliases[variant % len(aliases)] for aliases in FIELD_ALIASES.values()]
+
+    def iter_rows(self, variant: int = 0) -> Iterator[List[str]]:
+        """Rows of the current snapshot, in columns(variant) order."""
+        rng = self.render_rng
+        for number, (state, sla, priority, region, description, updated_at) in self.cases.items():
+            row = {
+                'number': number,
+                'short_description': self.descriptions[description],
+                'time_to_respond': TIME_TO_RESPOND[priority],
+                'sla_time_left': format_sla(sla, rng.choice(SLA_STYLES), rng),
+                'sub_state': state,
+                'region': region,
+                'priority': priority,
+                'sys_updated_on': updated_at.strftime(rng.choice(DATE_FORMATS)),
+            }
+            yield [row[field] for field in FIELD_ALIASES]
+
+    def expected_sla(self) -> Dict[str, Optional[int]]:
+        """Case number -> minutes left, as the parser should read them."""
+        return {number: case[1] for number, case in self.cases.items()}
+
+    def write_csv(self, handle: TextIO, variant: int = 0) -> int:
+        """Write the current snapshot to `handle`; returns the row count."""
+        writer = csv.writer(handle)
+        writer.writerow(self.columns(variant))
+        count = 0
+        for row in self.iter_rows(variant):
+            writer.writerow(row)
+            count += 1
+        return count
+
+    def to_csv(self, variant: int = 0) -> str:
+        buffer = io.StringIO()
+        self.write_csv(buffer, variant)
+        return buffer.getvalue()
+
+    def snapshots(self, count: int) -> Iterator[str]:
+        """`count` successive CSV exports, rotating column aliases."""
+        for index in range(count):
+            if index:
+                self.advance()
+            yield self.to_csv(variant=index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000, help='cases per export')
+    parser.add_argument('--snapshots', type=int, default=3, help='successive exports to write')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--churn', type=float, default=0.1, help='share of cases changing state per snapshot')
+    parser.add_argument('--out', default='.', help='directory for snapshot_NNN.csv')
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    generator = ExportGenerator(rows=args.rows, seed=args.seed, churn=args.churn)
+    files = []
+    for index in range(args.snapshots):
+        if index:
+            generator.advance()
+        path = os.path.join(args.out, f'snapshot_{index:03d}.csv')
+        with open(path, 'w', newline='', encoding='utf-8') as handle:
+            rows = generator.write_csv(handle, variant=index)
+        files.append({'path': path, 'rows': rows, 'bytes': os.path.getsize(path),
+                      'columns': generator.columns(index)})
+    print(json.dumps(files, indent=2))
+
+
+if __name__ == '__main__':
+    main()
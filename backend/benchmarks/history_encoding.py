@@ -0,0 +1,167 @@
+"""
+Size and insert-throughput report for the compact case_history encoding.
+
+Writes the same synthetic history (uploads of --batch events) twice: into
+the pre-compaction layout (free-text states, priority and event type; rows
+added one ORM object at a time, as the ingest path used to) and into the
+current layout through HistoryWriter (interned ids, integer event codes,
+one executemany per upload). Reports rows/s and the on-disk size of the
+table and each of its indexes (from the dbstat virtual table), then runs
+the migrations on a copy of the legacy database and reports the file size
+before and after VACUUM.
+
+Run from the backend directory:
+
+    python -m benchmarks.history_encoding [--rows 100000] [--batch 200]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+
+STATES = ['Open', 'New', 'Pending Customer', 'Work in Progress', 'Pending Customer Acceptance',
+          'Customer Requested Hold', 'Pending Autoclose', 'Ready to Close']
+PRIORITIES = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
+EVENTS = ['new_case', 'incoming', 'handled', 'state_change']
+
+LegacyBase = declarative_base()
+
+
+class LegacyCaseHistory(LegacyBase):
+    """case_history as it was before states were interned."""
+    __tablename__ = 'case_history'
+    __table_args__ = (
+        Index('ix_case_history_event_type_recorded_at', 'event_type', 'recorded_at'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    case_number = Column(String(20), nullable=False, index=True)
+    previous_state = Column(String(100), nullable=True)
+    new_state = Column(String(100), nullable=True)
+    event_type = Column(String(20), nullable=False)
+    sla_minutes_left = Column(Integer, nullable=True)
+    priority = Column(String(50), nullable=True)
+    recorded_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+def make_events(rows: int):
+    rng = random.Random(5)
+    start = datetime.utcnow() - timedelta(days=90)
+    return [
+        {
+            'case_number': f'CS{rng.randrange(20000):07d}',
+            'previous_state': rng.choice(STATES),
+            'new_state': rng.choice(STATES),
+            'event_type': rng.choice(EVENTS),
+            'sla_minutes_left': rng.randint(-600, 5000),
+            'priority': rng.choice(PRIORITIES),
+            'recorded_at': start + timedelta(seconds=i * 60),
+        }
+        for i in range(rows)
+    ]
+
+
+def table_sizes(engine, table: str) -> dict:
+    """Bytes per b-tree (table and each index) from dbstat."""
+    with engine.connect() as conn:
+        names = [table] + [row[1] for row in conn.exec_driver_sql(f'PRAGMA index_list({table})')]
+        sizes = {
+            name: conn.exec_driver_sql(
+                'SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name = ?', (name,)
+            ).scalar()
+            for name in names
+        }
+    sizes['total'] = sum(sizes.values())
+    return sizes
+
+
+def run_legacy(path: str, events, batch: int) -> dict:
+    engine = create_engine(f'sqlite:///{path}')
+    LegacyBase.metadata.create_all(engine)
+    started = time.perf_counter()
+    with Session(engine) as session:
+        for start in range(0, len(events), batch):
+            for event in events[start:start + batch]:
+                session.add(LegacyCaseHistory(**event))
+            session.commit()
+    elapsed = time.perf_counter() - started
+    result = {'rows_per_s': round(len(events) / elapsed), 'sizes': table_sizes(engine, 'case_history')}
+    engine.dispose()
+    return result
+
+
+def run_compact(app, events, batch: int) -> dict:
+    from app import db
+    from app.services.history_writer import HistoryWriter
+
+    with app.app_context():
+        started = time.perf_counter()
+        for start in range(0, len(events), batch):
+            history = HistoryWriter()
+            for event in events[start:start + batch]:
+                history.add(**event)
+            history.flush()
+            db.session.commit()
+        elapsed = time.perf_counter() - started
+        return {'rows_per_s': round(len(events) / elapsed), 'sizes': table_sizes(db.engine, 'case_history')}
+
+
+def run_migration(legacy_path: str, directory: str) -> dict:
+    from app.migrations import run_migrations
+
+    path = os.path.join(directory, 'migrated.db')
+    shutil.copy(legacy_path, path)
+    before = os.path.getsize(path)
+    engine = create_engine(f'sqlite:///{path}')
+    started = time.perf_counter()
+    run_migrations(engine)
+    elapsed = time.perf_counter() - started
+    with engine.connect() as conn:
+        conn.exec_driver_sql('VACUUM')
+    engine.dispose()
+    return {
+        'seconds': round(elapsed, 2),
+        'file_bytes_before': before,
+        'file_bytes_after_vacuum': os.path.getsize(path),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='history rows to write')
+    parser.add_argument('--batch', type=int, default=200, help='rows per upload/commit')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='snow-history-')
+    # Config is read at import time, so point the app at a scratch database first
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'compact.db')}"
+    from app import create_app, init_database
+
+    app = create_app('development')
+    init_database(app)
+
+    events = make_events(args.rows)
+    legacy_path = os.path.join(directory, 'legacy.db')
+    legacy = run_legacy(legacy_path, events, args.batch)
+    compact = run_compact(app, events, args.batch)
+
+    print(json.dumps({
+        'rows': args.rows,
+        'legacy': legacy,
+        'compact': compact,
+        'size_ratio': round(compact['sizes']['total'] / legacy['sizes']['total'], 3),
+        'insert_speedup': round(compact['rows_per_s'] / legacy['rows_per_s'], 2),
+        'migration': run_migration(legacy_path, directory),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
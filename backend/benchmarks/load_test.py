@@ -0,0 +1,397 @@
+"""
+Load test: many extension clients posting uploads while dashboards poll.
+
+Simulates a team sharing one container. Each extension client posts a
+snapshot of the team's case list to /api/upload-json every
+--upload-interval seconds; the snapshots come from
+benchmarks.export_generator, so successive uploads carry realistic state
+churn. Each dashboard refreshes every --poll-interval seconds the way the
+frontend does: /api/stats/overview plus every /api/cases page, revalidated
+with If-None-Match. Clients start at random offsets so they do not fire in
+lockstep.
+
+Reports, per stage and endpoint, requests, throughput, p50/p90/p99 latency
+and errors by kind (SQLite "database is locked", constraint violations,
+other 5xx, 4xx, connection failures and timeouts) with a sample response
+for each. Exits non-zero when a stage exceeds
+--max-error-rate or --max-p99-ms.
+
+Profiles:
+
+    smoke   one short stage with a handful of clients, fast enough for CI
+    soak    stages doubling the client counts; the report names the first
+            stage that broke the limits (the scaling limit)
+
+Without --url it starts gunicorn on a scratch database with the production
+settings (--workers/--threads as in supervisord.conf) and stops it afterwards.
+
+Run from the backend directory:
+
+    python -m benchmarks.load_test --profile smoke
+    python -m benchmarks.load_test --profile soak --url http://localhost:8085
+    python -m benchmarks.load_test --extensions 20 --dashboards 50 --duration 300
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+
+PROFILES = {
+    'smoke': {
+        'stages': [(4, 8, 20)],  # (extensions, dashboards, seconds)
+        'upload_interval': 2.0,
+        'poll_interval': 1.0,
+        'cases': 200,
+        'max_error_rate': 0.0,
+        'max_p99_ms': None,
+    },
+    'soak': {
+        'stages': [(10, 20, 120), (20, 40, 120), (40, 80, 120), (80, 160, 120), (160, 320, 120)],
+        'upload_interval': 60.0,
+        'poll_interval': 15.0,
+        'cases': 500,
+        'max_error_rate': 0.01,
+        'max_p99_ms': 2000.0,
+    },
+}
+
+REQUEST_TIMEOUT = 60
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Recorder:
+    """Latencies and errors per endpoint, shared by all client threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.not_modified = {}
+        self.errors = {}
+        self.samples = {}  # First response body per error kind
+
+    def record(self, endpoint: str, seconds: float, status: int, error: str = None,
+               sample: str = None) -> None:
+        with self._lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            if status == 304:
+                self.not_modified[endpoint] = self.not_modified.get(endpoint, 0) + 1
+            if error:
+                counts = self.errors.setdefault(endpoint, {})
+                counts[error] = counts.get(error, 0) + 1
+                if sample:
+                    self.samples.setdefault(error, sample)
+
+    def summary(self, seconds: float) -> dict:
+        endpoints = {}
+        with self._lock:
+            for endpoint, latencies in sorted(self.latencies.items()):
+                errors = self.errors.get(endpoint, {})
+                failed = sum(errors.values())
+                endpoints[endpoint] = {
+                    'requests': len(latencies),
+                    'throughput_rps': round(len(latencies) / seconds, 2),
+                    'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+                    'p90_ms': round(percentile(latencies, 90) * 1000, 1),
+                    'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+                    'max_ms': round(max(latencies) * 1000, 1),
+                    'not_modified': self.not_modified.get(endpoint, 0),
+                    'errors': dict(errors),
+                    'error_rate': round(failed / len(latencies), 4),
+                }
+        requests = sum(e['requests'] for e in endpoints.values())
+        failed = sum(sum(e['errors'].values()) for e in endpoints.values())
+        return {
+            'requests': requests,
+            'throughput_rps': round(requests / seconds, 2),
+            'error_rate': round(failed / requests, 4) if requests else 0.0,
+            'sqlite_locked': sum(e['errors'].get('sqlite_locked', 0) for e in endpoints.values()),
+            'p99_ms': max((e['p99_ms'] for e in endpoints.values()), default=0.0),
+            'endpoints': endpoints,
+            'error_samples': dict(self.samples),
+        }
+
+
+class Client(threading.Thread):
+    """One simulated user: acts every `interval` seconds until `deadline`."""
+
+    def __init__(self, name, base_url, recorder, interval, deadline):
+        super().__init__(name=name, daemon=True)
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.recorder = recorder
+        self.interval = interval
+        self.deadline = deadline
+        self.rng = random.Random(name)
+        self.connection = None
+
+    def request(self, endpoint, method, path, body=None, headers=None):
+        """Send one request on the kept-alive connection; returns (status, headers, body)."""
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        try:
+            try:
+                response, data = self._send(method, path, body, headers)
+            except (ConnectionError, http.client.BadStatusLine):
+                # The server closed the idle keep-alive connection; browsers retry on a new one
+                self._reset()
+                started = time.perf_counter()
+                response, data = self._send(method, path, body, headers)
+        except socket.timeout:
+            self._reset()
+            self.recorder.record(endpoint, time.perf_counter() - started, 0, 'timeout')
+            return 0, {}, b''
+        except (OSError, http.client.HTTPException):
+            self._reset()
+            self.recorder.record(endpoint, time.perf_counter() - started, 0, 'connection')
+            return 0, {}, b''
+
+        elapsed = time.perf_counter() - started
+        error = None
+        if response.status >= 500:
+            if b'database is locked' in data:
+                error = 'sqlite_locked'
+            elif b'constraint failed' in data:
+                error = 'sqlite_integrity'
+            else:
+                error = 'http_5xx'
+        elif response.status >= 400:
+            error = 'http_4xx'
+        sample = data[:300].decode('utf-8', 'replace') if error else None
+        self.recorder.record(endpoint, elapsed, response.status, error, sample)
+        return response.status, dict(response.getheaders()), data
+
+    def _send(self, method, path, body, headers):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        self.connection.request(method, self.prefix + path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def _reset(self):
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = None
+
+    def act(self):
+        raise NotImplementedError
+
+    def run(self):
+        # Random start offset, then every interval with +/-10% jitter
+        next_at = time.monotonic() + self.rng.uniform(0, self.interval)
+        while True:
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            if time.monotonic() >= self.deadline:
+                break
+            self.act()
+            next_at += self.interval * self.rng.uniform(0.9, 1.1)
+        self._reset()
+
+
+class ExtensionClient(Client):
+    """Posts the team's case list to /api/upload-json, as background.js does."""
+
+    def __init__(self, name, base_url, recorder, interval, deadline, cases, seed):
+        super().__init__(name, base_url, recorder, interval, deadline)
+        from benchmarks.export_generator import FIELD_ALIASES, ExportGenerator
+
+        # Same seed for every extension: they all watch the same team queue
+        self.generator = ExportGenerator(rows=cases, seed=seed)
+        self.fields = list(FIELD_ALIASES)
+        self.uploads = 0
+
+    def act(self):
+        if self.uploads:
+            self.generator.advance()
+        self.uploads += 1
+        self.request('upload-json', 'POST', '/api/upload-json', body={
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'source': self.name,
+            'cases': [dict(zip(self.fields, row)) for row in self.generator.iter_rows()],
+        })
+
+
+class DashboardClient(Client):
+    """Refreshes overview stats and every /api/cases page, as the frontend's loadData does."""
+
+    def __init__(self, name, base_url, recorder, interval, deadline):
+        super().__init__(name, base_url, recorder, interval, deadline)
+        self.etags = {}
+
+    def get(self, endpoint, path):
+        cached = self.etags.get(path)
+        headers = {'If-None-Match': cached[0]} if cached else {}
+        status, response_headers, body = self.request(endpoint, 'GET', path, headers=headers)
+        if status == 304 and cached:
+            return cached[1]
+        if status != 200:
+            return None
+        data = json.loads(body)
+        if 'ETag' in response_headers:
+            self.etags[path] = (response_headers['ETag'], data)
+        return data
+
+    def act(self):
+        self.get('stats/overview', '/api/stats/overview')
+        path = '/api/cases'
+        while path:
+            page = self.get('cases', path)
+            cursor = page.get('next_cursor') if page else None
+            path = f'/api/cases?cursor={cursor}' if cursor else None
+
+
+def run_stage(base_url, extensions, dashboards, seconds, settings, seed):
+    recorder = Recorder()
+    deadline = time.monotonic() + seconds
+    clients = [
+        ExtensionClient(f'load-extension-{i}', base_url, recorder, settings['upload_interval'], deadline,
+                        settings['cases'], seed)
+        for i in range(extensions)
+    ] + [
+        DashboardClient(f'load-dashboard-{i}', base_url, recorder, settings['poll_interval'], deadline)
+        for i in range(dashboards)
+    ]
+    started = time.monotonic()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    # In-flight requests may finish after the deadline
+    elapsed = time.monotonic() - started
+    return dict({'extensions': extensions, 'dashboards': dashboards, 'seconds': round(elapsed, 1)},
+                **recorder.summary(elapsed))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, threads: int):
+    """gunicorn on a scratch database, as supervisord.conf runs it; returns (process, url)."""
+    directory = tempfile.mkdtemp(prefix='snow-load-')
+    port = free_port()
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{os.path.join(directory, 'load.db')}",
+               METRICS_DIR=os.path.join(directory, 'metrics'),
+               ENABLE_NOTIFICATIONS='false',
+               FLASK_ENV='production')
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--preload',
+         '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+         '--worker-class', 'gthread', '--threads', str(threads), '--timeout', '120',
+         '--log-level', 'warning', 'wsgi:app'],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), env=env
+    )
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        if process.poll() is not None:
+            raise SystemExit(f'gunicorn exited with status {process.returncode}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return process, url
+        except OSError:
+            pass
+        time.sleep(0.1)
+    process.terminate()
+    raise SystemExit('gunicorn did not become healthy within 30s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='smoke')
+    parser.add_argument('--url', help='instance to test; default: start gunicorn on a scratch database')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers when starting a server')
+    parser.add_argument('--threads', type=int, default=16, help='gunicorn threads per worker')
+    parser.add_argument('--extensions', type=int, help='posting clients (single stage, overrides the profile)')
+    parser.add_argument('--dashboards', type=int, help='polling dashboards (single stage)')
+    parser.add_argument('--duration', type=float, help='seconds (single stage)')
+    parser.add_argument('--upload-interval', type=float, help='seconds between uploads per extension')
+    parser.add_argument('--poll-interval', type=float, help='seconds between refreshes per dashboard')
+    parser.add_argument('--cases', type=int, help='cases per upload')
+    parser.add_argument('--max-error-rate', type=float, help='fail a stage above this share of errors')
+    parser.add_argument('--max-p99-ms', type=float, help='fail a stage whose worst endpoint p99 is above this')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='also write the report to this file')
+    args = parser.parse_args()
+
+    settings = dict(PROFILES[args.profile])
+    for name in ('upload_interval', 'poll_interval', 'cases', 'max_error_rate', 'max_p99_ms'):
+        if getattr(args, name) is not None:
+            settings[name] = getattr(args, name)
+    if args.extensions is not None or args.dashboards is not None or args.duration is not None:
+        extensions, dashboards, seconds = settings['stages'][0]
+        settings['stages'] = [(
+            extensions if args.extensions is None else args.extensions,
+            dashboards if args.dashboards is None else args.dashboards,
+            seconds if args.duration is None else args.duration,
+        )]
+
+    process, url = (None, args.url) if args.url else start_server(args.workers, args.threads)
+    stages, limit = [], None
+    try:
+        for extensions, dashboards, seconds in settings['stages']:
+            stage = run_stage(url, extensions, dashboards, seconds, settings, args.seed)
+            failures = []
+            if stage['error_rate'] > settings['max_error_rate']:
+                failures.append(f"error rate {stage['error_rate']} > {settings['max_error_rate']}")
+            if settings['max_p99_ms'] is not None and stage['p99_ms'] > settings['max_p99_ms']:
+                failures.append(f"p99 {stage['p99_ms']} ms > {settings['max_p99_ms']} ms")
+            stage['failures'] = failures
+            stages.append(stage)
+            print(f"{extensions} extensions, {dashboards} dashboards: {stage['throughput_rps']} req/s, "
+                  f"p99 {stage['p99_ms']} ms, error rate {stage['error_rate']}", file=sys.stderr)
+            if failures:
+                limit = {'extensions': extensions, 'dashboards': dashboards, 'failures': failures}
+                break  # Past the scaling limit; later stages would only be worse
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    report = {
+        'meta': {
+            'profile': args.profile,
+            'url': args.url or f'gunicorn --workers {args.workers} --threads {args.threads} (scratch database)',
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+            'upload_interval': settings['upload_interval'],
+            'poll_interval': settings['poll_interval'],
+            'cases': settings['cases'],
+            'max_error_rate': settings['max_error_rate'],
+            'max_p99_ms': settings['max_p99_ms'],
+        },
+        'stages': stages,
+        'limit': limit,
+        'passed': limit is None,
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if limit is None else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Query-plan regression check for every statement the services issue.
+
+Runs a representative workload (CSV and JSON uploads, SLA pass, every read
+endpoint with and without the in-memory active case store, full-text search, case timelines,
+statistics and notification helpers, case deactivation and archiving,
+point-in-time snapshots, streaming exports, backfill) against a seeded SQLite database, records each distinct SELECT/UPDATE/DELETE through
+SQLAlchemy's before_cursor_execute hook, and runs EXPLAIN QUERY PLAN on it. A full table scan ("SCAN <table>"
+without an index) or a temp B-tree sort fails the check.
+
+Run from the backend directory (exit status 1 on violations):
+
+    python -m benchmarks.query_plans [--verbose]
+"""
+import argparse
+import json
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import create_app, db, init_database
+from app.models.case import Case
+from app.services.sla_monitor import SLAMonitor
+from app.services.statistics_service import StatisticsService
+from app.services.notification_service import NotificationService
+from app.services.case_lifecycle import archive_inactive_cases
+from app.services.snapshots import write_snapshot
+from app.services.backfill import apply_snapshots, latest_checkpoint_time, latest_history_time
+from app.services.csv_parser import CSVParser
+from app.services.history_writer import HistoryWriter
+from app.services.write_queue import write_queue
+
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+TEMP_BTREE = re.compile(r'USE TEMP B-TREE')
+
+STATES = ['Open', 'New', 'Pending Customer', 'Work in Progress', 'Pending Customer Acceptance']
+PRIORITIES = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
+REGIONS = ['EMEA', 'APAC', 'AMER']
+
+
+def seed(case_count: int = 3000) -> None:
+    random.seed(7)
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(Case, [
+        {
+            'number': f'CS{i:07d}',
+            'short_description': f'Seed case {i}',
+            'sla_minutes_left': random.choice([None, random.randint(-60, 3000)]),
+            'sub_state': random.choice(STATES),
+            'region': random.choice(REGIONS),
+            'priority': random.choice(PRIORITIES),
+            'priority_level': random.randint(1, 4),
+            'is_active': random.random() < 0.8,
+            'sla_status': random.choice(['ok', 'warning', 'critical', 'breached', 'unknown']),
+        }
+        for i in range(case_count)
+    ])
+    history = HistoryWriter()
+    for _ in range(case_count * 5):
+        history.add(
+            f'CS{random.randrange(case_count):07d}',
+            random.choice(STATES),
+            random.choice(STATES),
+            random.choice(['new_case', 'incoming', 'handled', 'state_change']),
+            priority=random.choice(PRIORITIES),
+            recorded_at=now - timedelta(minutes=random.randint(0, 60 * 24 * 14)),
+        )
+    history.flush()
+    db.session.commit()
+    # Give the planner statistics, as PRAGMA optimize would in production
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def upload_csv() -> str:
+    rows = ['number,short_description,u_sub_state,priority,'
+            'ref_sn_customerservice_technical_case.u_sla_time_left,u_region']
+    for i in range(0, 40):
+        rows.append(f'CS{i:07d},Updated {i},{random.choice(STATES)},'
+                    f'{random.choice(PRIORITIES)},{random.randint(-30, 300)}m,{random.choice(REGIONS)}')
+    rows.append('CS9999999,Brand new,Open,1 - Critical,0:10:00,EMEA')
+    return '\n'.join(rows) + '\n'
+
+
+def run_workload(app) -> None:
+    client = app.test_client()
+    # Second upload deactivates the cases missing from both
+    app.config['CASE_DEACTIVATE_AFTER_IMPORTS'] = 2
+
+    client.post('/api/upload', data=upload_csv(), content_type='text/csv')
+    client.post('/api/upload-json', json={
+        'source': 'query-plans',
+        'cases': [{'number': f'CS{i:07d}', 'state': random.choice(STATES), 'sla': '45m'}
+                  for i in range(20, 60)]
+    })
+
+    for store_enabled in (True, False):
+        app.config['ACTIVE_CASE_STORE_ENABLED'] = store_enabled
+        for query in (
+            '', '?sort_order=desc', '?status=Open', '?priority=2 - High',
+            '?sla_status=critical', '?status=Open&priority=1 - Critical',
+            '?limit=25', '?fields=number,sla_minutes_left&limit=10',
+        ):
+            page = client.get(f'/api/cases{query}').get_json()
+            if page and page.get('next_cursor'):
+                sep = '&' if query else '?'
+                client.get(f"/api/cases{query}{sep}cursor={page['next_cursor']}")
+        client.get('/api/cases/urgent')
+    client.get('/api/cases/next')
+    client.get('/api/cases/next?limit=50&fields=number,sla_minutes_left')
+
+    for query in ('?q=updated', '?q=CS00000&status=Open&priority=2 - High', '?q=12&sla_status=critical',
+                  '?q=brand new&include_inactive=true&limit=1'):
+        page = client.get(f'/api/cases/search{query}').get_json()
+        if page and page.get('next_cursor'):
+            client.get(f"/api/cases/search{query}&cursor={page['next_cursor']}")
+
+    for url in ('/api/stats/overview', '/api/stats/daily', '/api/stats/trend',
+                '/api/stats/response-times', '/api/stats/response-times?group_by=day,priority,region',
+                '/api/settings', '/api/notifications/recent', '/api/cases/CS0000001'):
+        client.get(url)
+    client.put('/api/settings', json={'sla_critical_threshold': 30})
+
+    for query in ('?limit=2', '?limit=2&order=asc'):
+        page = client.get(f'/api/cases/CS0000002/history{query}').get_json()
+        if page.get('next_cursor'):
+            client.get(f"/api/cases/CS0000002/history{query}&cursor={page['next_cursor']}")
+    client.get('/api/cases/CS9999999/history')
+
+    with app.app_context():
+        monitor = SLAMonitor(app)
+        monitor.update_all_sla_statuses()
+        monitor.get_urgent_cases()
+        monitor.get_warning_cases()
+        monitor.get_cases_by_priority()
+        monitor.get_cases_by_sla_status()
+
+        stats = StatisticsService()
+        stats.get_daily_stats()
+        stats.get_overview_stats()
+        stats.get_weekly_trend()
+        stats.get_recent_activity()
+        stats.get_state_distribution()
+
+        NotificationService(app).get_recent_notifications()
+
+        write_queue.run(archive_inactive_cases, 0)
+
+    # Point-in-time views before the first checkpoint (full replay) and after
+    # one (checkpoint + replay)
+    before = datetime.utcnow()
+    client.get(f'/api/snapshot?at={before.isoformat()}')
+    with app.app_context():
+        write_queue.run(write_snapshot)
+    client.post('/api/upload', data=upload_csv(), content_type='text/csv')
+    client.get(f'/api/snapshot?at={datetime.utcnow().isoformat()}')
+
+    # Historical backfill (the export parsing itself runs in worker processes)
+    with app.app_context():
+        latest_history_time()
+        last_checkpoint = latest_checkpoint_time()
+        cases = CSVParser(upload_csv()).parse()[0]
+        write_queue.run(apply_snapshots, [(datetime.utcnow(), cases)], last_checkpoint, group=False)
+
+    # Streaming exports (include_inactive=true is a deliberate full read of cases)
+    client.get('/api/export/cases').get_data()
+    client.get(f'/api/export/cases?format=ndjson&since={before.isoformat()}').get_data()
+    client.get('/api/export/history').get_data()
+    client.get(f'/api/export/history?since={before.isoformat()}&until={datetime.utcnow().isoformat()}').get_data()
+
+
+def explain(connection, statement: str, parameters) -> list:
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else ()
+    cursor = connection.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ())
+    return [row[3] for row in cursor.fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--verbose', action='store_true', help='print every plan')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    init_database(app)
+    statements = {}
+
+    with app.app_context():
+        seed()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            verb = statement.lstrip().split(None, 1)[0].upper()
+            if verb in ('SELECT', 'UPDATE', 'DELETE') and statement not in statements:
+                statements[statement] = parameters
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            run_workload(app)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        raw = db.engine.raw_connection()
+        try:
+            results = []
+            for statement, parameters in statements.items():
+                plan = explain(raw.driver_connection, statement, parameters)
+                problems = [step for step in plan if FULL_SCAN.match(step) or TEMP_BTREE.search(step)]
+                results.append({'sql': ' '.join(statement.split()), 'plan': plan, 'problems': problems})
+        finally:
+            raw.close()
+
+    failures = [r for r in results if r['problems']]
+    for result in results:
+        if args.verbose or result['problems']:
+            status = 'FAIL' if result['problems'] else 'ok'
+            print(f"[{status}] {result['sql']}")
+            for step in result['plan']:
+                print(f'        {step}')
+
+    print(json.dumps({'statements': len(results), 'failures': len(failures)}))
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
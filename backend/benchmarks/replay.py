@@ -0,0 +1,209 @@
+"""
+Replay a recorded day of uploads to compare ingest timings between versions.
+
+Reads one day of the index written by app.services.ingest_recorder
+(INGEST_RECORD_DIR) and feeds every payload back in recorded order:
+
+    --mode direct   in-process through CSVParser / JSONParser on a scratch
+                    database, timing parse, save_to_database and the SLA
+                    status pass of every upload separately
+    --mode http     POSTed to /api/upload (as text/csv) or /api/upload-json
+                    of the instance at --url, overlapping as the recorded
+                    uploads did; latency and status per upload
+
+--speed 1 keeps the recorded gaps between uploads, --speed 60 replays an
+hour per minute and --speed 0 does not wait at all (the default for direct
+mode; http mode defaults to 1). Results have the format of benchmarks.suite,
+one record per phase with the per-upload timings as runs, so two replays
+can be compared with `python -m benchmarks.suite --compare`. Turn recording
+off on the instance a replay is sent to, or the replay is recorded again.
+
+Run from the backend directory:
+
+    python -m benchmarks.replay --record-dir /app/data/ingest [--day 2026-10-18] [--output replay.json]
+    python -m benchmarks.replay --record-dir /app/data/ingest --mode http --url http://localhost:8085 --speed 60
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+
+def load_entries(recorder, day, limit):
+    entries = list(recorder.entries(day))
+    return entries[:limit] if limit else entries
+
+
+def pace(entries, speed):
+    """Yield (entry, due) with `due` in seconds since the replay started."""
+    first = datetime.fromisoformat(entries[0]['recorded_at']) if entries else None
+    for entry in entries:
+        offset = (datetime.fromisoformat(entry['recorded_at']) - first).total_seconds()
+        yield entry, offset / speed if speed else 0.0
+
+
+def wait_until(started, due):
+    delay = started + due - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+
+
+def configure_scratch_database():
+    """Point the app at an empty database; must run before anything imports the app."""
+    directory = tempfile.mkdtemp(prefix='snow-replay-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'replay.db')}"
+    os.environ['ENABLE_NOTIFICATIONS'] = 'false'
+    os.environ.pop('INGEST_RECORD_DIR', None)  # Do not record the replay itself
+
+
+def run_direct(recorder, entries, speed):
+    from app import create_app, init_database
+    from app.services.csv_parser import CSVParser
+    from app.services.json_parser import JSONParser
+    from app.services.sla_monitor import SLAMonitor
+    from benchmarks.suite import summarize
+
+    app = create_app('development')
+    init_database(app)
+
+    phases = {'parse': [], 'save': [], 'sla_update': [], 'total': []}
+    cases_total = rejected = 0
+    started = time.monotonic()
+    with app.app_context():
+        monitor = SLAMonitor(app)
+        for entry, due in pace(entries, speed):
+            wait_until(started, due)
+            payload = recorder.load(entry['sha256'])
+
+            began = time.perf_counter()
+            if entry['kind'] == 'csv':
+                parser = CSVParser(payload.decode('utf-8'))
+            else:
+                parser = JSONParser(json.loads(payload).get('cases') or [])
+            cases, errors, _ = parser.parse()
+            parsed = time.perf_counter()
+            if errors or not cases:
+                rejected += 1  # The endpoint answers 400 without writing
+                continue
+            parser.save_to_database(cases)
+            saved = time.perf_counter()
+            monitor.update_all_sla_statuses()
+            finished = time.perf_counter()
+
+            cases_total += len(cases)
+            phases['parse'].append(parsed - began)
+            phases['save'].append(saved - parsed)
+            phases['sla_update'].append(finished - saved)
+            phases['total'].append(finished - began)
+
+    uploads = len(phases['total'])
+    results = [summarize(f'replay.{phase}', uploads, None, runs) for phase, runs in phases.items() if runs]
+    for result, runs in zip(results, phases.values()):
+        result['total_s'] = round(sum(runs), 6)
+    return results, {'uploads': uploads, 'rejected': rejected, 'cases': cases_total}
+
+
+def run_http(recorder, entries, speed, url, concurrency):
+    from benchmarks.suite import summarize
+
+    parts = urlsplit(url)
+    lock = threading.Lock()
+    latencies = {}
+    statuses = {}
+
+    def post(entry, payload):
+        content_type = 'text/csv; charset=utf-8' if entry['kind'] == 'csv' else 'application/json'
+        began = time.perf_counter()
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=300)
+            connection.request('POST', parts.path.rstrip('/') + entry['endpoint'], body=payload,
+                               headers={'Content-Type': content_type})
+            response = connection.getresponse()
+            response.read()
+            connection.close()
+            status = str(response.status)
+        except (OSError, http.client.HTTPException):
+            status = 'connection'
+        elapsed = time.perf_counter() - began
+        with lock:
+            latencies.setdefault(entry['endpoint'], []).append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    late = []
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for entry, due in pace(entries, speed):
+            payload = recorder.load(entry['sha256'])
+            wait_until(started, due)
+            late.append(max(0.0, time.monotonic() - started - due))
+            pool.submit(post, entry, payload)
+    results = [
+        summarize(f'replay.http{endpoint}', len(runs), None, runs)
+        for endpoint, runs in sorted(latencies.items())
+    ]
+    return results, {
+        'uploads': len(entries),
+        'statuses': statuses,
+        'wall_s': round(time.monotonic() - started, 3),
+        'max_submit_lag_s': round(max(late, default=0.0), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--record-dir', default=os.environ.get('INGEST_RECORD_DIR'),
+                        help='recording directory (default: $INGEST_RECORD_DIR)')
+    parser.add_argument('--day', help='YYYY-MM-DD to replay (default: the latest recorded day)')
+    parser.add_argument('--mode', choices=('direct', 'http'), default='direct')
+    parser.add_argument('--url', default='http://localhost:5000', help='instance for --mode http')
+    parser.add_argument('--speed', type=float, help='1 = recorded pace, N = N times faster, 0 = no waits')
+    parser.add_argument('--concurrency', type=int, default=16, help='uploads in flight at once (http)')
+    parser.add_argument('--limit', type=int, help='replay only the first N uploads')
+    parser.add_argument('--output', help='also write the results to this file')
+    args = parser.parse_args()
+
+    if not args.record_dir or not os.path.isdir(args.record_dir):
+        parser.error('--record-dir (or INGEST_RECORD_DIR) must name a recording directory')
+
+    if args.mode == 'direct':
+        # Config is read at import time, so configure before importing the app
+        configure_scratch_database()
+    from app.services.ingest_recorder import IngestRecorder
+
+    recorder = IngestRecorder(args.record_dir)
+    days = recorder.days()
+    day = args.day or (days[-1] if days else None)
+    if day not in days:
+        parser.error(f'no recording for {day}; recorded days: {", ".join(days) or "none"}')
+    entries = load_entries(recorder, day, args.limit)
+    speed = args.speed if args.speed is not None else (0.0 if args.mode == 'direct' else 1.0)
+
+    if args.mode == 'direct':
+        results, summary = run_direct(recorder, entries, speed)
+    else:
+        results, summary = run_http(recorder, entries, speed, args.url, args.concurrency)
+
+    from benchmarks.suite import metadata
+
+    report = {
+        'meta': metadata(day=day, mode=args.mode, speed=speed, url=args.url if args.mode == 'http' else None,
+                         **summary),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+    if args.mode == 'http' and any(status == 'connection' or status >= '500' for status in summary['statuses']):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""
+Full-text search latency on a large case table.
+
+Seeds a scratch database with --cases cases from benchmarks.export_generator
+(--inactive of them deactivated) through plain INSERTs, so the triggers
+fill cases_fts as ingest would, then times:
+
+    index_build             rebuilding cases_fts from every case (migration 9 on an existing database)
+    search.<name>           GET /api/cases/search for each query in QUERIES, first page
+
+The generator draws descriptions from a few dozen phrases, so every word
+matches a tenth or more of the cases: the word queries are the expensive
+end of what real descriptions give. Results have the format of
+benchmarks.suite, so runs can be compared with `python -m benchmarks.suite --compare`.
+
+Run from the backend directory:
+
+    python -m benchmarks.search [--cases 100000] [--inactive 0.5] [--repeat 20] [--output search.json]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+
+# name -> query string (after /api/cases/search?)
+QUERIES = {
+    'number': 'q=CS1050000&include_inactive=true',
+    'number_digits': 'q=1050000&include_inactive=true',
+    'number_prefix': 'q=CS10500&include_inactive=true',
+    'word': 'q=firmware',
+    'word_prefix': 'q=fi',
+    'two_words': 'q=login monday',
+    'filtered': 'q=backup&sla_status=breached&priority=1 - Critical',
+    'inactive': 'q=backup&include_inactive=true',
+    'no_match': 'q=printer',
+}
+
+
+def seed(case_count: int, inactive: float) -> None:
+    from app import db
+    from app.models.case import Case
+    from benchmarks.export_generator import ExportGenerator
+
+    generator = ExportGenerator(rows=case_count, seed=1)
+    rng = random.Random(2)
+    rows = []
+    for number, (state, sla, priority, region, description, updated_at) in generator.cases.items():
+        rows.append({
+            'number': number,
+            'short_description': generator.descriptions[description],
+            'sub_state': state,
+            'priority': priority,
+            'region': region,
+            'sla_minutes_left': sla,
+            'sla_status': 'breached' if sla is not None and sla <= 0 else 'ok',
+            'sys_updated_on': updated_at,
+            'is_active': rng.random() >= inactive,
+        })
+    for start in range(0, len(rows), 10000):
+        db.session.execute(Case.__table__.insert(), rows[start:start + 10000])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cases', type=int, default=100000, help='cases in the table')
+    parser.add_argument('--inactive', type=float, default=0.5, help='share of the cases deactivated')
+    parser.add_argument('--repeat', type=int, default=20, help='timed runs per query')
+    parser.add_argument('--output', help='also write the results to this file')
+    args = parser.parse_args()
+
+    # Config is read at import time, so configure before importing the app
+    directory = tempfile.mkdtemp(prefix='snow-search-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'search.db')}"
+    os.environ['ENABLE_NOTIFICATIONS'] = 'false'
+
+    from app import create_app, db, init_database
+    from app.migrations import create_case_search
+    from benchmarks.suite import measure, metadata, summarize
+
+    app = create_app('production')
+    init_database(app)
+    client = app.test_client()
+
+    with app.app_context():
+        seed(args.cases, args.inactive)
+        with db.engine.begin() as conn:
+            began = time.perf_counter()
+            create_case_search()(conn)
+            build = time.perf_counter() - began
+    results = [summarize('index_build', args.cases, args.cases, [build])]
+
+    matches = {}
+    for name, query in QUERIES.items():
+        def fetch(query=query, name=name):
+            response = client.get(f'/api/cases/search?{query}')
+            assert response.status_code == 200, response.status_code
+            matches[name] = response.get_json()['total']
+        results.append(measure(f'search.{name}', args.cases, None, args.repeat, fetch))
+    for result in results[1:]:
+        result['matches'] = matches[result['benchmark'].split('.', 1)[1]]
+
+    report = {
+        'meta': metadata(cases=args.cases, inactive=args.inactive, repeat=args.repeat),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
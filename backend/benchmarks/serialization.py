@@ -0,0 +1,89 @@
+"""
+Serialization cost of /api/cases per 10k cases: ORM + to_dict() + jsonify
+versus Core row tuples + app.utils.fast_json.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization [--cases 10000] [--repeat 5]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import jsonify
+
+from app import create_app, db, init_database
+from app.models.case import Case
+from app.services.case_reader import CaseReader
+from app.utils import fast_json
+
+
+def seed(count: int) -> None:
+    random.seed(42)
+    now = datetime.utcnow()
+    db.session.bulk_insert_mappings(Case, [
+        {
+            'number': f'CS{i:07d}',
+            'short_description': f'Synthetic case {i} ' + 'x' * random.randint(10, 80),
+            'time_to_respond': '4h',
+            'sla_time_left': f'{random.randint(0, 48)}h {random.randint(0, 59)}m',
+            'sla_minutes_left': random.randint(-120, 2880),
+            'sub_state': random.choice(['Open', 'New', 'Pending Customer', 'Work in Progress']),
+            'region': random.choice(['EMEA', 'APAC', 'AMER']),
+            'priority': random.choice(['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']),
+            'priority_level': random.randint(1, 4),
+            'sys_updated_on': now - timedelta(minutes=random.randint(0, 10000)),
+            'created_at': now,
+            'updated_at': now,
+            'is_active': True,
+            'sla_status': 'ok',
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def orm_path(count: int) -> int:
+    cases = Case.query.filter_by(is_active=True).order_by(Case.sla_minutes_left.asc()).all()
+    return len(jsonify({'cases': [c.to_dict() for c in cases], 'total': len(cases)}).get_data())
+
+
+def core_path(count: int) -> int:
+    page = CaseReader().list_cases(limit=count)
+    return len(fast_json.dumps(page))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--cases', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    init_database(app)
+    with app.test_request_context():
+        seed(args.cases)
+        results = {
+            'cases': args.cases,
+            'encoder': 'orjson' if fast_json.orjson is not None else 'json',
+            'orm_to_dict_jsonify_s': best_of(args.repeat, lambda: orm_path(args.cases)),
+            'core_fast_json_s': best_of(args.repeat, lambda: core_path(args.cases)),
+        }
+    results['speedup'] = round(results['orm_to_dict_jsonify_s'] / results['core_fast_json_s'], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+N+1 report from the SQL profiler.
+
+Runs the query_plans workload (uploads, SLA pass, every read endpoint,
+timelines, statistics, lifecycle jobs, snapshots, exports) with
+SQL_PROFILER_ENABLED and summarises each scope (request route or write
+queue group): how often it ran, its largest query count and database time,
+and every statement shape it repeated SQL_REPEAT_THRESHOLD times or more
+in a single run. Scopes are listed by query count, worst first.
+
+Run from the backend directory:
+
+    python -m benchmarks.sql_profile [--threshold 5] [--top 15]
+"""
+import argparse
+import json
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threshold', type=int, default=5, help='repeats of one statement that count as N+1')
+    parser.add_argument('--top', type=int, default=15, help='scopes to print')
+    args = parser.parse_args()
+
+    # Config is read at import time, so enable the profiler before importing the app
+    os.environ['SQL_PROFILER_ENABLED'] = 'true'
+    os.environ['SQL_REPEAT_THRESHOLD'] = str(args.threshold)
+    os.environ['SQL_SLOW_QUERY_MS'] = '1000000'  # Slow-query logging is not what this reports
+    from app import create_app, init_database
+    from app.sql_profiler import add_listener
+    from benchmarks.query_plans import run_workload, seed
+
+    scopes = {}
+
+    def collect(profile):
+        summary = scopes.setdefault(profile.name, {
+            'scope': profile.name, 'runs': 0, 'max_queries': 0, 'max_db_ms': 0.0, 'repeated': {},
+        })
+        summary['runs'] += 1
+        summary['max_queries'] = max(summary['max_queries'], profile.count)
+        summary['max_db_ms'] = max(summary['max_db_ms'], round(profile.seconds * 1000, 2))
+        for shape, count, _ in profile.repeated(args.threshold):
+            summary['repeated'][shape] = max(summary['repeated'].get(shape, 0), count)
+
+    app = create_app('testing')
+    init_database(app)
+    with app.app_context():
+        seed()
+        add_listener(collect)
+        run_workload(app)
+
+    report = sorted(scopes.values(), key=lambda summary: summary['max_queries'], reverse=True)
+    for summary in report:
+        summary['repeated'] = [
+            {'count': count, 'statement': shape[:200]}
+            for shape, count in sorted(summary['repeated'].items(), key=lambda item: item[1], reverse=True)
+        ]
+    print(json.dumps({
+        'scopes': len(report),
+        'scopes_with_repeats': sum(1 for summary in report if summary['repeated']),
+        'worst': report[:args.top],
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Concurrency benchmark for the SQLite storage profile.
+
+Starts writer processes (upload-sized transactions updating cases and
+appending history) and reader processes (dashboard-style active case
+queries) against one database file, first with SQLite defaults (rollback
+journal, no busy timeout) and then with the app's storage profile. Reports
+throughput, p50/p99 latency and "database is locked" errors per profile.
+
+Run from the backend directory:
+
+    python -m benchmarks.sqlite_concurrency [--writers 4] [--readers 8] [--seconds 5]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import BaseConfig
+from app.storage import apply_storage_profile
+
+
+CASES = 2000
+BATCH = 200
+
+PROFILE_CONFIG = {name: getattr(BaseConfig, name) for name in dir(BaseConfig) if name.startswith('SQLITE_')}
+
+
+def make_engine(path: str, profile: str):
+    # timeout=0 disables pysqlite's own busy handler so the default profile
+    # behaves like plain SQLite; the tuned profile sets busy_timeout itself
+    engine = create_engine(f'sqlite:///{path}', connect_args={'timeout': 0})
+    if profile == 'tuned':
+        apply_storage_profile(engine, PROFILE_CONFIG)
+    return engine
+
+
+def setup(path: str, profile: str) -> None:
+    engine = make_engine(path, profile)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TABLE cases (id INTEGER PRIMARY KEY, number TEXT UNIQUE, sub_state TEXT, '
+            'sla_minutes_left INTEGER, sla_status TEXT, is_active BOOLEAN, updated_at DATETIME)'
+        )
+        conn.exec_driver_sql('CREATE INDEX ix_active_sla ON cases (is_active, sla_minutes_left)')
+        conn.exec_driver_sql(
+            'CREATE TABLE case_history (id INTEGER PRIMARY KEY, case_number TEXT, '
+            'new_state TEXT, recorded_at DATETIME)'
+        )
+        conn.execute(text(
+            'INSERT INTO cases (number, sub_state, sla_minutes_left, sla_status, is_active, updated_at) '
+            'VALUES (:number, :state, :minutes, :status, 1, :now)'
+        ), [
+            {'number': f'CS{i:07d}', 'state': 'Open', 'minutes': random.randint(-60, 3000),
+             'status': 'ok', 'now': datetime.utcnow()}
+            for i in range(CASES)
+        ])
+    engine.dispose()
+
+
+def worker(args):
+    role, path, profile, seconds, seed = args
+    random.seed(seed)
+    engine = make_engine(path, profile)
+    latencies, errors = [], 0
+    deadline = time.monotonic() + seconds
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            with engine.begin() as conn:
+                if role == 'writer':
+                    numbers = random.sample(range(CASES), BATCH)
+                    conn.execute(text(
+                        'UPDATE cases SET sla_minutes_left = :minutes, updated_at = :now '
+                        'WHERE number = :number'
+                    ), [{'minutes': random.randint(-60, 3000), 'now': datetime.utcnow(),
+                         'number': f'CS{n:07d}'} for n in numbers])
+                    conn.execute(text(
+                        'INSERT INTO case_history (case_number, new_state, recorded_at) '
+                        'VALUES (:number, :state, :now)'
+                    ), [{'number': f'CS{n:07d}', 'state': 'Open', 'now': datetime.utcnow()}
+                        for n in numbers[:20]])
+                else:
+                    conn.execute(text(
+                        'SELECT id, number, sub_state, sla_minutes_left, sla_status FROM cases '
+                        'WHERE is_active = 1 ORDER BY sla_minutes_left LIMIT 500'
+                    )).all()
+            latencies.append(time.perf_counter() - start)
+        except OperationalError as e:
+            if 'locked' not in str(e) and 'busy' not in str(e):
+                raise
+            errors += 1
+    engine.dispose()
+    return role, latencies, errors
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_profile(profile: str, writers: int, readers: int, seconds: float) -> dict:
+    directory = tempfile.mkdtemp(prefix='snow-bench-')
+    path = os.path.join(directory, 'bench.db')
+    setup(path, profile)
+
+    jobs = [('writer', path, profile, seconds, i) for i in range(writers)]
+    jobs += [('reader', path, profile, seconds, 100 + i) for i in range(readers)]
+    with multiprocessing.Pool(len(jobs)) as pool:
+        results = pool.map(worker, jobs)
+
+    summary = {'profile': profile}
+    for role in ('writer', 'reader'):
+        latencies = [l for r, ls, _ in results if r == role for l in ls]
+        summary[role] = {
+            'ops_per_s': round(len(latencies) / seconds, 1),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+            'locked_errors': sum(e for r, _, e in results if r == role),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    results = [run_profile(profile, args.writers, args.readers, args.seconds)
+               for profile in ('default', 'tuned')]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark suite over synthetic exports, with results comparable between commits.
+
+For each of --sizes it generates two successive exports with
+benchmarks.export_generator and, in a fresh process with its own scratch
+database, times:
+
+    csv_parse               CSVParser.parse of the first export
+    save_initial            save_to_database of the first export into an empty database
+    save_churn              save_to_database of the second export over the first
+    sla_update              SLAMonitor.update_all_sla_statuses, nothing to change
+    sla_update_all          the same after clearing every status, so every row changes
+    stats.<method>          each StatisticsService method
+    api_cases               GET /api/cases, every page at the maximum page size
+    api_cases_db            the same with include_inactive=true (database path)
+    api_cases_next          GET /api/cases/next?limit=50, the top of the urgency index
+
+Each benchmark runs --repeat times; the output is JSON with the runs,
+min/median seconds and rows/s, plus the git commit and environment they
+were measured on. Save it with --output and compare two such files with
+--compare, which exits non-zero if any median got slower than --tolerance.
+
+Run from the backend directory:
+
+    python -m benchmarks.suite [--sizes 100,1000,10000] [--repeat 5] [--output results.json]
+    python -m benchmarks.suite --compare base.json head.json [--tolerance 0.1]
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+STAT_METHODS = ['get_daily_stats', 'get_overview_stats', 'get_weekly_trend', 'get_recent_activity',
+                'get_state_distribution']
+
+
+def summarize(name, size, rows, runs):
+    """Result record for one benchmark: every run plus min/median seconds and rows/s."""
+    median = statistics.median(runs)
+    return {
+        'benchmark': name,
+        'size': size,
+        'rows': rows,
+        'runs': [round(seconds, 6) for seconds in runs],
+        'min_s': round(min(runs), 6),
+        'median_s': round(median, 6),
+        'rows_per_s': round(rows / median, 1) if rows and median else None,
+    }
+
+
+def measure(name, size, rows, repeat, fn, setup=None):
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return summarize(name, size, rows, runs)
+
+
+def run_size(args):
+    size, repeat, seed = args
+    directory = tempfile.mkdtemp(prefix='snow-suite-')
+    # Config is read at import time, so configure before importing the app
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'suite.db')}"
+    os.environ['ENABLE_NOTIFICATIONS'] = 'false'
+
+    from app import create_app, db, init_database
+    from app.models.case import Case
+    from app.services.csv_parser import CSVParser
+    from app.services.sla_monitor import SLAMonitor
+    from app.services.statistics_service import StatisticsService
+    from benchmarks.export_generator import ExportGenerator
+
+    app = create_app('development')
+    init_database(app)
+    client = app.test_client()
+
+    generator = ExportGenerator(rows=size, seed=seed)
+    first = generator.to_csv(variant=0)
+    generator.advance()
+    second = generator.to_csv(variant=1)
+
+    results = []
+    with app.app_context():
+        first_cases = CSVParser(first).parse()[0]
+        second_cases = CSVParser(second).parse()[0]
+        pending = {}
+
+        def reset():
+            db.session.remove()
+            client.post('/api/reset')
+
+        def load(cases):
+            CSVParser('').save_to_database([dict(case) for case in cases])
+
+        def stage(cases):
+            # Copies made outside the timed call: the ingestor may add keys
+            pending['cases'] = [dict(case) for case in cases]
+
+        def save_pending():
+            CSVParser('').save_to_database(pending.pop('cases'))
+
+        results.append(measure('csv_parse', size, size, repeat, lambda: CSVParser(first).parse()))
+        results.append(measure('save_initial', size, len(first_cases), repeat, save_pending,
+                               setup=lambda: (reset(), stage(first_cases))))
+        results.append(measure('save_churn', size, len(second_cases), repeat, save_pending,
+                               setup=lambda: (reset(), load(first_cases), stage(second_cases))))
+        db.session.remove()
+
+        active = Case.query.filter_by(is_active=True).count()
+        total = Case.query.count()
+        monitor = SLAMonitor(app)
+
+        def clear_statuses():
+            db.session.execute(Case.__table__.update().values(sla_status=None))
+            db.session.commit()
+
+        results.append(measure('sla_update', size, active, repeat, monitor.update_all_sla_statuses))
+        results.append(measure('sla_update_all', size, active, repeat, monitor.update_all_sla_statuses,
+                               setup=clear_statuses))
+
+        service = StatisticsService()
+        for method in STAT_METHODS:
+            results.append(measure(f'stats.{method}', size, None, repeat, getattr(service, method),
+                                   setup=db.session.expunge_all))
+        db.session.remove()
+
+    limit = app.config.get('CASES_MAX_PAGE_SIZE', 5000)
+
+    def walk(query):
+        def fetch():
+            cursor = ''
+            while True:
+                response = client.get(f'/api/cases?limit={limit}{query}{cursor}')
+                assert response.status_code == 200, response.status_code
+                next_cursor = response.get_json().get('next_cursor')
+                if not next_cursor:
+                    return
+                cursor = f'&cursor={next_cursor}'
+        return fetch
+
+    results.append(measure('api_cases', size, active, repeat, walk('')))
+    results.append(measure('api_cases_db', size, total, repeat, walk('&include_inactive=true')))
+
+    def next_cases():
+        response = client.get('/api/cases/next?limit=50')
+        assert response.status_code == 200, response.status_code
+
+    results.append(measure('api_cases_next', size, None, repeat, next_cases))
+    return results
+
+
+def metadata(**settings) -> dict:
+    """Commit and environment a result file was measured on, plus the run's settings."""
+    def git(*command):
+        try:
+            return subprocess.run(['git', *command], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git('status', '--porcelain', '--untracked-files=no')
+    return dict({
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(status) if status is not None else None,
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }, **settings)
+
+
+def compare(base_path: str, head_path: str, tolerance: float) -> int:
+    with open(base_path) as handle:
+        base = json.load(handle)
+    with open(head_path) as handle:
+        head = json.load(handle)
+
+    baseline = {(r['benchmark'], r['size']): r for r in base['results']}
+    rows, regressions = [], 0
+    for result in head['results']:
+        before = baseline.get((result['benchmark'], result['size']))
+        if before is None or not before['median_s']:
+            continue
+        ratio = result['median_s'] / before['median_s']
+        verdict = 'slower' if ratio > 1 + tolerance else 'faster' if ratio < 1 - tolerance else 'same'
+        regressions += verdict == 'slower'
+        rows.append({
+            'benchmark': result['benchmark'],
+            'size': result['size'],
+            'base_median_s': before['median_s'],
+            'head_median_s': result['median_s'],
+            'ratio': round(ratio, 3),
+            'verdict': verdict,
+        })
+    print(json.dumps({
+        'base': base['meta'].get('commit'),
+        'head': head['meta'].get('commit'),
+        'tolerance': tolerance,
+        'regressions': regressions,
+        'results': rows,
+    }, indent=2))
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100,1000,10000', help='export rows per run, up to 1000000')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark')
+    parser.add_argument('--seed', type=int, default=1, help='export generator seed')
+    parser.add_argument('--output', help='also write the results to this file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'), help='compare two result files')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='median change counted as noise')
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(compare(*args.compare, args.tolerance))
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    # A fresh interpreter and database per size: the app reads its config at import time
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for size in sizes:
+        with context.Pool(1) as pool:
+            results.extend(pool.apply(run_size, ((size, args.repeat, args.seed),)))
+
+    report = {'meta': metadata(sizes=args.sizes, repeat=args.repeat, seed=args.seed), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
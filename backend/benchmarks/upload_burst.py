@@ -0,0 +1,131 @@
+"""
+Burst benchmark for the single-writer commit queue.
+
+Seeds a database file with one large upload, then fires a burst of
+simultaneous /api/upload-json requests from separate threads (as several
+extension instances posting at once would) and measures wall time, request
+latency and failed uploads. Runs twice in fresh processes: once with every
+request committing on its own (WRITE_QUEUE_ENABLED=false) and once through
+the write queue, which also reports how many group commits it needed.
+
+Run from the backend directory:
+
+    python -m benchmarks.upload_burst [--uploads 20] [--cases 2000] [--batch 200] [--rounds 3]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+import time
+
+
+STATES = ['Open', 'New', 'Pending Customer', 'Work in Progress', 'Pending Customer Acceptance']
+PRIORITIES = ['1 - Critical', '2 - High', '3 - Moderate', '4 - Low']
+
+
+def make_cases(numbers, rng):
+    return [
+        {
+            'number': f'CS{n:07d}',
+            'short_description': f'Burst case {n}',
+            'state': rng.choice(STATES),
+            'priority': rng.choice(PRIORITIES),
+            'sla': f'{rng.randint(-60, 3000)}m',
+            'region': rng.choice(['EMEA', 'APAC', 'AMER']),
+        }
+        for n in numbers
+    ]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_mode(args):
+    mode, uploads, case_count, batch, rounds = args
+    directory = tempfile.mkdtemp(prefix='snow-burst-')
+    # Config is read at import time, so configure before importing the app
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(directory, 'burst.db')}"
+    os.environ['ENABLE_NOTIFICATIONS'] = 'false'
+    os.environ['WRITE_QUEUE_ENABLED'] = 'true' if mode == 'queue' else 'false'
+
+    from app import create_app, init_database
+    from app.services.write_queue import write_queue
+
+    app = create_app('development')
+    init_database(app)
+    rng = random.Random(11)
+    seed_client = app.test_client()
+    seed_client.post('/api/upload-json', json={
+        'source': 'seed', 'cases': make_cases(range(case_count), rng)
+    })
+
+    latencies, failures = [], []
+    wall = 0.0
+    for _ in range(rounds):
+        payloads = [
+            {'source': f'burst-{i}', 'cases': make_cases(rng.sample(range(case_count), batch), rng)}
+            for i in range(uploads)
+        ]
+        barrier = threading.Barrier(uploads + 1)
+        lock = threading.Lock()
+
+        def post(payload):
+            client = app.test_client()
+            barrier.wait()
+            start = time.perf_counter()
+            response = client.post('/api/upload-json', json=payload)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 200:
+                    failures.append((response.get_json() or {}).get('error', response.status_code))
+
+        threads = [threading.Thread(target=post, args=(p,)) for p in payloads]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        wall += time.perf_counter() - start
+
+    result = {
+        'mode': mode,
+        'uploads': uploads * rounds,
+        'uploads_per_s': round(uploads * rounds / wall, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'failed': len(failures),
+        'locked_errors': sum(1 for f in failures if 'locked' in str(f)),
+    }
+    if mode == 'queue':
+        stats = write_queue.get_stats()
+        result['group_commits'] = stats['groups']
+        result['max_group'] = stats['max_group']
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--uploads', type=int, default=20, help='simultaneous uploads per burst')
+    parser.add_argument('--cases', type=int, default=2000, help='cases in the seeded database')
+    parser.add_argument('--batch', type=int, default=200, help='cases per upload')
+    parser.add_argument('--rounds', type=int, default=3, help='bursts per mode')
+    args = parser.parse_args()
+
+    # A fresh interpreter per mode: the app reads its config at import time
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for mode in ('inline', 'queue'):
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_mode, ((mode, args.uploads, args.cases, args.batch, args.rounds),)))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
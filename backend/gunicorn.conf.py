@@ -0,0 +1,13 @@
+"""
+gunicorn hooks for wsgi:app (supervisord.conf).
+
+Background threads do not survive a fork, so services are started in each
+worker once it has loaded the app, with or without --preload. Only the
+worker that takes the job lock runs the scheduled jobs (see app.jobs).
+"""
+
+
+def post_worker_init(worker):
+    from app import start_services
+
+    start_services(worker.wsgi)
@@ -0,0 +1,12 @@
+"""
+WSGI entry point for gunicorn (supervisord.conf).
+
+With --preload the gunicorn master imports this once: the app is built and
+the schema migrated before the workers fork, so they share the imported
+code copy-on-write and never race each other through the migrations. The
+job scheduler is started by gunicorn.conf.py, in one worker.
+"""
+from app import create_app, init_database
+
+app = create_app('production')
+init_database(app)
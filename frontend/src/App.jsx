@@ -2,7 +2,7 @@ import React, { useState, useEffect, useCallback } from 'react'
 import Dashboard from './components/Dashboard'
 import UploadZone from './components/UploadZone'
 import SettingsModal from './components/SettingsModal'
-import { fetchOverviewStats, fetchCases, uploadCSV, resetDatabase } from './services/api'
+import { fetchOverviewStats, fetchCases, uploadCSV, resetDatabase, subscribeToEvents } from './services/api'
 
 export default function App() {
   const [stats, setStats] = useState(null)
@@ -73,9 +73,22 @@ export default function App() {
   useEffect(() => {
     loadData()
 
-    // Auto-refresh every 30 seconds
-    const interval = setInterval(loadData, 30000)
-    return () => clearInterval(interval)
+    // Refresh when the backend pushes a change instead of polling.
+    // Bursts (one upload emits many events) collapse into a single reload.
+    let pending = null
+    const scheduleReload = () => {
+      if (pending) return
+      pending = setTimeout(() => {
+        pending = null
+        loadData()
+      }, 300)
+    }
+
+    const events = subscribeToEvents(scheduleReload)
+    return () => {
+      events.close()
+      clearTimeout(pending)
+    }
   }, [loadData])
 
   return (
@@ -1,25 +1,54 @@
 const API_BASE = '/api';
 
+// Last ETag and body per GET url, so unchanged polls are answered with 304
+const etagCache = new Map();
+
 async function fetchJSON(url, options = {}) {
+  const isGet = !options.method || options.method === 'GET';
+  const cached = isGet ? etagCache.get(url) : undefined;
+
   const response = await fetch(url, {
     ...options,
+    cache: 'no-store',
     headers: {
       'Content-Type': 'application/json',
+      ...(cached ? { 'If-None-Match': cached.etag } : {}),
       ...options.headers
     }
   });
 
+  if (response.status === 304 && cached) {
+    return cached.data;
+  }
+
   if (!response.ok) {
     const error = await response.json().catch(() => ({ error: 'Request failed' }));
     throw new Error(error.error || `API error: ${response.status}`);
   }
 
-  return response.json();
+  const data = await response.json();
+  const etag = response.headers.get('ETag');
+  if (isGet && etag) {
+    etagCache.set(url, { etag, data });
+  }
+
+  return data;
 }
 
+// Follows keyset cursors so callers still receive the full filtered list
 export async function fetchCases(params = {}) {
-  const query = new URLSearchParams(params).toString();
-  return fetchJSON(`${API_BASE}/cases${query ? `?${query}` : ''}`);
+  const cases = [];
+  let cursor = null;
+  let page;
+
+  do {
+    const query = new URLSearchParams({ ...params, ...(cursor ? { cursor } : {}) }).toString();
+    page = await fetchJSON(`${API_BASE}/cases${query ? `?${query}` : ''}`);
+    cases.push(...page.cases);
+    cursor = page.next_cursor;
+  } while (cursor);
+
+  return { cases, total: page.total };
 }
 
 export async function fetchCase(caseNumber) {
@@ -74,6 +103,51 @@ export async function uploadCSV(file) {
   return response.json();
 }
 
+// Server-Sent Events change feed. EventSource reconnects on its own and
+// resumes from the last received event via the Last-Event-ID header.
+export const CHANGE_EVENT_TYPES = ['upload', 'state_change', 'sla_transition', 'notification', 'reset', 'resync'];
+
+// A server with every stream slot taken answers 503 and EventSource gives
+// up; poll (ETag-cached) in the meantime and try the stream again later
+const POLL_FALLBACK_MS = 30000;
+const STREAM_RETRY_MS = 60000;
+
+export function subscribeToEvents(onEvent) {
+  let source = null;
+  let poll = null;
+  let retry = null;
+  let closed = false;
+
+  const open = () => {
+    source = new EventSource(`${API_BASE}/events`);
+    CHANGE_EVENT_TYPES.forEach((type) => {
+      source.addEventListener(type, (event) => {
+        onEvent(type, event.data ? JSON.parse(event.data) : null);
+      });
+    });
+    source.addEventListener('open', () => {
+      clearInterval(poll);
+      poll = null;
+    });
+    source.addEventListener('error', () => {
+      // CONNECTING means EventSource is already reconnecting by itself
+      if (closed || source.readyState !== EventSource.CLOSED) return;
+      if (!poll) poll = setInterval(() => onEvent('poll', null), POLL_FALLBACK_MS);
+      retry = setTimeout(open, STREAM_RETRY_MS);
+    });
+  };
+
+  open();
+  return {
+    close() {
+      closed = true;
+      source.close();
+      clearInterval(poll);
+      clearTimeout(retry);
+    }
+  };
+}
+
 export async function healthCheck() {
   return fetchJSON(`${API_BASE}/health`);
 }